@@ -1,11 +1,14 @@
 import numpy as np
 from .. import config
 
+from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast, timing_stage
 from ..utils import univariate as uv
 from ..utils import unimultivariate as umv
 
 
-class ArmaGarch(object):
+class ArmaGarch(Base):
     """ARMA(1, 1)-GARCH(1, 1) forecasting (with simulation)
 
     Parameters:
@@ -33,6 +36,11 @@ class ArmaGarch(object):
             - "original": yyyy-mm-dd
             - "ms": milliseconds
 
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_`, `upper_` and `sims_`: "float64", or
+            "float32" to halve their memory (forecasts are computed in
+            double precision, and cast once)
+
     Attributes:
 
         fcast_: an object;
@@ -74,8 +82,11 @@ class ArmaGarch(object):
         dist="student",
         seed=123,
         date_formatting="original",
+        dtype="float64",
     ):
 
+        super().__init__(h=h, level=level, seed=seed)
+
         self.h = h
         self.level = level
         self.B = B
@@ -83,6 +94,7 @@ class ArmaGarch(object):
         self.dist = dist
         self.seed = seed
         self.date_formatting = date_formatting
+        self.dtype = dtype
         self.input_df = None
 
         self.fcast_ = None
@@ -95,6 +107,8 @@ class ArmaGarch(object):
         self.result_df_ = None
         self.sims_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `ArmaGarch` class
 
@@ -114,23 +128,25 @@ class ArmaGarch(object):
         self.get_forecast("armagarch")
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            self.output_dates_,
-        ) = uv.format_univariate_forecast(
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
-
-        self.sims_ = np.asarray(self.fcast_.rx2["sims"])
+        with timing_stage(self, "format_output"):
+            (
+                self.averages_,
+                self.ranges_,
+                self.output_dates_,
+            ) = uv.format_univariate_forecast(
+                date_formatting=self.date_formatting,
+                output_dates=self.output_dates_,
+                horizon=self.h,
+                fcast=self.fcast_,
+                frequency=self.frequency,
+            )
+
+            self.mean_ = np.asarray(self.fcast_.rx2["mean"], dtype=self.dtype)
+            self.lower_ = np.asarray(self.fcast_.rx2["lower"], dtype=self.dtype)
+            self.upper_ = np.asarray(self.fcast_.rx2["upper"], dtype=self.dtype)
+
+            self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
+
+            self.sims_ = np.asarray(self.fcast_.rx2["sims"], dtype=self.dtype)
 
         return self
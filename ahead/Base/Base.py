@@ -1,18 +1,84 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
 
-from rpy2.robjects import numpy2ri, r
-from rpy2.robjects.vectors import FloatVector
-
-from subprocess import Popen, PIPE
 from .. import config
+from ..backends import resolve_engine
+from ..utils import multivariate as mv
+from ..utils import plotting
+from ..utils.conversion import rlist2array
 from ..utils.univariate import compute_y_ts
 from ..utils.multivariate import compute_y_mts
-from ..utils.unimultivariate import compute_input_dates, compute_output_dates
+from ..utils.timing import timed, timing_stage
+from ..utils.unimultivariate import (
+    compute_calendar,
+    compute_result_dfs,
+    extend_dates,
+    format_output_dates,
+)
+
+
+def _lazy_attribute(name):
+    # attribute computed on first read by a builder registered with
+    # `Base.set_lazy`, unless it's assigned in the meantime
+    private_name = "_" + name
+
+    def getter(self):
+        builders = self.__dict__.get("_lazy_builders")
+        if builders and name in builders:
+            self.__dict__[private_name] = builders.pop(name)()
+        return self.__dict__.get(private_name)
+
+    def setter(self, value):
+        builders = self.__dict__.get("_lazy_builders")
+        if builders:
+            builders.pop(name, None)
+        self.__dict__[private_name] = value
+
+    return property(getter, setter)
+
+
+def _appendable_attribute(name, concatenate):
+    # attribute extended by chunks with `Base._append`, concatenated (once)
+    # when it's read, so that appending doesn't copy what's already there
+    private_name = "_" + name
+
+    def getter(self):
+        chunks = self.__dict__.get("_appended")
+        if chunks and name in chunks:
+            self.__dict__[private_name] = concatenate(
+                [self.__dict__[private_name]] + chunks.pop(name)
+            )
+        return self.__dict__.get(private_name)
+
+    def setter(self, value):
+        chunks = self.__dict__.get("_appended")
+        if chunks:
+            chunks.pop(name, None)
+        self.__dict__[private_name] = value
+
+    return property(getter, setter)
+
+
+def _stack_rows(arrays):
+    return np.vstack([a.reshape(a.shape[0], -1) for a in arrays])
 
 
 class Base(object):
 
+    # list-of-lists and data frame views of `mean_`, `lower_`, `upper_`,
+    # built only when read
+    averages_ = _lazy_attribute("averages_")
+    ranges_ = _lazy_attribute("ranges_")
+    result_dfs_ = _lazy_attribute("result_dfs_")
+    # input and output dates' tick labels of `plot`
+    _date_labels = _lazy_attribute("_date_labels")
+    # inputs extended by `update`
+    input_df = _appendable_attribute("input_df", pd.concat)
+    input_dates = _appendable_attribute(
+        "input_dates", lambda dates: pd.concat(dates, ignore_index=True)
+    )
+    xreg_ = _appendable_attribute("xreg_", _stack_rows)
+
     def __init__(self, h=5, level=95, date_formatting="ms", seed=123):
 
         self.h = h
@@ -36,218 +102,387 @@ class Base(object):
         self.lags = None
         self.lags_ = None  # used for VAR
         self.seed = None 
+        self.backend = None  # execution engine, see `ahead.backends`
 
-        self.input_ts_ = None  # input time series
+        self._input_ts = None  # input time series (R object)
         self.mean_ = None
         self.lower_ = None
         self.upper_ = None
         self.sims_ = None
+        self.quantiles_ = None  # quantiles of the simulations
+        self.variance_ = None  # variance of the simulations
         self.output_dates_ = None
         self.result_dfs_ = None
-
-        R_IS_INSTALLED = False
-
-        try:
-            proc = Popen(["which", "R"], stdout=PIPE, stderr=PIPE)
-            R_IS_INSTALLED = proc.wait() == 0
-        except Exception as e:
-            pass
-
-        if not R_IS_INSTALLED:
-            raise ImportError("R is not installed! \n" + config.USAGE_MESSAGE)
+        self.backend_ = None  # engine that produced the last forecast
+        self.timings_ = None  # duration of each stage of the last forecast
+
+    @property
+    def input_ts_(self):
+        """Input as an R time series, converted on first access"""
+        if self._input_ts is None and self.input_df is not None:
+            with timing_stage(self, "format_input"):
+                if self.input_df.shape[1] > 0:
+                    self._input_ts = compute_y_mts(self.input_df, self.frequency)
+                else:
+                    self._input_ts = compute_y_ts(self.input_df, self.frequency)
+        return self._input_ts
+
+    @input_ts_.setter
+    def input_ts_(self, value):
+        self._input_ts = value
 
     def format_input(self):
-        if self.input_df.shape[1] > 0:
-            self.input_ts_ = compute_y_mts(self.input_df, self.frequency)
-        else:
-            self.input_ts_ = compute_y_ts(self.input_df, self.frequency)
+        # the conversion to R happens when (and if) an engine reads `input_ts_`
+        self.input_ts_ = None
 
+    @timed("init_forecasting_params")
     def init_forecasting_params(self, df):
         self.input_df = df
         self.series_names = df.columns
         self.n_series = len(self.series_names)
-        self.input_dates = compute_input_dates(df)
         self.type_input = "multivariate" if len(df.shape) > 0 else "univariate"
-        self.output_dates_, self.frequency = compute_output_dates(df, self.h)
+        self.input_dates, self.output_dates_, self.frequency = compute_calendar(
+            df, self.h
+        )
 
-    def getsims(self, input_tuple, ix):
-        n_sims = len(input_tuple)
-        res = [input_tuple[i].iloc[:, ix].values for i in range(n_sims)]
-        return np.asarray(res).T
+    def _append(self, name, rows):
+        """Append `rows` to attribute `name` when it's next read"""
+        self.__dict__.setdefault("_appended", {}).setdefault(name, []).append(rows)
 
-    def get_forecast(self, method=None, xreg=None):
+    def _chunks(self, name):
+        # attribute `name` as a list of chunks, without concatenating them
+        return [self.__dict__.get("_" + name)] + list(
+            self.__dict__.get("_appended", {}).get(name, [])
+        )
 
-        if method != None:
-            self.method = method
+    def set_lazy(self, name, builder):
+        """Compute attribute `name` with `builder()` when it's first read"""
+        self.__dict__.setdefault("_lazy_builders", {})[name] = builder
+
+    @timed("format_output")
+    def format_multivariate_output(self):
+        """Set `mean_`, `lower_`, `upper_` from `fcast_` (as (h, n_series)
+        arrays), and `averages_`, `ranges_`, `result_dfs_` lazily"""
+        output_dates, mean_, lower_, upper_ = mv.format_multivariate_arrays(
+            date_formatting=self.date_formatting,
+            output_dates=self.output_dates_,
+            horizon=self.h,
+            fcast=self.fcast_,
+            frequency=self.frequency,
+            dtype=getattr(self, "dtype", "float64"),
+        )
+        self.mean_, self.lower_, self.upper_ = mean_, lower_, upper_
+        self.set_lazy_outputs(output_dates)
 
-        if self.method == "armagarch":
-            self.fcast_ = config.AHEAD_PACKAGE.armagarchf(
-                y=self.input_ts_,
-                h=self.h,
-                level=self.level,
-                B=self.B,
-                cl=self.cl,
-                dist=self.dist,
-                seed=self.seed,
-            )
+    def set_lazy_outputs(self, output_dates=None, names=None):
+        """Register the builders of `averages_`, `ranges_`, `result_dfs_`
+        (and plot labels), from the current `mean_`, `lower_`, `upper_`
 
-        if self.method in ("mean", "median", "rw"):
-            self.fcast_ = config.AHEAD_PACKAGE.basicf(
-                self.input_ts_,
-                h=self.h,
-                level=self.level,
-                method=self.method,
-                type_pi=self.type_pi,
-                block_length=self.block_length,
-                B=self.B,
-                seed=self.seed,
-            )
+        Parameters:
 
-        if self.method == "dynrm":
-            self.fcast_ = config.AHEAD_PACKAGE.dynrmf(
-                y=self.input_ts_,
-                h=self.h,
-                level=self.level,
-                type_pi=self.type_pi,
-            )
+            output_dates: a list;
+                formatted output dates (default: `output_dates_`, formatted
+                with `date_formatting`)
 
-        if self.method == "eat":
-            self.fcast_ = config.AHEAD_PACKAGE.eatf(
-                y=self.input_ts_,
-                h=self.h,
-                level=self.level,
-                type_pi=self.type_pi,
-                weights=config.FLOATVECTOR(self.weights),
+            names: a list of strings;
+                attributes concerned (default: all of them)
+
+        """
+        if output_dates is None:
+            output_dates = format_output_dates(
+                self.date_formatting,
+                self.output_dates_,
+                self.h,
+                frequency=self.frequency,
+            )
+        mean_, lower_, upper_ = self.mean_, self.lower_, self.upper_
+        n_series = self.n_series
+        # input dates as chunks (see `update`), not concatenated here
+        dates = self._chunks("input_dates") + [self.output_dates_]
+        builders = {
+            "averages_": lambda: mv.compute_averages(
+                output_dates, mean_[:, :n_series]
+            ),
+            "ranges_": lambda: mv.compute_ranges(
+                output_dates, lower_[:, :n_series], upper_[:, :n_series]
+            ),
+            "_date_labels": lambda: plotting.date_labels(
+                [date for chunk in dates for date in chunk]
+            ),
+            "result_dfs_": lambda: compute_result_dfs(
+                output_dates,
+                mean_[:, :n_series],
+                lower_[:, :n_series],
+                upper_[:, :n_series],
+            ),
+        }
+        for name, builder in builders.items():
+            if names is None or name in names:
+                self.set_lazy(name, builder)
+
+    @timed("format_sims")
+    def format_sims(self):
+        """Set `sims_` from `fcast_`, transferred from R in one copy
+
+        `sims_` is a (B, h, n_series) array if `sims_layout == "array"`,
+        and a tuple of B (h, n_series) arrays otherwise, of type `dtype`.
+        With `keep_sims=False`, the engine summarized the simulations
+        instead: `sims_` is None, and `variance_` (h, n_series) and
+        `quantiles_` (len(quantiles), h, n_series) are set. With
+        `quantiles`, `quantiles_` and `variance_` are set from `sims_`
+        otherwise.
+        """
+        dtype = getattr(self, "dtype", "float64")
+        quantiles = getattr(self, "quantiles", None)
+        if not getattr(self, "keep_sims", True):  # summarized by the engine
+            self.sims_ = None
+            self.variance_ = np.asarray(
+                self.fcast_.rx2["variance"], dtype=dtype
+            ).reshape(self.h, -1)
+            self.quantiles_ = None
+            if quantiles is not None:
+                self.quantiles_ = np.asarray(
+                    self.fcast_.rx2["quantiles"], dtype=dtype
+                ).reshape(len(quantiles), self.h, -1)
+            return
+
+        sims = rlist2array(self.fcast_.rx2["sims"], self.h, dtype=dtype)
+        if isinstance(self.fcast_, dict):
+            # in-process results: the engine's (double) copy is released
+            self.fcast_["sims"] = sims
+        if getattr(self, "sims_layout", "tuple") == "array":
+            self.sims_ = sims
+        else:
+            self.sims_ = tuple(sims)
+        if quantiles is not None:
+            self.quantiles_ = np.quantile(sims, quantiles, axis=0).astype(
+                dtype, copy=False
             )
+            self.variance_ = sims.var(axis=0, ddof=1).astype(dtype, copy=False)
 
-        if self.method == "ridge2":
-            if xreg is None:
-
-                self.fcast_ = config.AHEAD_PACKAGE.ridge2f(
-                    self.input_ts_,
-                    h=self.h,
-                    level=self.level,
-                    lags=self.lags,
-                    nb_hidden=self.nb_hidden,
-                    nodes_sim=self.nodes_sim,
-                    activ=self.activation,
-                    a=self.a,
-                    lambda_1=self.lambda_1,
-                    lambda_2=self.lambda_2,
-                    dropout=self.dropout,
-                    type_pi=self.type_pi,
-                    margins=self.margins,
-                    # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
-                    block_length=self.block_length,
-                    B=self.B,
-                    type_aggregation=self.type_aggregation,
-                    # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
-                    centers=self.centers,
-                    type_clustering=self.type_clustering,
-                    cl=self.cl,
-                    seed=self.seed,
-                )
+    def getsims(self, input_tuple, ix):
+        """Simulations of series `ix`, as a (h, B) array"""
+        if isinstance(input_tuple, np.ndarray):  # (B, h, n_series), no copy
+            return input_tuple[:, :, ix].T
+        n_sims = len(input_tuple)
+        res = [np.asarray(input_tuple[i])[:, ix] for i in range(n_sims)]
+        return np.asarray(res).T
 
-            else:  # xreg is not None:
+    @timed("get_forecast")
+    def get_forecast(self, method=None, xreg=None, backend=None):
+        """Obtain the forecast from an execution backend
 
-                try:
-                    self.xreg_ = xreg.values
-                except:
-                    self.xreg_ = config.DEEP_COPY(xreg)
+        Parameters:
 
-                is_matrix_xreg = len(self.xreg_.shape) > 1
+            method: a string;
+                forecasting method ("mean", "median", "rw", "ridge2", "var",
+                "eat", "dynrm", "armagarch", "mlarch")
 
-                numpy2ri.activate()
+            xreg: a numpy array or a data frame;
+                external regressors (for method "ridge2")
 
-                xreg_ = (
-                    r.matrix(
-                        FloatVector(self.xreg_.flatten()),
-                        byrow=True,
-                        nrow=self.xreg_.shape[0],
-                        ncol=self.xreg_.shape[1],
-                    )
-                    if is_matrix_xreg
-                    else r.matrix(
-                        FloatVector(self.xreg_.flatten()),
-                        byrow=True,
-                        nrow=self.xreg_.shape[0],
-                        ncol=1,
-                    )
-                )
+            backend: a string;
+                engine running the method for this call (e.g "r"); defaults
+                to the estimator's `backend` attribute, then to the
+                process-wide default (see `ahead.backends.set_backend`)
 
-                self.fcast_ = config.AHEAD_PACKAGE.ridge2f(
-                    self.input_ts_,
-                    xreg=xreg_,
-                    h=self.h,
-                    level=self.level,
-                    lags=self.lags,
-                    nb_hidden=self.nb_hidden,
-                    nodes_sim=self.nodes_sim,
-                    activ=self.activation,
-                    a=self.a,
-                    lambda_1=self.lambda_1,
-                    lambda_2=self.lambda_2,
-                    dropout=self.dropout,
-                    type_pi=self.type_pi,
-                    margins=self.margins,
-                    # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
-                    block_length=self.block_length,
-                    B=self.B,
-                    type_aggregation=self.type_aggregation,
-                    # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
-                    centers=self.centers,
-                    type_clustering=self.type_clustering,
-                    cl=self.cl,
-                    seed=self.seed,
-                )
+        """
 
-        if self.method == "var":
-            self.fcast_ = config.AHEAD_PACKAGE.varf(
-                self.input_ts_,
-                h=self.h,
-                level=self.level,
-                lags=self.lags,
-                type_VAR=self.type_VAR,
-            )
-        
-        if self.method.lower() == "mlarch":
-            valid_type_pi = ("surrogate", "bootstrap", "kde")
-            type_pi = self.type_pi if self.type_pi in valid_type_pi else "surrogate"
-            valid_type_sim = ("surrogate", "block-bootstrap", "bootstrap", "kde", "fitdistr")
-            type_sim_conformalize = (
-                self.type_sim_conformalize if self.type_sim_conformalize in valid_type_sim else "surrogate"
-            )
+        if method != None:
+            self.method = method
 
-            mlarch_args = dict(
-                y=self.input_ts_,
-                h=self.h,
-                mean_model=getattr(self, "mean_model", None),
-                model_residuals=getattr(self, "model_residuals", None),
-                fit_func=getattr(self, "fit_func", None),
-                predict_func=getattr(self, "predict_func", None),
-                type_pi=type_pi,
-                type_sim_conformalize=type_sim_conformalize,
-                ml_method=getattr(self, "ml_method", None),
-                level=self.level,
-                B=self.B,
-                ml=True,
-                stat_model=getattr(self, "stat_model", None),
-                seed=self.seed,
-            )
-            # Remove keys with value None
-            mlarch_args = {k: v for k, v in mlarch_args.items() if v is not None}
+        engine = resolve_engine(
+            self.method,
+            type_pi=self.type_pi,
+            backend=backend if backend is not None else self.backend,
+            keep_sims=getattr(self, "keep_sims", True),
+        )
+
+        self.fcast_ = engine.forecast(self, self.method.lower(), xreg=xreg)
+        self.backend_ = engine.name
 
-            self.fcast_ = config.AHEAD_PACKAGE.mlarchf(**mlarch_args)
+    def _update(self, new_rows, xreg=None):
+        """Append `new_rows` to the input and forecast again
 
+        Engines able to update their previous result (see `Engine.update`)
+        do it without reading the whole input; the others forecast from
+        scratch, from the extended input. The input, its dates and `xreg_`
+        are extended by chunks, and only concatenated when read. Input
+        dates are extended without being inferred again: the new rows'
+        dates must follow the last input date at the input's frequency.
+        """
+        assert (
+            self.__dict__.get("_input_df") is not None and self.mean_ is not None
+        ), "model forecasting must be obtained first (with `forecast` method)"
+        assert list(new_rows.columns) == list(
+            self.series_names
+        ), "must have: the same series as the input data frame"
+        has_xreg = self.__dict__.get("_xreg_") is not None
+        if xreg is not None:
+            assert has_xreg, "xreg must be provided to `forecast` first"
+        else:
+            assert (
+                not has_xreg
+            ), "must have: xreg for the new rows (xreg was provided to `forecast`)"
+        if new_rows.shape[0] == 0:
+            return self
+
+        new_values = new_rows.to_numpy(dtype=np.float64)
+        with timing_stage(self, "init_forecasting_params"):
+            new_dates, self.output_dates_ = extend_dates(
+                self._chunks("input_dates")[-1].iloc[-1],
+                new_rows.index,
+                self.frequency,
+                self.h,
+            )
+        self._append("input_dates", new_dates)
+        self._append("input_df", new_rows)
+        # converted again from `input_df` if an engine reads `input_ts_`
+        self._input_ts = None
+
+        if xreg is not None:
+            xreg = np.asarray(xreg, dtype=np.float64).reshape(
+                new_values.shape[0], -1
+            )
+            self._append("xreg_", xreg)
 
-    def plot(self, series, type_axis="dates", type_plot="pi"):
+        engine = resolve_engine(
+            self.method,
+            type_pi=self.type_pi,
+            backend=self.backend,
+            keep_sims=getattr(self, "keep_sims", True),
+        )
+        method = self.method.lower()
+        fcast = None
+        with timing_stage(self, "get_forecast"):
+            if getattr(self, "fcast_", None) is not None and engine.name == self.backend_:
+                fcast = engine.update(self, method, new_values, xreg=xreg)
+            if fcast is None:
+                fcast = engine.forecast(
+                    self, method, xreg=None if xreg is None else self.xreg_
+                )
+        self.fcast_ = fcast
+        self.backend_ = engine.name
+
+        self.format_multivariate_output()
+        if "sims" in self.fcast_.names or "variance" in self.fcast_.names:
+            self.format_sims()
+        return self
+
+    @staticmethod
+    def _split_inputs(dfs):
+        """List of data frames from a list, or from a panel indexed by
+        (input id, date) (in order of first appearance of the ids)"""
+        if isinstance(dfs, pd.DataFrame):
+            assert (
+                dfs.index.nlevels == 2
+            ), "must have: a panel indexed by (input id, date)"
+            dfs = [df.droplevel(0) for _, df in dfs.groupby(level=0, sort=False)]
+        dfs = list(dfs)
+        assert len(dfs) > 0, "must have at least one data frame"
+        return dfs
+
+    def _forecast_many(self, dfs, method, univariate=False):
+        """Forecast each data frame of `dfs` (with the same number of series)
+
+        `dfs` is a list of data frames, or a panel: a data frame indexed by
+        (input id, date), split in order of first appearance of the ids.
+
+        Engines implementing `method` for batches (see
+        `Engine.batched_methods`) forecast all the inputs in one call (e.g
+        one R call for all of them); the others forecast them one at a time.
+        Sets `mean_`, `lower_`, `upper_` as (n_inputs, h, n_series) arrays
+        ((n_inputs, h) if `univariate`) and `output_dates_` as a list of
+        output dates for each input. Simulations are not kept.
+        """
+        dfs = self._split_inputs(dfs)
+        self.method = method
+        engine = resolve_engine(method, type_pi=self.type_pi, backend=self.backend)
+        batched = method in engine.batched_methods
+
+        n_series = dfs[0].shape[1]
+        dtype = getattr(self, "dtype", "float64")
+        output_dates = []
+        frequencies = []
+        results = []
+        previous_index = None
+        for df in dfs:
+            assert (
+                df.shape[1] == n_series
+            ), "must have: the same number of series in each data frame"
+            # dates are computed once for consecutive inputs sharing an index
+            if previous_index is None or not df.index.equals(previous_index):
+                self.init_forecasting_params(df)
+                previous_index = df.index
+            self.input_df = df
+            output_dates.append(self.output_dates_)
+            frequencies.append(self.frequency)
+            if batched:
+                results.append(df.to_numpy(dtype=np.float64))
+            else:
+                self.format_input()
+                with timing_stage(self, "get_forecast"):
+                    self.fcast_ = engine.forecast(self, method)
+                results.append(mv.get_forecast_arrays(self.fcast_, dtype=dtype))
+
+        if batched:
+            with timing_stage(self, "get_forecast"):
+                self.fcast_ = engine.forecast_many(
+                    self, method, results, frequencies=frequencies
+                )
+            results = mv.get_forecast_arrays(self.fcast_, dtype=dtype)
+        else:
+            results = [np.stack(res) for res in zip(*results)]
+        results = [res.reshape(len(dfs), self.h, -1) for res in results]
+        if univariate:
+            results = [res[:, :, 0] for res in results]
+        self.mean_, self.lower_, self.upper_ = results
+        self.output_dates_ = output_dates
+        self.backend_ = engine.name
+        # no per-series lists or data frames, nor simulations, for batches
+        self.averages_ = self.ranges_ = self.result_dfs_ = None
+        self.quantiles_ = self.variance_ = None
+        return self
+
+    def plot(
+        self,
+        series,
+        type_axis="dates",
+        type_plot="pi",
+        max_paths=None,
+        levels=(50, 80, 95),
+        ax=None,
+    ):
         """Plot time series forecast
 
         Parameters:
 
         series: {integer} or {string}
             series index or name
+
+        type_axis: {string}
+            "dates" (dates as tick labels) or "numeric"
+
+        type_plot: {string}
+            "pi" (prediction interval), "spaghetti" (simulated paths, drawn
+            as one collection of lines) or "fan" (nested intervals of the
+            simulations at each of `levels`; `lower_`, `upper_` and the
+            pairs of symmetric `quantiles_` without simulations)
+
+        max_paths: {integer}
+            number of simulated paths drawn at random by "spaghetti"
+            (default: all of them)
+
+        levels: {tuple}
+            confidence levels (%) of the intervals of "fan"
+
+        ax: {matplotlib Axes}
+            axes to draw on; by default, a new figure is drawn and shown
+
+        Returns: the matplotlib Axes
         """
+        import matplotlib.pyplot as plt
+
         assert all(
             [
                 self.mean_ is not None,
@@ -256,6 +491,11 @@ class Base(object):
                 self.output_dates_ is not None,
             ]
         ), "model forecasting must be obtained first (with `forecast` method)"
+        assert type_plot in (
+            "pi",
+            "spaghetti",
+            "fan",
+        ), "must have: type_plot in ('pi', 'spaghetti', 'fan')"
 
         if isinstance(series, str):
             assert (
@@ -263,74 +503,128 @@ class Base(object):
             ), f"series {series} doesn't exist in the input dataset"
             series_idx = self.input_df.columns.get_loc(series)
         else:
-            assert isinstance(series, int) and (
+            assert isinstance(series, (int, np.integer)) and (
                 0 <= series < self.n_series
             ), f"check series index (< {self.n_series})"
-            series_idx = series
+            series_idx = int(series)
 
-        y_all = list(self.input_df.iloc[:, series_idx]) + list(
-            self.result_dfs_[series_idx]["mean"].values
-        )
+        show = ax is None
+        if show:
+            _, ax = plt.subplots()
 
-        y_test = list(self.result_dfs_[series_idx]["mean"].values)
-        n_points_all = len(y_all)
         n_points_train = self.input_df.shape[0]
-
-        if type_axis == "numeric":
-            x_all = [i for i in range(n_points_all)]
-            x_test = [i for i in range(n_points_train, n_points_all)]
-
-        if type_axis == "dates":  # use dates
-            x_train = [date.strftime("%Y-%m-%d") for date in self.input_dates]
-            x_test = [date.strftime("%Y-%m-%d") for date in self.output_dates_]
-            x_all = np.concatenate((x_train, x_test), axis=None)
+        y_train = self.input_df.iloc[:, series_idx].to_numpy(dtype=np.float64)
+        y_test = np.asarray(self.mean_).reshape(self.h, -1)[:, series_idx]
+        x_all = np.arange(n_points_train + self.h)
+        x_test = x_all[n_points_train:]
+        y_all = np.concatenate((y_train, y_test))
+        if type_axis == "dates":
+            labels = self._date_labels
+            if labels is None:
+                labels = plotting.date_labels(
+                    list(self.input_dates) + list(self.output_dates_)
+                )
+            plotting.set_date_axis(ax, labels)
 
         if type_plot == "pi":
-            fig, ax = plt.subplots()
             ax.plot(x_all, y_all, "-")
             ax.plot(x_test, y_test, "-", color="orange")
             ax.fill_between(
                 x_test,
-                self.result_dfs_[series_idx]["lower"].values,
-                self.result_dfs_[series_idx]["upper"].values,
+                np.asarray(self.lower_).reshape(self.h, -1)[:, series_idx],
+                np.asarray(self.upper_).reshape(self.h, -1)[:, series_idx],
                 alpha=0.2,
                 color="orange",
             )
-            plt.title(
-                f"prediction intervals for {series}",
-                loc="left",
-                fontsize=12,
-                fontweight=0,
-                color="black",
-            )
-            plt.show()
+            title = f"prediction intervals for {series}"
 
         if type_plot == "spaghetti":
+            assert self.sims_ is not None, "must have: simulations (`sims_`)"
+            sims_ix = plotting.subsample_paths(
+                self.getsims(self.sims_, series_idx), max_paths, self.seed
+            )
             palette = plt.get_cmap("Set1")
-            sims_ix = self.getsims(self.sims_, series_idx)
-            plt.plot(x_all, y_all, "-")
-            for col_ix in range(
-                sims_ix.shape[1]
-            ):  # avoid this when there are thousands of simulations
-                plt.plot(
-                    x_test,
-                    sims_ix[:, col_ix],
-                    "-",
-                    color=palette(col_ix),
-                    linewidth=1,
-                    alpha=0.9,
-                )
-            plt.plot(x_all, y_all, "-", color="black")
-            plt.plot(x_test, y_test, "-", color="blue")
-            # Add titles
-            plt.title(
-                f"{self.B} simulations of {series}",
-                loc="left",
-                fontsize=12,
-                fontweight=0,
-                color="black",
+            ax.plot(x_all, y_all, "-")
+            plotting.draw_paths(
+                ax,
+                x_test,
+                sims_ix,
+                colors=palette(np.arange(sims_ix.shape[1])),
+                linewidths=1,
+                alpha=0.9,
             )
-            plt.xlabel("Time")
-            plt.ylabel("Values")
-            # Show the graph
+            ax.plot(x_all, y_all, "-", color="black")
+            ax.plot(x_test, y_test, "-", color="blue")
+            ax.set_xlabel("Time")
+            ax.set_ylabel("Values")
+            title = f"{sims_ix.shape[1]} simulations of {series}"
+
+        if type_plot == "fan":
+            ax.plot(x_all, y_all, "-")
+            plotting.draw_fan(ax, x_test, self._get_fan_bands(series_idx, levels))
+            ax.plot(x_test, y_test, "-", color="blue")
+            title = f"prediction intervals for {series}"
+
+        ax.set_title(title, loc="left", fontsize=12, fontweight=0, color="black")
+        if show:
             plt.show()
+        return ax
+
+    def plot_grid(self, series=None, ncols=3, figsize=None, **kwargs):
+        """Plot the forecasts of several series, one per subplot
+
+        Parameters:
+
+        series: {list}
+            series indices or names (default: all of them)
+
+        ncols: {integer}
+            number of columns of the grid
+
+        figsize: {tuple}
+            size of the figure (default: 4 x 3 inches per subplot)
+
+        **kwargs: arguments of `plot` (e.g `type_plot`, `max_paths`)
+
+        Returns: the matplotlib Figure
+        """
+        import matplotlib.pyplot as plt
+
+        if series is None:
+            series = list(range(self.n_series))
+        ncols = min(ncols, len(series))
+        nrows = -(-len(series) // ncols)
+        if figsize is None:
+            figsize = (4 * ncols, 3 * nrows)
+        fig, axes = plt.subplots(nrows, ncols, figsize=figsize, squeeze=False)
+        for ax, series_i in zip(axes.ravel(), series):
+            self.plot(series_i, ax=ax, **kwargs)
+        for ax in axes.ravel()[len(series) :]:
+            ax.set_visible(False)
+        fig.tight_layout()
+        plt.show()
+        return fig
+
+    def _get_fan_bands(self, series_idx, levels):
+        # (n_bands, 2, h) nested intervals of series `series_idx`
+        if self.sims_ is not None:
+            return plotting.fan_bands(self.getsims(self.sims_, series_idx), levels)
+        bands = [
+            [
+                np.asarray(self.lower_).reshape(self.h, -1)[:, series_idx],
+                np.asarray(self.upper_).reshape(self.h, -1)[:, series_idx],
+            ]
+        ]
+        quantiles = getattr(self, "quantiles", None)
+        if quantiles is not None and self.quantiles_ is not None:
+            quantiles = np.asarray(quantiles)
+            for i, prob in enumerate(quantiles):
+                j = np.flatnonzero(np.isclose(quantiles, 1 - prob))
+                if prob < 0.5 and len(j) > 0:
+                    bands.append(
+                        [
+                            self.quantiles_[i, :, series_idx],
+                            self.quantiles_[j[0], :, series_idx],
+                        ]
+                    )
+        return np.asarray(bands, dtype=np.float64)
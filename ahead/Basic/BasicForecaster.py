@@ -1,6 +1,8 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast
 from ..utils import multivariate as mv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -40,6 +42,33 @@ class BasicForecaster(Base):
         seed: an integer;
             reproducibility seed
 
+        sims_layout: a string;
+            layout of `sims_`: "tuple" (B arrays of shape (h, n_series))
+            or "array" (one (B, h, n_series) array)
+
+        backend: a string;
+            execution engine: "r" (R package 'ahead'), "numpy"
+            (in-process, no R), or None for the process-wide default
+            (see `ahead.backends`)
+
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_`, `upper_` and `sims_`: "float64", or
+            "float32" to halve their memory (forecasts are computed in
+            double precision, and cast once)
+
+        keep_sims: a boolean;
+            keep the simulations in `sims_` (bootstrap intervals), or
+            summarize them as they are produced (in `variance_` and
+            `quantiles_`), so that memory doesn't grow with `B`; prediction
+            intervals are then streaming estimates of the quantiles. Unless
+            a backend is chosen, the "numpy" backend is then used when it
+            supports `type_pi`: R functions produce all the simulations
+            (only summarized in R, before being transferred)
+
+        quantiles: a list of floats;
+            probabilities of quantiles of the simulations, set in
+            `quantiles_`
+
     Attributes:
 
         fcast_: an object;
@@ -68,8 +97,17 @@ class BasicForecaster(Base):
             mean forecast, lower + upper prediction intervals,
             and a date index
 
-        sims_: currently a tuple of numpy arrays
+        sims_: a tuple of numpy arrays, or a numpy array
             for `type_pi == bootstrap`, simulations for each series
+            (see `sims_layout`)
+
+        quantiles_: a numpy array
+            (len(quantiles), h, n_series) quantiles of the simulations, if
+            `quantiles` is not None
+
+        variance_: a numpy array
+            (h, n_series) variance of the simulations, with
+            `keep_sims=False` or `quantiles`
 
     Examples:
 
@@ -104,6 +142,11 @@ class BasicForecaster(Base):
         B=100,
         date_formatting="original",
         seed=123,
+        sims_layout="tuple",
+        backend=None,
+        dtype="float64",
+        keep_sims=True,
+        quantiles=None,
     ):
 
         super().__init__(
@@ -113,10 +156,16 @@ class BasicForecaster(Base):
         )
 
         self.method = method
+        self.seed = seed
         self.type_pi = type_pi
         self.block_length = block_length
         self.B = B
         self.date_formatting = date_formatting
+        self.dtype = dtype
+        self.keep_sims = keep_sims
+        self.quantiles = quantiles
+        self.sims_layout = sims_layout
+        self.backend = backend
         self.input_df = None
 
         self.fcast_ = None
@@ -129,6 +178,8 @@ class BasicForecaster(Base):
         self.result_dfs_ = None
         self.sims_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `BasicForecaster` class
 
@@ -153,34 +204,47 @@ class BasicForecaster(Base):
         self.get_forecast()
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = mv.format_multivariate_forecast(
-            n_series=self.n_series,
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_dfs_ = tuple(
-            umv.compute_result_df(self.averages_[i], self.ranges_[i])
-            for i in range(self.n_series)
-        )
+        self.format_multivariate_output()
 
         if self.type_pi in (
             "bootstrap",
             "blockbootstrap",
             "movingblockbootstrap",
         ):
-            self.sims_ = tuple(
-                np.asarray(self.fcast_.rx2["sims"][i]) for i in range(self.B)
-            )
+            self.format_sims()
 
         return self
+
+    @timed_forecast
+    def update(self, new_rows):
+        """Append new observations to the input and forecast again
+
+        Parameters:
+
+            new_rows: a data frame;
+                new observations of the input time series, with the same
+                columns, dated after the last input date (at the input's
+                frequency)
+
+        """
+        return self._update(new_rows)
+
+    @timed_forecast
+    def forecast_many(self, dfs):
+        """Forecast each data frame of a collection
+
+        The "r" backend forecasts all of them in one R call.
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                with the same number of series, or a panel indexed by
+                (input id, date)
+
+        Sets `mean_`, `lower_`, `upper_` as (n_data_frames, h, n_series)
+        arrays, and `output_dates_` as a list of output dates for each data
+        frame.
+
+        """
+        return self._forecast_many(dfs, self.method)
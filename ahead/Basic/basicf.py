@@ -0,0 +1,252 @@
+import numpy as np
+
+from statistics import NormalDist
+
+from ..utils.streaming import StreamingSummary
+
+
+def bootstrap_indices(n, h, B, type_pi="bootstrap", block_length=None, seed=123):
+    """Resampling indices for B bootstrap replications, as a (B, h) array
+
+    Parameters:
+
+        n: an integer;
+            number of observations (e.g residuals) to resample
+
+        h: an integer;
+            length of each resampled path
+
+        B: an integer;
+            number of replications
+
+        type_pi: a string;
+            "bootstrap" (independent), "blockbootstrap" (circular blocks),
+            "movingblockbootstrap" (moving blocks, no wrapping)
+
+        block_length: an integer;
+            length of blocks for block bootstrap
+
+        seed: an integer;
+            reproducibility seed
+
+    """
+    return _draw_indices(
+        np.random.default_rng(seed), n, h, B, type_pi, block_length
+    )
+
+
+def bootstrap_index_chunks(
+    n, h, B, type_pi="bootstrap", block_length=None, seed=123, chunksize=256
+):
+    """Indices of `bootstrap_indices`, by chunks of `chunksize` replications
+
+    Yields (at most `chunksize`, h) arrays; stacked, they are the (B, h)
+    array of `bootstrap_indices` with the same arguments.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, B, chunksize):
+        yield _draw_indices(
+            rng, n, h, min(chunksize, B - start), type_pi, block_length
+        )
+
+
+def _draw_indices(rng, n, h, B, type_pi, block_length):
+    if type_pi == "bootstrap":
+        return rng.integers(0, n, size=(B, h))
+
+    assert (
+        block_length is not None
+    ), "For `type_pi in ('blockbootstrap', 'movingblockbootstrap')`, `block_length` must be not None"
+
+    block_length = int(min(block_length, n))
+    n_blocks = -(-h // block_length)  # ceiling
+
+    if type_pi == "blockbootstrap":
+        starts = rng.integers(0, n, size=(B, n_blocks))
+    elif type_pi == "movingblockbootstrap":
+        starts = rng.integers(0, n - block_length + 1, size=(B, n_blocks))
+    else:
+        raise ValueError(f"unknown type_pi: {type_pi!r}")
+
+    idx = starts[:, :, None] + np.arange(block_length)
+    return (idx.reshape(B, -1)[:, :h]) % n
+
+
+def summarize_sims(
+    simulate, index_chunks, shape, level=95, quantiles=None, type_aggregation="mean"
+):
+    """Prediction intervals and summaries of simulations, which are
+    produced by chunks and not kept
+
+    Parameters:
+
+        simulate: a function;
+            simulations, (n_paths,) + shape, from a chunk of resampling
+            indices
+
+        index_chunks: an iterable;
+            chunks of resampling indices (see `bootstrap_index_chunks`)
+
+        shape: a tuple;
+            shape of each simulation, e.g (h, n_series)
+
+        level: an integer;
+            Confidence level for prediction intervals
+
+        quantiles: a list of floats;
+            probabilities of additional quantiles
+
+        type_aggregation: a string;
+            "mean" or "median" of the simulations, returned as "mean"
+
+    Returns: a dict with arrays of shape `shape` "mean", "lower", "upper",
+    "variance", and "quantiles", (len(quantiles),) + shape, if `quantiles`
+    is not None. Quantiles are streaming estimates (see
+    `StreamingSummary`), not the exact quantiles of the simulations.
+    """
+    alpha = 1 - level / 100
+    probs = [alpha / 2, 1 - alpha / 2]
+    if type_aggregation == "median":
+        probs.append(0.5)
+    n_intervals = len(probs)
+    if quantiles is not None:
+        probs.extend(quantiles)
+
+    summary = StreamingSummary(probs, shape)
+    for idx in index_chunks:
+        summary.add(simulate(idx))
+
+    estimates = summary.quantiles
+    res = {
+        "mean": estimates[2] if type_aggregation == "median" else summary.mean,
+        "lower": estimates[0],
+        "upper": estimates[1],
+        "variance": summary.variance,
+    }
+    if quantiles is not None:
+        res["quantiles"] = estimates[n_intervals:]
+    return res
+
+
+def basicf(
+    y,
+    h=5,
+    level=95,
+    method="mean",
+    type_pi="gaussian",
+    block_length=None,
+    B=100,
+    seed=123,
+    keep_sims=True,
+    quantiles=None,
+):
+    """Basic forecasting functions (mean, median, random walk), in NumPy
+
+    Same methods and types of prediction intervals as R's `ahead::basicf`.
+    Simulations are vectorized over all replications and series, but use
+    NumPy's random generator: they are not identical to R's.
+
+    Parameters:
+
+        y: a numpy array;
+            input time series, (n, n_series)
+
+        h: an integer;
+            forecasting horizon
+
+        level: an integer;
+            Confidence level for prediction intervals
+
+        method: a string;
+            Forecasting method, either "mean", "median", or random walk ("rw")
+
+        type_pi: a string;
+            Type of prediction interval ("gaussian", "bootstrap",
+            "blockbootstrap", "movingblockbootstrap")
+
+        block_length: an integer
+            length of block for `type_pi in ("blockbootstrap", "movingblockbootstrap")`
+
+        B: an integer;
+            Number of replications
+
+        seed: an integer;
+            reproducibility seed
+
+        keep_sims: a boolean;
+            keep the simulations, or summarize them by chunks (see
+            `summarize_sims`), in memory independent of `B`
+
+        quantiles: a list of floats;
+            probabilities of quantiles of the simulations, with
+            `keep_sims=False`
+
+    Returns: a dict with (h, n_series) arrays "mean", "lower", "upper",
+    and for bootstrap intervals, a (B, h, n_series) array "sims", or
+    with `keep_sims=False`, "variance" and "quantiles" (see
+    `summarize_sims`)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 1:
+        y = y.reshape(-1, 1)
+
+    if method == "mean":
+        point = y.mean(axis=0)
+        resids = y - point
+    elif method == "median":
+        point = np.median(y, axis=0)
+        resids = y - point
+    elif method == "rw":
+        point = y[-1]
+        resids = np.diff(y, axis=0)
+    else:
+        raise ValueError("must have: method in ('mean', 'median', 'rw')")
+
+    mean = np.broadcast_to(point, (h, y.shape[1]))
+
+    if type_pi == "gaussian":
+        qt_sd = NormalDist().inv_cdf(0.5 + level / 200) * resids.std(
+            axis=0, ddof=1
+        )
+        return {
+            "mean": mean.copy(),
+            "lower": mean - qt_sd,
+            "upper": mean + qt_sd,
+        }
+
+    if not keep_sims:
+        res = summarize_sims(
+            lambda idx: mean + resids[idx],
+            bootstrap_index_chunks(
+                n=resids.shape[0],
+                h=h,
+                B=B,
+                type_pi=type_pi,
+                block_length=block_length,
+                seed=seed,
+            ),
+            mean.shape,
+            level=level,
+            quantiles=quantiles,
+        )
+        res["mean"] = mean.copy()
+        return res
+
+    idx = bootstrap_indices(
+        n=resids.shape[0],
+        h=h,
+        B=B,
+        type_pi=type_pi,
+        block_length=block_length,
+        seed=seed,
+    )
+    sims = mean + resids[idx]  # (B, h, n_series)
+    alpha = 1 - level / 100
+    lower, upper = np.quantile(sims, [alpha / 2, 1 - alpha / 2], axis=0)
+
+    return {
+        "mean": mean.copy(),
+        "lower": lower,
+        "upper": upper,
+        "sims": sims,
+    }
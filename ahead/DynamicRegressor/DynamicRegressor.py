@@ -1,6 +1,8 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast, timing_stage
 from ..utils import univariate as uv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -26,6 +28,11 @@ class DynamicRegressor(Base):
             - "original": yyyy-mm-dd
             - "ms": milliseconds
 
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_` and `upper_`: "float64", or "float32"
+            to halve their memory (forecasts are computed in double
+            precision, and cast once)
+
     Attributes:
 
         fcast_: an object;
@@ -75,7 +82,14 @@ class DynamicRegressor(Base):
 
     """
 
-    def __init__(self, h=5, level=95, type_pi="E", date_formatting="original"):
+    def __init__(
+        self,
+        h=5,
+        level=95,
+        type_pi="E",
+        date_formatting="original",
+        dtype="float64",
+    ):
 
         super().__init__(
             h=h,
@@ -84,6 +98,7 @@ class DynamicRegressor(Base):
 
         self.type_pi = type_pi
         self.date_formatting = date_formatting
+        self.dtype = dtype
         self.input_df = None
         self.type_input = "univariate"
 
@@ -96,6 +111,8 @@ class DynamicRegressor(Base):
         self.upper_ = []
         self.result_df_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `DynamicRegressor` class
 
@@ -115,21 +132,41 @@ class DynamicRegressor(Base):
         self.get_forecast("dynrm")
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = uv.format_univariate_forecast(
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
+        with timing_stage(self, "format_output"):
+            (
+                self.averages_,
+                self.ranges_,
+                _,
+            ) = uv.format_univariate_forecast(
+                date_formatting=self.date_formatting,
+                output_dates=self.output_dates_,
+                horizon=self.h,
+                fcast=self.fcast_,
+                frequency=self.frequency,
+            )
+
+            self.mean_ = np.asarray(self.fcast_.rx2["mean"], dtype=self.dtype)
+            self.lower_ = np.asarray(self.fcast_.rx2["lower"], dtype=self.dtype)
+            self.upper_ = np.asarray(self.fcast_.rx2["upper"], dtype=self.dtype)
+
+            self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
 
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
+        return self
 
-        self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
+    @timed_forecast
+    def forecast_many(self, dfs):
+        """Forecast each data frame of a collection
 
-        return self
+        The "r" backend forecasts all of them in one R call.
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                or a panel indexed by (input id, date)
+
+        Sets `mean_`, `lower_`, `upper_` as (n_data_frames, h) arrays, and
+        `output_dates_` as a list of output dates for each data frame.
+
+        """
+        return self._forecast_many(dfs, "dynrm", univariate=True)
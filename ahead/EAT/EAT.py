@@ -1,6 +1,8 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast, timing_stage
 from ..utils import univariate as uv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -29,6 +31,11 @@ class EAT(Base):
             - "original": yyyy-mm-dd
             - "ms": milliseconds
 
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_` and `upper_`: "float64", or "float32"
+            to halve their memory (forecasts are computed in double
+            precision, and cast once)
+
     Attributes:
 
         fcast_: an object;
@@ -85,6 +92,7 @@ class EAT(Base):
         weights=None,
         type_pi="E",
         date_formatting="original",
+        dtype="float64",
     ):
 
         super().__init__(h=h, level=level)
@@ -97,6 +105,7 @@ class EAT(Base):
         self.weights = weights
         self.type_pi = type_pi
         self.date_formatting = date_formatting
+        self.dtype = dtype
         self.input_df = None
         self.type_input = "univariate"
 
@@ -109,6 +118,8 @@ class EAT(Base):
         self.upper_ = []
         self.result_df_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `EAT` class
 
@@ -128,21 +139,41 @@ class EAT(Base):
         self.get_forecast("eat")
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = uv.format_univariate_forecast(
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
+        with timing_stage(self, "format_output"):
+            (
+                self.averages_,
+                self.ranges_,
+                _,
+            ) = uv.format_univariate_forecast(
+                date_formatting=self.date_formatting,
+                output_dates=self.output_dates_,
+                horizon=self.h,
+                fcast=self.fcast_,
+                frequency=self.frequency,
+            )
+
+            self.mean_ = np.asarray(self.fcast_.rx2["mean"], dtype=self.dtype)
+            self.lower_ = np.asarray(self.fcast_.rx2["lower"], dtype=self.dtype)
+            self.upper_ = np.asarray(self.fcast_.rx2["upper"], dtype=self.dtype)
+
+            self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
 
         return self
+
+    @timed_forecast
+    def forecast_many(self, dfs):
+        """Forecast each data frame of a collection
+
+        The "r" backend forecasts all of them in one R call.
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                or a panel indexed by (input id, date)
+
+        Sets `mean_`, `lower_`, `upper_` as (n_data_frames, h) arrays, and
+        `output_dates_` as a list of output dates for each data frame.
+
+        """
+        return self._forecast_many(dfs, "eat", univariate=True)
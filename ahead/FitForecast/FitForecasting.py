@@ -1,11 +1,12 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast, timing_stage
 from ..utils import univariate as uv
 from ..utils import unimultivariate as umv
 from ..utils import multivariate as mv
 from .. import config
-from rpy2.robjects import NULL as rNULL
 
 
 class FitForecaster(Base):
@@ -55,6 +56,8 @@ class FitForecaster(Base):
         vol="constant",
         type_sim="kde",
         date_formatting="original",
+        sims_layout="tuple",
+        dtype="float64",
     ):
 
         super().__init__(
@@ -73,6 +76,9 @@ class FitForecaster(Base):
         self.vol = vol
         self.type_sim = type_sim
         self.date_formatting = date_formatting
+        self.dtype = dtype
+        self.sims_layout = sims_layout
+        self.forecasting_method = None
         self.input_df = None
 
         self.fcast_ = None
@@ -84,8 +90,7 @@ class FitForecaster(Base):
         self.upper_ = []
         self.result_df_ = None
 
-    def fit_forecast(self, df, method="thetaf"):
-
+    def _check_method(self, method):
         assert method in (
             "thetaf",
             "arima",
@@ -99,6 +104,12 @@ class FitForecaster(Base):
             "snaive",
         ), 'must have method in ("thetaf", "arima", "ets", "te", "tbats", "tslm", "dynrmf", "ridge2f", "naive", "snaive")'
 
+    @timed_forecast
+    @cached_forecast
+    def fit_forecast(self, df, method="thetaf"):
+
+        self._check_method(method)
+
         # keep it in this order
         h = None
         if self.h is not None:
@@ -114,53 +125,76 @@ class FitForecaster(Base):
 
         self.method = method
 
-        self.fcast_ = config.AHEAD_PACKAGE.fitforecast(
-            y=self.input_ts_,
-            h=rNULL if h is None else h,
-            pct_train=self.pct_train,
-            pct_calibration=self.pct_calibration,
-            method=self.method,
-            level=self.level,
-            B=self.B,
-            seed=self.seed,
-            conformalize=self.conformalize,
-            type_calibration=self.type_calibration,
-        )
+        with timing_stage(self, "get_forecast"):
+            self.fcast_ = config.AHEAD_PACKAGE.fitforecast(
+                y=self.input_ts_,
+                h=config.R("NULL") if h is None else h,
+                pct_train=self.pct_train,
+                pct_calibration=self.pct_calibration,
+                method=self.method,
+                level=self.level,
+                B=self.B,
+                seed=self.seed,
+                conformalize=self.conformalize,
+                type_calibration=self.type_calibration,
+            )
 
         # result -----
         if df.shape[1] > 1:
-            (
-                self.averages_,
-                self.ranges_,
-                _,
-            ) = mv.format_multivariate_forecast(
-                n_series=self.n_series,
-                date_formatting=self.date_formatting,
-                output_dates=self.output_dates_,
-                horizon=self.h,
-                fcast=self.fcast_,
-            )
+            self.format_multivariate_output()
         else:
-            (
-                self.averages_,
-                self.ranges_,
-                _,
-            ) = uv.format_univariate_forecast(
-                date_formatting=self.date_formatting,
-                output_dates=self.output_dates_,
-                horizon=self.h,
-                fcast=self.fcast_,
-            )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_dfs_ = umv.compute_result_df(self.averages_, self.ranges_)
+            with timing_stage(self, "format_output"):
+                (
+                    self.averages_,
+                    self.ranges_,
+                    _,
+                ) = uv.format_univariate_forecast(
+                    date_formatting=self.date_formatting,
+                    output_dates=self.output_dates_,
+                    horizon=self.h,
+                    fcast=self.fcast_,
+                    frequency=self.frequency,
+                )
+
+                self.mean_ = np.asarray(self.fcast_.rx2["mean"], dtype=self.dtype)
+                self.lower_ = np.asarray(self.fcast_.rx2["lower"], dtype=self.dtype)
+                self.upper_ = np.asarray(self.fcast_.rx2["upper"], dtype=self.dtype)
+
+                self.result_dfs_ = umv.compute_result_df(
+                    self.averages_, self.ranges_
+                )
 
         if "sims" in list(self.fcast_.names):
-            self.sims_ = tuple(
-                np.asarray(self.fcast_.rx2["sims"][i]) for i in range(self.B)
-            )
+            self.format_sims()
 
         return self
+
+    @timed_forecast
+    def forecast_many(self, dfs, method="thetaf"):
+        """Fit and forecast each data frame of a collection, in one R call
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                with the same number of series, or a panel indexed by
+                (input id, date)
+
+            method: a string;
+                forecasting method (see `fit_forecast`)
+
+        Sets `mean_`, `lower_`, `upper_` as stacked arrays ((n_data_frames,
+        h) for univariate series, (n_data_frames, h, n_series) otherwise),
+        and `output_dates_` as a list of output dates for each data frame.
+        When `h` is None, it's derived from the first data frame.
+
+        """
+        self._check_method(method)
+        dfs = self._split_inputs(dfs)
+        if self.h is None:
+            n_obs = dfs[0].shape[0]
+            self.h = n_obs - int(np.floor(n_obs * self.pct_train))
+        self.forecasting_method = method
+        self._forecast_many(dfs, "fitforecast", univariate=dfs[0].shape[1] == 1)
+        self.method = method
+        return self
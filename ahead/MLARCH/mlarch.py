@@ -1,6 +1,8 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast, timing_stage
 from ..utils import univariate as uv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -38,6 +40,11 @@ class MLARCH(Base):
             - "original": yyyy-mm-dd
             - "ms": milliseconds
 
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_` and `upper_`: "float64", or "float32"
+            to halve their memory (forecasts are computed in double
+            precision, and cast once)
+
     Attributes:
 
         fcast_: an object;
@@ -96,6 +103,7 @@ class MLARCH(Base):
         type_sim_conformalize="block-bootstrap",
         seed=123,
         date_formatting="original",
+        dtype="float64",
     ):
 
         super().__init__(h=h, level=level)
@@ -107,6 +115,7 @@ class MLARCH(Base):
         self.type_sim_conformalize = type_sim_conformalize  
         self.seed = seed
         self.date_formatting = date_formatting
+        self.dtype = dtype
         self.input_df = None
         self.type_input = "univariate"
 
@@ -119,6 +128,8 @@ class MLARCH(Base):
         self.upper_ = []
         self.result_df_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `MLARCH` class
 
@@ -140,21 +151,23 @@ class MLARCH(Base):
         print(f"MLARCH: {self.fcast_}")
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = uv.format_univariate_forecast(
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
+        with timing_stage(self, "format_output"):
+            (
+                self.averages_,
+                self.ranges_,
+                _,
+            ) = uv.format_univariate_forecast(
+                date_formatting=self.date_formatting,
+                output_dates=self.output_dates_,
+                horizon=self.h,
+                fcast=self.fcast_,
+                frequency=self.frequency,
+            )
+
+            self.mean_ = np.asarray(self.fcast_.rx2["mean"], dtype=self.dtype)
+            self.lower_ = np.asarray(self.fcast_.rx2["lower"], dtype=self.dtype)
+            self.upper_ = np.asarray(self.fcast_.rx2["upper"], dtype=self.dtype)
+
+            self.result_df_ = umv.compute_result_df(self.averages_, self.ranges_)
 
         return self
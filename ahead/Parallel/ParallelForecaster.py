@@ -0,0 +1,303 @@
+import copy
+import numpy as np
+
+from . import transport
+from .pool import get_chunks, get_n_jobs, start_r, worker_pool
+
+
+# prediction intervals with simulations (`sims_`)
+_SIMULATED_TYPE_PI = (
+    "bootstrap",
+    "blockbootstrap",
+    "movingblockbootstrap",
+    "rvinecopula",
+)
+
+# worker process state, set by `_init_worker`
+_ESTIMATOR = None  # estimator template
+_PANEL = None  # shared inputs (`transport.SharedPanel`)
+_OUTPUTS = None  # shared outputs (`transport.SharedOutputs`)
+
+
+def _init_worker(estimator, warm_start, panel=None, outputs=None):
+    global _ESTIMATOR, _PANEL, _OUTPUTS
+    _ESTIMATOR = estimator
+    _PANEL = panel
+    _OUTPUTS = outputs
+    if warm_start:
+        start_r(estimator)
+
+
+def _get_result(obj):
+    # arrays and dates only: R objects (e.g `fcast_`) can't be pickled
+    return {
+        "mean_": np.asarray(obj.mean_),
+        "lower_": np.asarray(obj.lower_),
+        "upper_": np.asarray(obj.upper_),
+        "sims_": getattr(obj, "sims_", None),
+        "output_dates_": obj.output_dates_,
+        "backend_": obj.backend_,
+    }
+
+
+def _get_metadata(obj):
+    # forecasts are in the shared outputs
+    return {
+        "output_dates_": obj.output_dates_,
+        "backend_": obj.backend_,
+        "ndim": np.ndim(obj.mean_),
+        "has_sims": getattr(obj, "sims_", None) is not None,
+    }
+
+
+def _forecast_chunk(args):
+    # inputs: data frames (pickled), or bounds of the inputs in `_PANEL`
+    dfs, method, kwargs = args
+    if _PANEL is not None:
+        start, end = dfs
+        dfs = [_PANEL.get_df(i) for i in range(start, end)]
+    if method == "forecast_many":
+        obj = copy.deepcopy(_ESTIMATOR)
+        getattr(obj, method)(dfs, **kwargs)
+        if _OUTPUTS is None:
+            return [_get_result(obj)]
+        _OUTPUTS.write(slice(start, end), obj)
+        return [_get_metadata(obj)]
+    res = []
+    for i, df in enumerate(dfs):
+        obj = copy.deepcopy(_ESTIMATOR)
+        getattr(obj, method)(df, **kwargs)
+        if _OUTPUTS is None:
+            res.append(_get_result(obj))
+        else:
+            _OUTPUTS.write(start + i, obj)
+            res.append(_get_metadata(obj))
+    return res
+
+
+class ParallelForecaster(object):
+    """Forecast a collection of time series in worker processes
+
+    Embedded R is single-threaded: each worker process imports `ahead`
+    and starts R once, then forecasts its share of the inputs with a copy
+    of `estimator`.
+
+    Parameters:
+
+        estimator: an object;
+            a (not yet used) estimator, e.g `Ridge2Regressor(h=5)`
+
+        n_jobs: an integer;
+            number of worker processes (default: number of cores); with
+            `n_jobs=1`, inputs are forecast in the current process
+
+        chunksize: an integer;
+            number of inputs per task (default: inputs split in about 4
+            tasks per worker)
+
+        method: a string;
+            estimator's method called on each input ("forecast" or
+            "fit_forecast"), or "forecast_many" (each chunk of inputs
+            forecast in one call)
+
+        warm_start: a boolean;
+            start R in each worker when it starts (if the estimator can
+            use R), rather than on its first forecast
+
+        threads_per_worker: an integer;
+            number of BLAS/OpenMP threads in each worker (unless set in
+            the environment); None to leave them unset
+
+        start_method: a string;
+            multiprocessing start method; "spawn" by default, as embedded
+            R can't be safely forked
+
+        transport: a string;
+            how inputs and forecasts are exchanged with the workers:
+            "pickle", or "shared" (memory-mapped files, in /dev/shm when
+            available: inputs are written once, workers write forecasts
+            in place and results are views of the shared arrays)
+
+        keep_sims: a boolean;
+            with `transport="shared"`, also collect the estimator's `B`
+            simulations of each input in `sims_` (method="forecast", and
+            `type_pi` "bootstrap", "blockbootstrap", "movingblockbootstrap"
+            or "rvinecopula")
+
+    Attributes:
+
+        results_: a list of dicts;
+            `mean_`, `lower_`, `upper_`, `sims_`, `output_dates_` and
+            `backend_` for each input, in input order
+            (method="forecast_many": for each chunk); only dates and
+            backend with `transport="shared"`
+
+        mean_: a numpy array
+            stacked mean forecasts, one row per input
+
+        lower_: a numpy array
+            stacked lower bounds, one row per input
+
+        upper_: a numpy array
+            stacked upper bounds, one row per input
+
+        output_dates_: a list;
+            output dates for each input
+
+        sims_: a numpy array
+            (n_inputs, B, h, n_series) simulations (`keep_sims=True`), or
+            None
+
+    Examples:
+
+    ```python
+    from ahead import ParallelForecaster, Ridge2Regressor
+
+    # dfs: a list of data frames
+    pf = ParallelForecaster(Ridge2Regressor(h=5), n_jobs=8)
+    pf.forecast(dfs)
+    print(pf.mean_.shape) # (len(dfs), 5, n_series)
+
+    # no pickling of inputs and simulations
+    pf = ParallelForecaster(
+        Ridge2Regressor(h=5, type_pi="bootstrap", B=250),
+        transport="shared",
+        keep_sims=True,
+    )
+    pf.forecast(dfs)
+    print(pf.sims_.shape) # (len(dfs), 250, 5, n_series)
+    ```
+
+    """
+
+    def __init__(
+        self,
+        estimator,
+        n_jobs=None,
+        chunksize=None,
+        method="forecast",
+        warm_start=True,
+        threads_per_worker=1,
+        start_method="spawn",
+        transport="pickle",
+        keep_sims=False,
+    ):
+        assert n_jobs is None or n_jobs >= 1, "must have: n_jobs >= 1"
+        assert transport in (
+            "pickle",
+            "shared",
+        ), "must have: transport in ('pickle', 'shared')"
+        self.estimator = estimator
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+        self.method = method
+        self.warm_start = warm_start
+        self.threads_per_worker = threads_per_worker
+        self.start_method = start_method
+        self.transport = transport
+        self.keep_sims = keep_sims
+
+        self.results_ = None
+        self.mean_ = None
+        self.lower_ = None
+        self.upper_ = None
+        self.output_dates_ = None
+        self.sims_ = None
+
+    def get_chunks(self, n_inputs, n_jobs):
+        """Bounds (start, end) of the chunks of inputs sent to workers"""
+        return get_chunks(n_inputs, n_jobs, self.chunksize)
+
+    def forecast(self, dfs, **kwargs):
+        """Forecast each data frame of `dfs`
+
+        Parameters:
+
+            dfs: a list of data frames;
+                input time series (with the same number of series)
+
+            **kwargs: additional parameters of the estimator's method,
+                used for every input (e.g `xreg`)
+
+        """
+        dfs = list(dfs)
+        assert len(dfs) > 0, "must have: at least one data frame in `dfs`"
+        n_jobs = get_n_jobs(self.n_jobs, len(dfs))
+        chunks = self.get_chunks(len(dfs), n_jobs)
+
+        panel = outputs = directory = None
+        if self.transport == "shared":
+            assert self.estimator.h is not None, "must have: `h` not None"
+            directory = transport.get_shared_directory()
+            panel = transport.SharedPanel(dfs, directory)
+            outputs = transport.SharedOutputs(
+                directory,
+                n_inputs=len(dfs),
+                h=self.estimator.h,
+                n_series=dfs[0].shape[1],
+                B=self.estimator.B if self._collects_sims() else 0,
+                dtype=getattr(self.estimator, "dtype", np.float64),
+            )
+            tasks = [(chunk, self.method, kwargs) for chunk in chunks]
+        else:
+            tasks = [
+                (dfs[start:end], self.method, kwargs) for start, end in chunks
+            ]
+
+        try:
+            results = self._run(tasks, n_jobs, panel, outputs)
+            if outputs is not None:
+                arrays = outputs.get_arrays()
+        finally:
+            if directory is not None:
+                transport.release_directory(directory)
+
+        self.results_ = [res for chunk in results for res in chunk]
+        if self.method == "forecast_many":
+            self.output_dates_ = [
+                dates for res in self.results_ for dates in res["output_dates_"]
+            ]
+        else:
+            self.output_dates_ = [res["output_dates_"] for res in self.results_]
+
+        if outputs is None:
+            stack = np.concatenate if self.method == "forecast_many" else np.stack
+            self.mean_, self.lower_, self.upper_ = (
+                stack([res[key] for res in self.results_])
+                for key in ("mean_", "lower_", "upper_")
+            )
+            return self
+
+        # views of the shared arrays, shaped as the estimator's forecasts
+        ndim = self.results_[0]["ndim"] + (self.method != "forecast_many")
+        for key in ("mean_", "lower_", "upper_"):
+            setattr(self, key, arrays[key] if ndim == 3 else arrays[key][..., 0])
+        # all-zero buffer if no worker wrote simulations
+        has_sims = any(res["has_sims"] for res in self.results_)
+        self.sims_ = arrays.get("sims_") if has_sims else None
+        return self
+
+    def _collects_sims(self):
+        # simulations only exist for `forecast`, with simulated intervals
+        return (
+            self.keep_sims
+            and self.method == "forecast"
+            and getattr(self.estimator, "type_pi", None) in _SIMULATED_TYPE_PI
+            and getattr(self.estimator, "keep_sims", True)
+        )
+
+    def _run(self, tasks, n_jobs, panel=None, outputs=None):
+        with worker_pool(
+            n_jobs,
+            initializer=_init_worker,
+            initargs=(
+                self.estimator,
+                self.warm_start and n_jobs > 1,
+                panel,
+                outputs,
+            ),
+            threads_per_worker=self.threads_per_worker,
+            start_method=self.start_method,
+        ) as map_function:
+            # results are collected in the order of the tasks
+            return list(map_function(_forecast_chunk, tasks))
@@ -0,0 +1,4 @@
+from .ParallelForecaster import ParallelForecaster
+from .pool import worker_pool
+
+__all__ = ["ParallelForecaster", "worker_pool"]
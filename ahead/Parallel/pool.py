@@ -0,0 +1,132 @@
+import os
+
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+from .. import config
+
+
+# Worker processes shared by `ParallelForecaster`, `cross_validate` and
+# `Ridge2Search`: each of them sends its (read-only) state once to every
+# worker, through the pool's initializer, then maps tasks on the workers.
+
+# BLAS/OpenMP pools in each worker: one thread by default, so that
+# workers (and not threads inside them) share the cores
+_THREADS_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def get_n_jobs(n_jobs, n_tasks):
+    """Number of worker processes for `n_tasks` (at most one per task;
+    None: number of cores)"""
+    n_jobs = n_jobs if n_jobs is not None else os.cpu_count() or 1
+    return max(1, min(n_jobs, n_tasks))
+
+
+def get_chunks(n_items, n_jobs, chunksize=None):
+    """Bounds (start, end) of chunks of `n_items` items (default chunk
+    size: items split in about 4 chunks per worker)"""
+    if chunksize is None:
+        chunksize = max(1, -(-n_items // (4 * n_jobs)))
+    return [
+        (start, min(start + chunksize, n_items))
+        for start in range(0, n_items, chunksize)
+    ]
+
+
+def start_r(estimator):
+    """Start embedded R in this process, if `estimator` can use it, so that
+    all the tasks of a worker reuse it"""
+    if (
+        getattr(estimator, "backend", None) in (None, "r")
+        and config.r_is_installed()
+        and find_spec("rpy2") is not None
+    ):
+        config.load_runtime()
+
+
+@contextmanager
+def worker_environment(threads_per_worker):
+    """Environment inherited by the worker processes started in the block:
+    `threads_per_worker` BLAS/OpenMP threads (unless already set)"""
+    previous = {name: os.environ.get(name) for name in _THREADS_VARIABLES}
+    if threads_per_worker is not None:
+        for name in _THREADS_VARIABLES:
+            os.environ.setdefault(name, str(threads_per_worker))
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextmanager
+def worker_pool(
+    n_jobs,
+    initializer=None,
+    initargs=(),
+    threads_per_worker=1,
+    start_method="spawn",
+):
+    """Map function running tasks in worker processes
+
+    Parameters:
+
+        n_jobs: an integer;
+            number of worker processes; with `n_jobs=1`, tasks run in the
+            current process
+
+        initializer: a function;
+            sets the state of a worker (module-level globals) from
+            `initargs`; in the current process, it's called again with
+            None arguments when the block exits
+
+        initargs: a tuple;
+            arguments of `initializer`, pickled once per worker
+
+        threads_per_worker: an integer;
+            number of BLAS/OpenMP threads in each worker (unless set in
+            the environment); None to leave them unset
+
+        start_method: a string;
+            multiprocessing start method; "spawn" by default, as embedded
+            R can't be safely forked
+
+    Yields a function as `map` (results in the order of the tasks).
+
+    Examples:
+
+    ```python
+    with worker_pool(4, _init_worker, (x,)) as map_function:
+        results = list(map_function(_task, tasks))
+    ```
+
+    """
+    if n_jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        try:
+            yield map
+        finally:
+            if initializer is not None:
+                initializer(*[None] * len(initargs))
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with worker_environment(threads_per_worker):
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=initializer,
+            initargs=initargs,
+        ) as executor:
+            yield executor.map
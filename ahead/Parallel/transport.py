@@ -0,0 +1,200 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+# Arrays shared between processes are memory-mapped files, preferably in
+# RAM-backed /dev/shm: a worker maps them once (see `attach_array`) and
+# reads or writes them in place, and only their (small) descriptors are
+# pickled. Once every process has mapped a file, it can be deleted: the
+# mappings stay valid (on POSIX systems) until the arrays are garbage
+# collected, so the parent's results are plain NumPy views, with no
+# segment to close or unlink.
+
+_ATTACHED = {}  # path -> array mapped in this process
+
+
+def get_shared_directory(directory=None):
+    """Create a temporary directory for shared arrays (in /dev/shm if possible)"""
+    if directory is None and os.access("/dev/shm", os.W_OK):
+        directory = "/dev/shm"
+    return tempfile.mkdtemp(prefix="ahead-", dir=directory)
+
+
+def create_array(directory, name, shape, dtype=np.float64):
+    """Create a zero-filled shared array, return its descriptor and the array
+
+    Parameters:
+
+        directory: a string;
+            directory of the memory-mapped file (see `get_shared_directory`)
+
+        name: a string;
+            file name
+
+        shape: a tuple;
+            array shape
+
+        dtype: a numpy dtype;
+            array type
+
+    """
+    descriptor = (
+        os.path.join(directory, name + ".dat"),
+        tuple(int(n) for n in shape),
+        np.dtype(dtype).str,
+    )
+    if np.prod(descriptor[1]) == 0:
+        return descriptor, np.zeros(shape, dtype=dtype)
+    res = np.memmap(descriptor[0], mode="w+", dtype=dtype, shape=descriptor[1])
+    _ATTACHED[descriptor[0]] = res
+    return descriptor, res
+
+
+def attach_array(descriptor):
+    """Map the shared array described by `descriptor` (once per process)"""
+    path, shape, dtype = descriptor
+    if np.prod(shape) == 0:
+        return np.zeros(shape, dtype=dtype)
+    try:
+        return _ATTACHED[path]
+    except KeyError:
+        res = _ATTACHED[path] = np.memmap(path, mode="r+", dtype=dtype, shape=shape)
+        return res
+
+
+def release_directory(directory):
+    """Delete the shared arrays' files (mapped arrays remain usable)"""
+    for path in list(_ATTACHED):
+        if os.path.dirname(path) == directory:
+            del _ATTACHED[path]
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class SharedPanel(object):
+    """Data frames written once to shared memory, rebuilt (without copy
+    of their values) in worker processes
+
+    Values are stacked in a (total number of rows, n_series) array, dates
+    in a datetime64 array, with the offsets of each data frame's rows.
+    Only the descriptors of these arrays (and column names) are pickled;
+    indexes other than (timezone-naive) `DatetimeIndex`es, e.g strings or
+    integers, are pickled as they are.
+
+    Parameters:
+
+        dfs: a list of data frames;
+            with the same number of series
+
+        directory: a string;
+            directory of the memory-mapped files
+
+    """
+
+    def __init__(self, dfs, directory):
+        lengths = np.array([df.shape[0] for df in dfs], dtype=np.int64)
+        self.columns = list(dfs[0].columns)
+        n_series = len(self.columns)
+        self.offsets_ = np.concatenate(([0], np.cumsum(lengths))).tolist()
+        self.values_descriptor, values = create_array(
+            directory, "values", (self.offsets_[-1], n_series)
+        )
+        self.dates_descriptor, dates = create_array(
+            directory, "dates", (self.offsets_[-1],), dtype=np.int64
+        )
+        # None: index in the shared dates, with its name in `index_names_`
+        self.indexes_ = []
+        self.index_names_ = []
+        for i, df in enumerate(dfs):
+            assert (
+                df.shape[1] == n_series
+            ), "must have: the same number of series in each data frame"
+            start, end = self.offsets_[i], self.offsets_[i + 1]
+            values[start:end] = df.to_numpy(dtype=np.float64)
+            self.index_names_.append(df.index.name)
+            if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is None:
+                dates[start:end] = np.asarray(
+                    df.index, dtype="datetime64[ns]"
+                ).view(np.int64)
+                self.indexes_.append(None)
+            else:
+                self.indexes_.append(df.index)
+
+    def __len__(self):
+        return len(self.offsets_) - 1
+
+    def get_df(self, i):
+        """Data frame `i`, its values being a view of the shared array"""
+        start, end = self.offsets_[i], self.offsets_[i + 1]
+        values = attach_array(self.values_descriptor)[start:end]
+        index = self.indexes_[i]
+        if index is None:
+            dates = attach_array(self.dates_descriptor)[start:end]
+            index = pd.DatetimeIndex(
+                np.asarray(dates).view("datetime64[ns]"), name=self.index_names_[i]
+            )
+        return pd.DataFrame(
+            np.asarray(values),
+            index=index,
+            columns=self.columns,
+            copy=False,
+        )
+
+
+class SharedOutputs(object):
+    """Preallocated shared arrays receiving the workers' forecasts
+
+    Parameters:
+
+        directory: a string;
+            directory of the memory-mapped files
+
+        n_inputs: an integer;
+            number of forecast inputs
+
+        h: an integer;
+            forecasting horizon
+
+        n_series: an integer;
+            number of series
+
+        B: an integer;
+            number of simulations kept for each input (0: none)
+
+        dtype: a numpy dtype;
+            type of the forecasts (the estimator's `dtype`)
+
+    """
+
+    keys = ("mean_", "lower_", "upper_")
+
+    def __init__(self, directory, n_inputs, h, n_series, B=0, dtype=np.float64):
+        self.descriptors = {
+            key: create_array(directory, key, (n_inputs, h, n_series), dtype)[0]
+            for key in self.keys
+        }
+        if B > 0:
+            self.descriptors["sims_"] = create_array(
+                directory, "sims_", (n_inputs, B, h, n_series), dtype
+            )[0]
+
+    def write(self, i, obj):
+        """Write the forecasts of estimator `obj` as those of input(s) `i`
+        (an integer, or a slice for `forecast_many` results)"""
+        for key, descriptor in self.descriptors.items():
+            value = getattr(obj, key)
+            if value is None:  # e.g no simulations
+                continue
+            out = attach_array(descriptor)[i]
+            if key == "sims_" and not isinstance(value, np.ndarray):
+                value = np.stack(value)  # tuple of (h, n_series) arrays
+            out[...] = np.asarray(value).reshape(out.shape)
+
+    def get_arrays(self):
+        """Shared arrays, as NumPy views (no copy)"""
+        return {
+            key: attach_array(descriptor).view(np.ndarray)
+            for key, descriptor in self.descriptors.items()
+        }
@@ -1,14 +1,8 @@
-import matplotlib.pyplot as plt
 import numpy as np
-import rpy2.robjects.conversion as cv
-from rpy2.robjects import (
-    FloatVector,
-    ListVector,
-    numpy2ri,
-    r,
-)
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast
 from ..utils import multivariate as mv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -88,6 +82,34 @@ class Ridge2Regressor(Base):
         seed: an integer;
             reproducibility seed for type_pi == 'bootstrap'
 
+        sims_layout: a string;
+            layout of `sims_`: "tuple" (B arrays of shape (h, n_series))
+            or "array" (one (B, h, n_series) array)
+
+        backend: a string;
+            execution engine: "r" (R package 'ahead'), "numpy"
+            (in-process, no R; `type_pi` in "gaussian", "bootstrap",
+            "blockbootstrap", "movingblockbootstrap"), or None for the
+            process-wide default (see `ahead.backends`)
+
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_`, `upper_` and `sims_`: "float64", or
+            "float32" to halve their memory (forecasts are computed in
+            double precision, and cast once)
+
+        keep_sims: a boolean;
+            keep the simulations in `sims_` (bootstrap intervals), or
+            summarize them as they are produced (in `variance_` and
+            `quantiles_`), so that memory doesn't grow with `B`; prediction
+            intervals are then streaming estimates of the quantiles. Unless
+            a backend is chosen, the "numpy" backend is then used when it
+            supports `type_pi`: R functions produce all the simulations
+            (only summarized in R, before being transferred)
+
+        quantiles: a list of floats;
+            probabilities of quantiles of the simulations, set in
+            `quantiles_`
+
     Attributes:
 
         fcast_: an object;
@@ -116,8 +138,17 @@ class Ridge2Regressor(Base):
             mean forecast, lower + upper prediction intervals,
             and a date index
 
-        sims_: currently a tuple of numpy arrays
+        sims_: a tuple of numpy arrays, or a numpy array
             for `type_pi == bootstrap`, simulations for each series
+            (see `sims_layout`)
+
+        quantiles_: a numpy array
+            (len(quantiles), h, n_series) quantiles of the simulations, if
+            `quantiles` is not None
+
+        variance_: a numpy array
+            (h, n_series) variance of the simulations, with
+            `keep_sims=False` or `quantiles`
 
     Examples:
 
@@ -165,6 +196,11 @@ class Ridge2Regressor(Base):
         cl=1,
         date_formatting="original",
         seed=123,
+        sims_layout="tuple",
+        backend=None,
+        dtype="float64",
+        keep_sims=True,
+        quantiles=None,
     ):
 
         super().__init__(
@@ -191,7 +227,12 @@ class Ridge2Regressor(Base):
         self.type_clustering = type_clustering
         self.cl = cl
         self.date_formatting = date_formatting
+        self.dtype = dtype
+        self.keep_sims = keep_sims
+        self.quantiles = quantiles
         self.seed = seed
+        self.sims_layout = sims_layout
+        self.backend = backend
         self.input_df = None
         self.type_input = "multivariate"
 
@@ -206,6 +247,8 @@ class Ridge2Regressor(Base):
         self.sims_ = None
         self.xreg_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df, xreg=None):
         """Forecasting method from `Ridge2Regressor` class
 
@@ -225,29 +268,10 @@ class Ridge2Regressor(Base):
         # obtain time series object -----
         self.format_input()
 
-        self.get_forecast("ridge2")
+        self.get_forecast("ridge2", xreg=xreg)
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = mv.format_multivariate_forecast(
-            n_series=self.n_series,
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
-
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
-
-        self.result_dfs_ = tuple(
-            umv.compute_result_df(self.averages_[i], self.ranges_[i])
-            for i in range(self.n_series)
-        )
+        self.format_multivariate_output()
 
         if self.type_pi in (
             "bootstrap",
@@ -255,8 +279,51 @@ class Ridge2Regressor(Base):
             "movingblockbootstrap",
             "rvinecopula",
         ):
-            self.sims_ = tuple(
-                np.asarray(self.fcast_.rx2["sims"][i]) for i in range(self.B)
-            )
+            self.format_sims()
 
         return self
+
+    @timed_forecast
+    def update(self, new_rows, xreg=None):
+        """Append new observations to the input and forecast again
+
+        With the "numpy" backend (and no dropout), the model is refitted
+        from running sums in O(number of new rows): the hidden layer's
+        scaling and the clusters (`centers`) are kept from the first fit,
+        and new rows are assigned to the nearest cluster centroid. With
+        dropout, or another backend, the forecast is computed from scratch
+        (the "numpy" backend then emits a warning).
+
+        Parameters:
+
+            new_rows: a data frame;
+                new observations of the input time series, with the same
+                columns, dated after the last input date (at the input's
+                frequency)
+
+            xreg: a numpy array or a data frame;
+                external regressors of the new observations (if `forecast`
+                was called with `xreg`)
+
+        """
+        return self._update(new_rows, xreg=xreg)
+
+    @timed_forecast
+    def forecast_many(self, dfs):
+        """Forecast each data frame of a collection
+
+        The "r" backend forecasts all of them in one R call.
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                with the same number of series, or a panel indexed by
+                (input id, date)
+
+        Sets `mean_`, `lower_`, `upper_` as (n_data_frames, h, n_series)
+        arrays, and `output_dates_` as a list of output dates for each data
+        frame.
+
+        """
+        return self._forecast_many(dfs, "ridge2")
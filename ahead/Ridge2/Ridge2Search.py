@@ -0,0 +1,368 @@
+import copy
+import math
+import numpy as np
+import pandas as pd
+
+from ..Parallel.pool import get_n_jobs, worker_pool
+from ..utils.tscv_indices import get_tscv_indices
+from . import ridge2f as r2
+
+
+# `Ridge2Regressor` hyperparameters used to fit the candidates
+_FIT_PARAMS = (
+    "lags",
+    "nb_hidden",
+    "nodes_sim",
+    "activation",
+    "a",
+    "lambda_1",
+    "lambda_2",
+    "dropout",
+    "seed",
+)
+_INTEGER_PARAMS = ("lags", "nb_hidden")
+
+# worker process state, set by `_init_worker`
+_X = None  # input series, (n, n_series)
+_BOUNDS = None  # (n_folds, 3): training start and end, test end
+_DESIGNS = {}  # lags -> responses and regressors of the whole input
+
+
+def _init_worker(x, bounds):
+    global _X, _BOUNDS
+    _X = x
+    _BOUNDS = bounds
+    _DESIGNS.clear()
+
+
+def _get_design(lags):
+    # lagged design matrices, shared by the candidates with the same lags
+    try:
+        return _DESIGNS[lags]
+    except KeyError:
+        res = _DESIGNS[lags] = r2.create_train_inputs(_X, lags)
+        return res
+
+
+def _score_folds(args):
+    # losses of candidate `params` on folds `folds` (mean squared or
+    # absolute errors of the mean forecasts)
+    params, folds, metric = args
+    lags = int(params["lags"])
+    fit_params = {name: params[name] for name in _FIT_PARAMS}
+    centers = params.get("centers")
+    res = np.empty(len(folds))
+    for i, fold in enumerate(folds):
+        start, end, test_end = _BOUNDS[fold]
+        x = _X[start:end]
+        if centers is not None and centers > 0:
+            # clusters of each training set: no shared design matrices
+            x = np.hstack(
+                (
+                    x,
+                    r2.get_clusters(
+                        x, int(centers), params["type_clustering"], params["seed"]
+                    ),
+                )
+            )
+            train_inputs = None
+        else:
+            y, regressors = _get_design(lags)
+            train_inputs = (y[start : end - lags], regressors[start : end - lags])
+        fit = r2.fit_ridge2(x, train_inputs=train_inputs, **fit_params)
+        mean = fit.forecast(x, test_end - end)[:, : _X.shape[1]]
+        errors = _X[end:test_end] - mean
+        res[i] = np.mean(errors**2) if metric == "rmse" else np.mean(np.abs(errors))
+    return res
+
+
+class Ridge2Search(object):
+    """Hyperparameter search for `Ridge2Regressor`, on rolling-origin folds
+
+    Candidates are sampled from `param_distributions` and scored by the
+    error of their mean forecasts on the most recent cross-validation
+    folds (see `get_tscv_indices`). With successive halving, all the
+    candidates are scored on a few folds, and only the best `1/eta` of
+    them on `eta` times more folds, until the best ones are scored on all
+    the folds; Hyperband runs successive halving with several trade-offs
+    between the number of candidates and their initial number of folds.
+
+    Candidates are fitted in-process by the NumPy Ridge2 model (see
+    `ridge2f`), whatever the estimator's backend; those with the same
+    `lags` share the lagged design matrices of the input.
+
+    Parameters:
+
+        estimator: a `Ridge2Regressor`;
+            provides the hyperparameters that are not searched, and the
+            forecasting horizon `h` (the size of the test sets)
+
+        param_distributions: a dict;
+            hyperparameter name (`lags`, `nb_hidden`, `nodes_sim`,
+            `activation`, `a`, `lambda_1`, `lambda_2`, `dropout`) -> list
+            of values (sampled uniformly), or distribution with a
+            `rvs(random_state=...)` method (e.g from `scipy.stats`)
+
+        strategy: a string;
+            "random" (every candidate scored on all the folds), "halving"
+            (successive halving) or "hyperband"
+
+        n_candidates: an integer;
+            number of candidates ("random", "halving")
+
+        eta: an integer;
+            halving rate: the best `1/eta` candidates are kept at each step
+
+        initial_window: an integer;
+            number of observations in the first training set (default:
+            half of the input)
+
+        fixed_window: a boolean;
+            training sets of `initial_window` observations (rolling window),
+            or starting at the first observation (expanding window)
+
+        max_folds: an integer;
+            number of (most recent) folds used for the final scores
+            (default: all of them)
+
+        min_folds: an integer;
+            number of folds of the first step of successive halving
+            (default: such that the best candidate is scored on `max_folds`)
+
+        metric: a string;
+            "rmse" (root mean squared error) or "mae" (mean absolute error)
+
+        n_jobs: an integer;
+            number of worker processes (default: 1, in the current process;
+            None: number of cores)
+
+        seed: an integer;
+            reproducibility seed for sampling the candidates
+
+    Attributes:
+
+        best_params_: a dict;
+            hyperparameters of the best candidate
+
+        best_score_: a float;
+            its score on `max_folds` folds
+
+        best_estimator_: a `Ridge2Regressor`;
+            (not fitted) copy of `estimator` with `best_params_`
+
+        trials_: a data frame;
+            one row per candidate and step: candidate id, bracket, step,
+            number of folds, score, and hyperparameters
+
+    Examples:
+
+    ```python
+    from scipy.stats import loguniform
+    from ahead import Ridge2Regressor, Ridge2Search
+
+    search = Ridge2Search(
+        Ridge2Regressor(h=5, centers=0),
+        {
+            "lags": [1, 2, 3],
+            "nb_hidden": [3, 5, 10, 25],
+            "lambda_1": loguniform(1e-3, 1e2),
+            "lambda_2": loguniform(1e-3, 1e2),
+            "activation": ["relu", "tanh"],
+        },
+        strategy="hyperband",
+        n_jobs=4,
+    )
+    search.fit(df)
+    print(search.best_params_)
+    print(search.trials_.sort_values("score").head())
+    search.best_estimator_.forecast(df)
+    ```
+
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        strategy="halving",
+        n_candidates=27,
+        eta=3,
+        initial_window=None,
+        fixed_window=False,
+        max_folds=None,
+        min_folds=None,
+        metric="rmse",
+        n_jobs=1,
+        seed=123,
+    ):
+        assert strategy in (
+            "random",
+            "halving",
+            "hyperband",
+        ), "must have: strategy in ('random', 'halving', 'hyperband')"
+        assert metric in ("rmse", "mae"), "must have: metric in ('rmse', 'mae')"
+        assert eta >= 2, "must have: eta >= 2"
+        unknown = set(param_distributions) - set(_FIT_PARAMS)
+        assert not unknown, f"can't search hyperparameters {sorted(unknown)}"
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.strategy = strategy
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.initial_window = initial_window
+        self.fixed_window = fixed_window
+        self.max_folds = max_folds
+        self.min_folds = min_folds
+        self.metric = metric
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+        self.best_params_ = None
+        self.best_score_ = None
+        self.best_estimator_ = None
+        self.trials_ = None
+
+    def sample(self, rng):
+        """Hyperparameters of a candidate"""
+        params = {}
+        for name, distribution in self.param_distributions.items():
+            if hasattr(distribution, "rvs"):
+                value = distribution.rvs(random_state=rng)
+            else:
+                value = distribution[rng.integers(len(distribution))]
+            if name in _INTEGER_PARAMS:
+                value = int(value)
+            params[name] = value
+        return params
+
+    def fit(self, df):
+        """Search the best hyperparameters for forecasting `df`
+
+        Parameters:
+
+            df: a data frame;
+                a data frame containing the input time series (see
+                `Ridge2Regressor.forecast`)
+
+        """
+        x = df.to_numpy(dtype=np.float64).reshape(df.shape[0], -1)
+        n, h = x.shape[0], self.estimator.h
+        initial_window = (
+            self.initial_window if self.initial_window is not None else n // 2
+        )
+        train, test = get_tscv_indices(
+            n=n,
+            p=1,
+            initial_window=initial_window,
+            horizon=h,
+            fixed_window=self.fixed_window,
+            output="bounds",
+        )
+        # most recent folds first
+        bounds = np.column_stack((train, test[:, 1]))[::-1]
+        max_folds = bounds.shape[0]
+        if self.max_folds is not None:
+            max_folds = min(self.max_folds, max_folds)
+        assert max_folds > 0, "must have: initial_window + h <= len(df)"
+        bounds = np.ascontiguousarray(bounds[:max_folds])
+
+        self._rng = np.random.default_rng(self.seed)
+        self._fixed_params = {
+            name: getattr(self.estimator, name)
+            for name in _FIT_PARAMS + ("centers", "type_clustering")
+        }
+        self._trials = []
+        self._n_candidates = 0
+        self._final = []  # (score, candidate id, params) on max_folds
+
+        n_jobs = get_n_jobs(self.n_jobs, max_folds * self.n_candidates)
+        with worker_pool(
+            n_jobs, initializer=_init_worker, initargs=(x, bounds)
+        ) as map_function:
+            self._run(map_function, max_folds)
+
+        self.trials_ = pd.DataFrame(self._trials)
+        self.best_score_, _, self.best_params_ = min(
+            self._final, key=lambda trial: trial[:2]
+        )
+        self.best_estimator_ = copy.deepcopy(self.estimator)
+        for name, value in self.best_params_.items():
+            setattr(self.best_estimator_, name, value)
+        return self
+
+    def _run(self, map_function, max_folds):
+        eta = self.eta
+        if self.strategy == "random":
+            self._successive_halving(
+                map_function, self.n_candidates, max_folds, max_folds, 0
+            )
+        elif self.strategy == "halving":
+            min_folds = self.min_folds
+            if min_folds is None:
+                n_steps = int(math.log(self.n_candidates, eta) + 1e-9)
+                min_folds = max(1, max_folds // eta**n_steps)
+            self._successive_halving(
+                map_function, self.n_candidates, min_folds, max_folds, 0
+            )
+        else:
+            min_folds = self.min_folds if self.min_folds is not None else 1
+            s_max = int(math.log(max(max_folds / min_folds, 1), eta) + 1e-9)
+            for bracket, s in enumerate(range(s_max, -1, -1)):
+                n_candidates = int(math.ceil((s_max + 1) / (s + 1) * eta**s))
+                self._successive_halving(
+                    map_function,
+                    n_candidates,
+                    max(min_folds, int(max_folds / eta**s)),
+                    max_folds,
+                    bracket,
+                )
+
+    def _successive_halving(
+        self, map_function, n_candidates, min_folds, max_folds, bracket
+    ):
+        first_id = self._n_candidates
+        self._n_candidates += n_candidates
+        candidates = [
+            dict(self._fixed_params, **self.sample(self._rng))
+            for _ in range(n_candidates)
+        ]
+        losses = [np.empty(0) for _ in candidates]
+        alive = list(range(n_candidates))
+        n_folds, step = min(min_folds, max_folds), 0
+        while True:
+            # only the folds not scored at the previous steps
+            results = map_function(
+                _score_folds,
+                [
+                    (candidates[i], range(len(losses[i]), n_folds), self.metric)
+                    for i in alive
+                ],
+            )
+            scores = {}
+            for i, res in zip(alive, results):
+                losses[i] = np.concatenate((losses[i], res))
+                scores[i] = np.mean(losses[i])
+                if self.metric == "rmse":
+                    scores[i] = np.sqrt(scores[i])
+                self._trials.append(
+                    dict(
+                        candidate=first_id + i,
+                        bracket=bracket,
+                        step=step,
+                        n_folds=n_folds,
+                        score=scores[i],
+                        **self._get_searched(candidates[i]),
+                    )
+                )
+            if n_folds >= max_folds:
+                break
+            alive = sorted(alive, key=lambda i: (scores[i], i))
+            alive = alive[: max(1, len(alive) // self.eta)]
+            n_folds, step = min(n_folds * self.eta, max_folds), step + 1
+        self._final.extend(
+            (scores[i], first_id + i, self._get_searched(candidates[i]))
+            for i in alive
+        )
+
+    def _get_searched(self, params):
+        return {name: params[name] for name in self.param_distributions}
@@ -1,3 +1,4 @@
 from .Ridge2Regressor import Ridge2Regressor
+from .Ridge2Search import Ridge2Search
 
-__all__ = ["Ridge2Regressor"]
+__all__ = ["Ridge2Regressor", "Ridge2Search"]
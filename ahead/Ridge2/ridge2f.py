@@ -0,0 +1,514 @@
+import warnings
+import numpy as np
+
+from functools import lru_cache
+from statistics import NormalDist
+
+from ..Basic.basicf import bootstrap_index_chunks, bootstrap_indices, summarize_sims
+
+
+def create_train_inputs(x, lags):
+    """Responses and lagged regressors of a multivariate time series
+
+    Parameters:
+
+        x: a numpy array;
+            time series, (n, n_series), in chronological order
+
+        lags: an integer;
+            number of lags
+
+    Returns: responses (n - lags, n_series) and regressors
+    (n - lags, n_series*lags), the latter ordered by series, then by lag
+    (series 1 lag 1, ..., series 1 lag `lags`, series 2 lag 1, ...)
+    """
+    n, n_series = x.shape
+    assert n > lags, f"must have more than {lags} observations"
+    windows = np.lib.stride_tricks.sliding_window_view(x, lags, axis=0)
+    # windows[i, j, l] = x[i + l, j]; most recent lag first
+    regressors = windows[:-1, :, ::-1].reshape(n - lags, n_series * lags)
+    return x[lags:], regressors
+
+
+def last_lags(x, lags):
+    """Regressors for the step after the last observation, (1, n_series*lags)"""
+    return x[::-1][:lags].T.reshape(1, -1)
+
+
+def hidden_weights(nb_hidden, n_inputs, nodes_sim="sobol", seed=123):
+    """Hidden layer weights in [-1, 1], (n_inputs, nb_hidden), read-only
+
+    Cached per (nb_hidden, n_inputs, nodes_sim) ("sobol", "halton": the
+    seed is unused), or per (nb_hidden, n_inputs, "unif", seed).
+    """
+    if nodes_sim in ("sobol", "halton"):
+        seed = None  # deterministic sequences: one cache entry for all seeds
+    return _hidden_weights(nb_hidden, n_inputs, nodes_sim, seed)
+
+
+@lru_cache(maxsize=256)
+def _hidden_weights(nb_hidden, n_inputs, nodes_sim, seed):
+    if nodes_sim in ("sobol", "halton"):
+        from scipy.stats import qmc
+
+        engine = (qmc.Sobol if nodes_sim == "sobol" else qmc.Halton)(
+            d=n_inputs, scramble=False
+        )
+        with warnings.catch_warnings():  # Sobol' balance warnings
+            warnings.simplefilter("ignore")
+            # first point of the unscrambled sequences is 0: skipped
+            nodes = engine.random(nb_hidden + 1)[1:]
+    elif nodes_sim == "unif":
+        nodes = np.random.default_rng(seed).random((nb_hidden, n_inputs))
+    else:
+        raise ValueError("must have: nodes_sim in ('sobol', 'halton', 'unif')")
+
+    w = 2 * nodes.T - 1
+    w.setflags(write=False)
+    return w
+
+
+def activation_function(activation="relu", a=0.01):
+    if activation == "relu":
+        return lambda x: np.maximum(x, 0)
+    if activation == "sigmoid":
+        return lambda x: 1 / (1 + np.exp(-x))
+    if activation == "tanh":
+        return np.tanh
+    if activation == "leakyrelu":
+        return lambda x: np.where(x > 0, x, a * x)
+    if activation == "elu":
+        return lambda x: np.where(x >= 0, x, a * (np.exp(x) - 1))
+    if activation == "linear":
+        return lambda x: x
+    raise ValueError(
+        "must have: activation in ('relu', 'sigmoid', 'tanh', 'leakyrelu', 'elu', 'linear')"
+    )
+
+
+def _scale(x):
+    xm = x.mean(axis=0)
+    xsd = x.std(axis=0, ddof=1)
+    xsd[xsd == 0] = 1  # constant columns
+    return xm, xsd
+
+
+def fit_clusters(y, centers=2, type_clustering="kmeans", seed=123):
+    """Cluster the (scaled) observations
+
+    Returns the (n, centers) one-hot cluster memberships, and the
+    `Clusters` assigning new observations to them.
+    """
+    xm, xsd = _scale(y)
+    scaled_y = (y - xm) / xsd
+    if type_clustering == "kmeans":
+        from scipy.cluster.vq import kmeans2
+
+        with warnings.catch_warnings():  # empty clusters
+            warnings.simplefilter("ignore")
+            _, labels = kmeans2(scaled_y, centers, minit="++", seed=seed)
+    elif type_clustering == "hclust":
+        from scipy.cluster.hierarchy import fcluster, linkage
+
+        labels = fcluster(
+            linkage(scaled_y, method="complete"), centers, criterion="maxclust"
+        ) - 1
+    else:
+        raise ValueError("must have: type_clustering in ('kmeans', 'hclust')")
+    memberships = (labels[:, None] == np.arange(centers)).astype(np.float64)
+    counts = memberships.sum(axis=0)
+    centroids = (memberships.T @ scaled_y) / np.maximum(counts, 1)[:, None]
+    centroids[counts == 0] = np.inf  # empty clusters: never the nearest
+    return memberships, Clusters(xm, xsd, centroids)
+
+
+def get_clusters(y, centers=2, type_clustering="kmeans", seed=123):
+    """One-hot cluster memberships of the (scaled) observations, (n, centers)"""
+    return fit_clusters(y, centers, type_clustering, seed)[0]
+
+
+class Clusters(object):
+    """Clusters of `fit_clusters`, fixed: new observations are assigned to
+    the nearest centroid (mean of a cluster's scaled observations)"""
+
+    def __init__(self, xm, xsd, centroids):
+        self.xm = xm
+        self.xsd = xsd
+        self.centroids = centroids
+
+    def memberships(self, y):
+        """One-hot memberships of observations `y`, (n, centers)"""
+        scaled_y = (np.asarray(y, dtype=np.float64) - self.xm) / self.xsd
+        distances = ((scaled_y[:, None, :] - self.centroids) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        return (labels[:, None] == np.arange(len(self.centroids))).astype(
+            np.float64
+        )
+
+
+class Ridge2Fit(object):
+    """Fitted Ridge2 model (see `fit_ridge2`)"""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def hidden_layer(self, regressors):
+        return self.activ((regressors - self.xm_nn) / self.xsd_nn @ self.w)
+
+    def predict(self, regressors):
+        """One-step-ahead predictions, for (m, n_series*lags) regressors"""
+        z = np.hstack((regressors, self.hidden_layer(regressors)))
+        return ((z - self.zm) / self.zsd) @ self.coef + self.ym
+
+    def forecast(self, x, h, resids_idx=None):
+        """Recursive forecasts, (h, n_series), or (B, h, n_series) simulations
+        when the (B, h) residuals' resampling indices `resids_idx` are provided"""
+        n_series = x.shape[1]
+        n_paths = 1 if resids_idx is None else resids_idx.shape[0]
+        # lagged[:, j, l]: series j, lag l + 1
+        lagged = np.repeat(
+            last_lags(x, self.lags).reshape(1, n_series, self.lags),
+            n_paths,
+            axis=0,
+        )
+        res = np.empty((n_paths, h, n_series))
+        for i in range(h):
+            preds = self.predict(lagged.reshape(n_paths, -1))
+            if resids_idx is not None:
+                preds = preds + self.resids[resids_idx[:, i]]
+            res[:, i, :] = preds
+            lagged = np.concatenate((preds[:, :, None], lagged[:, :, :-1]), axis=2)
+        return res[0] if resids_idx is None else res
+
+
+def fit_ridge2(
+    x,
+    lags=1,
+    nb_hidden=5,
+    nodes_sim="sobol",
+    activation="relu",
+    a=0.01,
+    lambda_1=0.1,
+    lambda_2=0.1,
+    dropout=0,
+    seed=123,
+    train_inputs=None,
+):
+    """Fit a Ridge2 model (closed-form, with 2 regularization parameters)
+
+    Original (lagged) predictors are penalized by `lambda_1`, hidden
+    layer predictors by `lambda_2`; the coefficients solve
+    (Z'Z + diag(lambda_1, ..., lambda_2, ...)) beta = Z'y for the scaled
+    predictors Z and centered responses y. `train_inputs` are the
+    responses and regressors of `x`, if already computed with
+    `create_train_inputs(x, lags)` (e.g shared by several fits).
+    """
+    assert int(lags) == lags and lags > 0, "must have: lags a positive integer"
+    assert int(nb_hidden) == nb_hidden and nb_hidden > 0, "must have: nb_hidden > 0"
+    assert lambda_1 > 0 and lambda_2 > 0, "must have: lambda_1 > 0 and lambda_2 > 0"
+    assert 0 <= dropout < 1, "must have: 0 <= dropout < 1"
+
+    if train_inputs is None:
+        train_inputs = create_train_inputs(x, lags)
+    y, regressors = train_inputs
+    k_p = regressors.shape[1]
+
+    activ = activation_function(activation, a)
+    w = hidden_weights(nb_hidden, k_p, nodes_sim, seed)
+    xm_nn, xsd_nn = _scale(regressors)
+    hidden = activ((regressors - xm_nn) / xsd_nn @ w)
+    if dropout > 0:
+        keep = np.random.default_rng(seed).random(hidden.shape) >= dropout
+        hidden = hidden * keep / (1 - dropout)
+
+    z = np.hstack((regressors, hidden))
+    zm, zsd = _scale(z)
+    scaled_z = (z - zm) / zsd
+    ym = y.mean(axis=0)
+
+    penalty = np.concatenate(
+        (np.full(k_p, float(lambda_1)), np.full(nb_hidden, float(lambda_2)))
+    )
+    gram = scaled_z.T @ scaled_z
+    gram[np.diag_indices_from(gram)] += penalty
+    coef = np.linalg.solve(gram, scaled_z.T @ (y - ym))
+
+    fitted = scaled_z @ coef + ym
+
+    return Ridge2Fit(
+        x=x,
+        lags=lags,
+        activ=activ,
+        w=w,
+        xm_nn=xm_nn,
+        xsd_nn=xsd_nn,
+        zm=zm,
+        zsd=zsd,
+        ym=ym,
+        coef=coef,
+        fitted=fitted,
+        resids=y - fitted,
+        penalty=penalty,
+    )
+
+
+class Ridge2Stats(object):
+    """Sufficient statistics of a Ridge2 fit, updated with new observations
+
+    Sums of the predictors, responses and their cross products are
+    accumulated (shifted by the initial fit's means, for accuracy), so
+    that refitting after `add` costs O(number of new observations).
+    The hidden layer (weights, and scaling of its inputs) is the one of
+    the initial fit, which must have no dropout.
+
+    Parameters:
+
+        fit: a `Ridge2Fit`;
+            initial fit, from `fit_ridge2`
+
+    """
+
+    def __init__(self, fit):
+        self.fit_ = fit
+        self.z_shift = fit.zm
+        self.y_shift = fit.ym
+        n_z, n_series = fit.coef.shape
+        self.n = 0
+        self.sum_z = np.zeros(n_z)
+        self.zz = np.zeros((n_z, n_z))
+        self.zy = np.zeros((n_z, n_series))
+        self.sum_y = np.zeros(n_series)
+        self.yy = np.zeros(n_series)
+        self.rows = []  # shifted (z, y) blocks, for residuals
+        self.tail = fit.x[-fit.lags :]
+        self._add_rows(*create_train_inputs(fit.x, fit.lags))
+
+    def _add_rows(self, y, regressors):
+        z = np.hstack((regressors, self.fit_.hidden_layer(regressors)))
+        z -= self.z_shift
+        y = y - self.y_shift
+        self.n += z.shape[0]
+        self.sum_z += z.sum(axis=0)
+        self.zz += z.T @ z
+        self.zy += z.T @ y
+        self.sum_y += y.sum(axis=0)
+        self.yy += (y**2).sum(axis=0)
+        self.rows.append((z, y))
+
+    def add(self, x):
+        """Add observations `x`, (n_new, n_inputs), following the last ones"""
+        x = np.vstack((self.tail, np.asarray(x, dtype=np.float64)))
+        self._add_rows(*create_train_inputs(x, self.fit_.lags))
+        self.tail = x[-self.fit_.lags :]
+
+    def refit(self, residuals=False):
+        """`Ridge2Fit` of all the observations added so far
+
+        Residuals are computed (in O(number of observations)) only if
+        `residuals`; otherwise only their standard deviations are.
+        """
+        n = self.n
+        mean_z = self.sum_z / n
+        mean_y = self.sum_y / n
+        cov = self.zz - n * np.outer(mean_z, mean_z)
+        zsd = np.sqrt(np.diag(cov) / (n - 1))
+        zsd[zsd == 0] = 1
+        gram = cov / np.outer(zsd, zsd)
+        zty = (self.zy - n * np.outer(mean_z, mean_y)) / zsd[:, None]
+        penalized_gram = gram.copy()
+        penalized_gram[np.diag_indices_from(gram)] += self.fit_.penalty
+        coef = np.linalg.solve(penalized_gram, zty)
+        # residual sum of squares, from the sums only
+        rss = (
+            self.yy
+            - n * mean_y**2
+            - 2 * np.einsum("ik,ik->k", coef, zty)
+            + np.einsum("ik,ij,jk->k", coef, gram, coef)
+        )
+
+        fit = Ridge2Fit(**self.fit_.__dict__)
+        fit.x = self.tail
+        fit.zm = self.z_shift + mean_z
+        fit.zsd = zsd
+        fit.ym = self.y_shift + mean_y
+        fit.coef = coef
+        fit.resids_sd = np.sqrt(np.maximum(rss, 0) / (n - 1))
+        fit.fitted = None
+        fit.resids = None
+        if residuals:
+            if len(self.rows) > 1:
+                self.rows = [tuple(np.vstack(block) for block in zip(*self.rows))]
+            z, y = self.rows[0]
+            fit.resids = (y - mean_y) - ((z - mean_z) / zsd) @ coef
+        return fit
+
+
+def ridge2f(
+    y,
+    h=5,
+    level=95,
+    xreg=None,
+    lags=1,
+    nb_hidden=5,
+    nodes_sim="sobol",
+    activation="relu",
+    a=0.01,
+    lambda_1=0.1,
+    lambda_2=0.1,
+    dropout=0,
+    type_pi="gaussian",
+    block_length=None,
+    B=100,
+    type_aggregation="mean",
+    centers=None,
+    type_clustering="kmeans",
+    seed=123,
+    keep_sims=True,
+    quantiles=None,
+):
+    """Ridge2 forecasting, in NumPy (see R's `ahead::ridge2f`)
+
+    External regressors `xreg` and cluster memberships (`centers`) are
+    appended to the input series, forecast with them, and dropped from the
+    result. Clusters are obtained with SciPy (k-means or complete-linkage
+    hierarchical clustering), and simulations with NumPy's random
+    generator: both can differ from R's.
+
+    Parameters:
+
+        y: a numpy array;
+            input time series, (n, n_series)
+
+        See `Ridge2Regressor` for the other parameters.
+
+    Returns: a dict with (h, n_series) arrays "mean", "lower", "upper",
+    "residuals" (n - lags, n_series), a (B, h, n_series) array "sims"
+    for bootstrap intervals (or with `keep_sims=False`, "variance" and
+    "quantiles", see `summarize_sims`), the `Ridge2Fit` "fit" and, with
+    `centers`, the `Clusters` "clusters"
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 1:
+        y = y.reshape(-1, 1)
+    n_series = y.shape[1]
+
+    x = y
+    clusters = None
+    if xreg is not None:
+        xreg = np.asarray(xreg, dtype=np.float64)
+        x = np.hstack((x, xreg.reshape(y.shape[0], -1)))
+    if centers is not None and centers > 0:
+        memberships, clusters = fit_clusters(y, int(centers), type_clustering, seed)
+        x = np.hstack((x, memberships))
+
+    fit = fit_ridge2(
+        x,
+        lags=lags,
+        nb_hidden=nb_hidden,
+        nodes_sim=nodes_sim,
+        activation=activation,
+        a=a,
+        lambda_1=lambda_1,
+        lambda_2=lambda_2,
+        dropout=dropout,
+        seed=seed,
+    )
+
+    res = forecast_ridge2(
+        fit,
+        x,
+        n_series,
+        h=h,
+        level=level,
+        type_pi=type_pi,
+        block_length=block_length,
+        B=B,
+        type_aggregation=type_aggregation,
+        seed=seed,
+        keep_sims=keep_sims,
+        quantiles=quantiles,
+    )
+    res["fit"] = fit
+    if clusters is not None:
+        res["clusters"] = clusters
+    return res
+
+
+def forecast_ridge2(
+    fit,
+    x,
+    n_series,
+    h=5,
+    level=95,
+    type_pi="gaussian",
+    block_length=None,
+    B=100,
+    type_aggregation="mean",
+    seed=123,
+    keep_sims=True,
+    quantiles=None,
+):
+    """Forecasts and prediction intervals of a `Ridge2Fit`
+
+    `x` contains (at least) the last `lags` observations, and
+    the first `n_series` columns are the series to forecast. Returns a dict
+    as `ridge2f`.
+    """
+    if type_pi == "gaussian":
+        if fit.resids is not None:
+            resids_sd = fit.resids[:, :n_series].std(axis=0, ddof=1)
+        else:
+            resids_sd = fit.resids_sd[:n_series]
+        mean = fit.forecast(x, h)[:, :n_series]
+        qt_sd = NormalDist().inv_cdf(0.5 + level / 200) * resids_sd
+        res = {
+            "mean": mean,
+            "lower": mean - qt_sd,
+            "upper": mean + qt_sd,
+        }
+        if fit.resids is not None:
+            res["residuals"] = fit.resids[:, :n_series]
+        return res
+
+    if not keep_sims:
+        res = summarize_sims(
+            lambda idx: fit.forecast(x, h, resids_idx=idx)[:, :, :n_series],
+            bootstrap_index_chunks(
+                n=fit.resids.shape[0],
+                h=h,
+                B=B,
+                type_pi=type_pi,
+                block_length=block_length,
+                seed=seed,
+            ),
+            (h, n_series),
+            level=level,
+            quantiles=quantiles,
+            type_aggregation=type_aggregation,
+        )
+        res["residuals"] = fit.resids[:, :n_series]
+        return res
+
+    idx = bootstrap_indices(
+        n=fit.resids.shape[0],
+        h=h,
+        B=B,
+        type_pi=type_pi,
+        block_length=block_length,
+        seed=seed,
+    )
+    sims = fit.forecast(x, h, resids_idx=idx)[:, :, :n_series]
+    alpha = 1 - level / 100
+    lower, upper = np.quantile(sims, [alpha / 2, 1 - alpha / 2], axis=0)
+    if type_aggregation == "median":
+        mean = np.median(sims, axis=0)
+    else:
+        mean = sims.mean(axis=0)
+
+    return {
+        "mean": mean,
+        "lower": lower,
+        "upper": upper,
+        "residuals": fit.resids[:, :n_series],
+        "sims": np.ascontiguousarray(sims),
+    }
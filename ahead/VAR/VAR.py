@@ -1,6 +1,8 @@
 import numpy as np
 
 from ..Base import Base
+from ..utils.cache import cached_forecast
+from ..utils.timing import timed_forecast
 from ..utils import multivariate as mv
 from ..utils import unimultivariate as umv
 from .. import config
@@ -29,6 +31,16 @@ class VAR(Base):
             - "original": yyyy-mm-dd
             - "ms": milliseconds
 
+        backend: a string;
+            execution engine: "r" (R package 'ahead'), "numpy"
+            (in-process, no R, batched in `forecast_many`), or None for
+            the process-wide default (see `ahead.backends`)
+
+        dtype: a string or numpy dtype;
+            type of `mean_`, `lower_` and `upper_`: "float64", or "float32"
+            to halve their memory (forecasts are computed in double
+            precision, and cast once)
+
     Attributes:
 
         fcast_: an object;
@@ -76,12 +88,24 @@ class VAR(Base):
     v1 = VAR(h = 5, date_formatting = "original", type_VAR="none")
     v1.forecast(df)
     print(v1.result_dfs_)
+
+    # many panels with the same shape, fitted at once
+    v2 = VAR(h = 5, type_VAR="const", backend="numpy")
+    v2.forecast_many([df, df*2, df + 1])
+    print(v2.mean_.shape) # (3, 5, 3)
     ```
 
     """
 
     def __init__(
-        self, h=5, level=95, lags=1, type_VAR="none", date_formatting="original"
+        self,
+        h=5,
+        level=95,
+        lags=1,
+        type_VAR="none",
+        date_formatting="original",
+        backend=None,
+        dtype="float64",
     ):  # type_VAR = "const", "trend", "both", "none"
 
         assert type_VAR in (
@@ -99,6 +123,8 @@ class VAR(Base):
         self.lags = lags
         self.type_VAR = type_VAR
         self.date_formatting = date_formatting
+        self.dtype = dtype
+        self.backend = backend
         self.input_df = None
 
         self.fcast_ = None
@@ -110,6 +136,8 @@ class VAR(Base):
         self.upper_ = None
         self.result_dfs_ = None
 
+    @timed_forecast
+    @cached_forecast
     def forecast(self, df):
         """Forecasting method from `VAR` class
 
@@ -129,25 +157,46 @@ class VAR(Base):
         self.get_forecast("var")
 
         # result -----
-        (
-            self.averages_,
-            self.ranges_,
-            _,
-        ) = mv.format_multivariate_forecast(
-            n_series=self.n_series,
-            date_formatting=self.date_formatting,
-            output_dates=self.output_dates_,
-            horizon=self.h,
-            fcast=self.fcast_,
-        )
+        self.format_multivariate_output()
+
+        return self
 
-        self.mean_ = np.asarray(self.fcast_.rx2["mean"])
-        self.lower_ = np.asarray(self.fcast_.rx2["lower"])
-        self.upper_ = np.asarray(self.fcast_.rx2["upper"])
+    @timed_forecast
+    def update(self, new_rows):
+        """Append new observations to the input and forecast again
 
-        self.result_dfs_ = tuple(
-            umv.compute_result_df(self.averages_[i], self.ranges_[i])
-            for i in range(self.n_series)
-        )
+        With the "numpy" backend, the least squares cross products are
+        updated in O(number of new rows) (same results as a full fit).
+        Otherwise, the forecast is computed from scratch.
 
-        return self
+        Parameters:
+
+            new_rows: a data frame;
+                new observations of the input time series, with the same
+                columns, dated after the last input date (at the input's
+                frequency)
+
+        """
+        return self._update(new_rows)
+
+    @timed_forecast
+    def forecast_many(self, dfs):
+        """Forecast each data frame of a collection
+
+        The "r" backend forecasts all of them in one R call. With the
+        "numpy" backend, data frames with the same shape are
+        fitted with one batched least squares solve.
+
+        Parameters:
+
+            dfs: a list of data frames, or a data frame;
+                data frames containing the input time series (see example),
+                with the same number of series, or a panel indexed by
+                (input id, date)
+
+        Sets `mean_`, `lower_`, `upper_` as (n_data_frames, h, n_series)
+        arrays, and `output_dates_` as a list of output dates for each data
+        frame.
+
+        """
+        return self._forecast_many(dfs, "var")
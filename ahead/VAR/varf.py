@@ -0,0 +1,233 @@
+import numpy as np
+
+from statistics import NormalDist
+
+
+def _as_panels(y):
+    """Input as a (n_panels, n, n_series) float64 array, and whether it was batched"""
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 1:
+        y = y.reshape(-1, 1)
+    if y.ndim == 2:
+        return y[None], False
+    assert y.ndim == 3, "must have: y of shape (n, n_series) or (n_panels, n, n_series)"
+    return y, True
+
+
+def deterministic_terms(n, lags, type_VAR="none", start=0):
+    """Deterministic regressors, (n, 0), (n, 1) or (n, 2)
+
+    The trend counts observations from the first one (as in R's `vars`):
+    the first fitted observation has trend `lags + 1`.
+    """
+    trend = np.arange(lags + 1 + start, lags + 1 + start + n, dtype=np.float64)
+    if type_VAR == "none":
+        return np.empty((n, 0))
+    if type_VAR == "const":
+        return np.ones((n, 1))
+    if type_VAR == "trend":
+        return trend[:, None]
+    if type_VAR == "both":
+        return np.column_stack((np.ones(n), trend))
+    raise ValueError("must have: type_VAR in ('const', 'trend', 'both', 'none')")
+
+
+def create_var_inputs(y, lags):
+    """Responses and lagged regressors of a batch of panels
+
+    Parameters:
+
+        y: a numpy array;
+            panels, (n_panels, n, n_series), in chronological order
+
+        lags: an integer;
+            the lag order
+
+    Returns: responses (n_panels, n - lags, n_series) and regressors
+    (n_panels, n - lags, n_series*lags), ordered by lag, then by series
+    (series 1 lag 1, ..., series K lag 1, series 1 lag 2, ...), as in R's
+    `vars`
+    """
+    n = y.shape[1]
+    assert n > lags, f"must have more than {lags} observations"
+    regressors = np.concatenate(
+        [y[:, lags - l : n - l, :] for l in range(1, lags + 1)], axis=2
+    )
+    return y[:, lags:, :], regressors
+
+
+def ma_coefficients(coefs, h):
+    """Moving average (Phi) matrices of a batch of VAR models
+
+    Parameters:
+
+        coefs: a numpy array;
+            (n_panels, lags, n_series, n_series) autoregressive matrices,
+            y_t = sum_l coefs[:, l] @ y_{t-l-1} + ...
+
+        h: an integer;
+            number of matrices (Phi_0 = identity, ..., Phi_{h-1})
+
+    Returns: a (n_panels, h, n_series, n_series) array
+    """
+    n_panels, lags, n_series, _ = coefs.shape
+    phi = np.zeros((n_panels, h, n_series, n_series))
+    phi[:, 0] = np.eye(n_series)
+    for i in range(1, h):
+        for j in range(1, min(i, lags) + 1):
+            phi[:, i] += coefs[:, j - 1] @ phi[:, i - j]
+    return phi
+
+
+def varf(y, h=5, level=95, lags=1, type_VAR="none"):
+    """Vector autoregressive forecasting, in NumPy, batched over panels
+
+    Panels with the same shape are fitted by one batched least squares
+    solve and forecast by one batched recursion. Prediction intervals are
+    Gaussian, from the forecast error covariance of the fitted VAR (as R's
+    `vars::predict`).
+
+    Parameters:
+
+        y: a numpy array;
+            input time series, (n, n_series), or a stack of panels,
+            (n_panels, n, n_series)
+
+        h: an integer;
+            forecasting horizon
+
+        level: an integer;
+            Confidence level for prediction intervals
+
+        lags: an integer;
+            the lag order
+
+        type_VAR: a string;
+            Type of deterministic regressors to include
+            ("const", "trend", "both", "none")
+
+    Returns: a dict with arrays "mean", "lower", "upper", (h, n_series),
+    "coefficients" and "residuals"; with a leading panel axis for stacked
+    input
+    """
+    assert int(lags) == lags and lags > 0, "must have: lags a positive integer"
+    lags = int(lags)
+    y, batched = _as_panels(y)
+    n_panels, n, n_series = y.shape
+
+    response, regressors = _get_regressors(y, lags, type_VAR)
+    n_obs, n_coef = regressors.shape[1:]
+    assert n_obs > n_coef, (
+        f"must have more than {n_coef + lags} observations for lags={lags}"
+        f" and type_VAR={type_VAR!r}"
+    )
+
+    # coef[p, :, k]: coefficients of the equation of series k, panel p
+    regressors_t = regressors.transpose(0, 2, 1)
+    coef = np.linalg.solve(regressors_t @ regressors, regressors_t @ response)
+    resids = response - regressors @ coef
+    sigma = (resids.transpose(0, 2, 1) @ resids) / (n_obs - n_coef)
+
+    res = _forecast_var(coef, sigma, y[:, -lags:], n_obs, h, level, type_VAR)
+    res["residuals"] = resids
+    return res if batched else {key: value[0] for key, value in res.items()}
+
+
+def _get_regressors(y, lags, type_VAR, start=0):
+    # responses and regressors (lags, then deterministic terms) of panels
+    # `y`, the first response being observation `start + lags + 1`
+    response, lagged = create_var_inputs(y, lags)
+    det = deterministic_terms(response.shape[1], lags, type_VAR, start=start)
+    regressors = np.concatenate(
+        (lagged, np.broadcast_to(det, (y.shape[0],) + det.shape)), axis=2
+    )
+    return response, regressors
+
+
+def _forecast_var(coef, sigma, last_obs, n_obs, h, level, type_VAR):
+    # forecasts and Gaussian intervals of fitted VARs, from their last
+    # `lags` observations `last_obs`, (n_panels, lags, n_series)
+    n_panels, lags, n_series = last_obs.shape
+
+    # ar[p, l, k, j]: coefficient of series k at lag l + 1, equation j
+    ar = coef[:, : n_series * lags, :].reshape(n_panels, lags, n_series, n_series)
+    det_coef = coef[:, n_series * lags :, :]
+    future_det = deterministic_terms(h, lags, type_VAR, start=n_obs)
+
+    # recursive forecasts; history[:, l] is lag l + 1
+    history = last_obs[:, ::-1].copy()
+    mean = np.empty((n_panels, h, n_series))
+    for i in range(h):
+        mean[:, i] = np.einsum("plk,plkj->pj", history, ar) + future_det[i] @ det_coef
+        history = np.concatenate((mean[:, i : i + 1], history[:, :-1]), axis=1)
+
+    # forecast error variances: cumulated diag(Phi_i Sigma Phi_i')
+    phi = ma_coefficients(ar.transpose(0, 1, 3, 2), h)
+    variances = np.cumsum(
+        np.einsum("pikl,plm,pikm->pik", phi, sigma, phi), axis=1
+    )
+    qt_sd = NormalDist().inv_cdf(0.5 + level / 200) * np.sqrt(variances)
+
+    return {
+        "mean": mean,
+        "lower": mean - qt_sd,
+        "upper": mean + qt_sd,
+        "coefficients": coef,
+    }
+
+
+class VARStats(object):
+    """Sufficient statistics of VAR fits, updated with new observations
+
+    Cross products of the regressors and responses are accumulated, so
+    that refitting after `add` costs O(number of new observations).
+
+    Parameters:
+
+        y: a numpy array;
+            input time series, (n, n_series), or a stack of panels,
+            (n_panels, n, n_series)
+
+        lags: an integer;
+            the lag order
+
+        type_VAR: a string;
+            Type of deterministic regressors to include
+            ("const", "trend", "both", "none")
+
+    """
+
+    def __init__(self, y, lags=1, type_VAR="none"):
+        y, self.batched = _as_panels(y)
+        self.lags = int(lags)
+        self.type_VAR = type_VAR
+        self.n_obs = 0
+        self.gram = self.cross = self.yy = 0
+        self.tail = y[:, : self.lags]
+        self.add(y[:, self.lags :])
+
+    def add(self, y):
+        """Add observations `y` (same layout as the initial input)"""
+        y = np.concatenate((self.tail, _as_panels(y)[0]), axis=1)
+        response, regressors = _get_regressors(
+            y, self.lags, self.type_VAR, start=self.n_obs
+        )
+        regressors_t = regressors.transpose(0, 2, 1)
+        self.gram = self.gram + regressors_t @ regressors
+        self.cross = self.cross + regressors_t @ response
+        self.yy = self.yy + response.transpose(0, 2, 1) @ response
+        self.n_obs += response.shape[1]
+        self.tail = y[:, -self.lags :]
+
+    def forecast(self, h=5, level=95):
+        """Fit and forecast, returning a dict as `varf` (without residuals)"""
+        n_coef = self.gram.shape[1]
+        coef = np.linalg.solve(self.gram, self.cross)
+        # residuals' cross products: Y'Y - B'X'Y for least squares B
+        sigma = (self.yy - coef.transpose(0, 2, 1) @ self.cross) / (
+            self.n_obs - n_coef
+        )
+        res = _forecast_var(
+            coef, sigma, self.tail, self.n_obs, h, level, self.type_VAR
+        )
+        return res if self.batched else {key: value[0] for key, value in res.items()}
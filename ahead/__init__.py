@@ -9,9 +9,10 @@ from .Basic import BasicForecaster
 from .DynamicRegressor import DynamicRegressor
 from .EAT import EAT
 from .FitForecast import FitForecaster
-from .Ridge2 import Ridge2Regressor
+from .Ridge2 import Ridge2Regressor, Ridge2Search
 from .VAR import VAR
 from .MLARCH import MLARCH
+from .Parallel import ParallelForecaster
 
 
 __all__ = [
@@ -21,6 +22,8 @@ __all__ = [
     "EAT",
     "FitForecaster",
     "Ridge2Regressor",
+    "Ridge2Search",
     "VAR",
-    "MLARCH"
+    "MLARCH",
+    "ParallelForecaster",
 ]
@@ -0,0 +1,29 @@
+from .registry import (
+    Engine,
+    get_backend,
+    get_engine,
+    list_engines,
+    register_engine,
+    resolve_engine,
+    set_backend,
+)
+from .rbackend import REngine
+from .numpybackend import NativeForecast, NumpyEngine
+
+# priority order for automatic selection: R first (reference results),
+# then in-process engines (used when R isn't available)
+register_engine(REngine())
+register_engine(NumpyEngine())
+
+__all__ = [
+    "Engine",
+    "NativeForecast",
+    "NumpyEngine",
+    "REngine",
+    "get_backend",
+    "get_engine",
+    "list_engines",
+    "register_engine",
+    "resolve_engine",
+    "set_backend",
+]
@@ -0,0 +1,241 @@
+import warnings
+import numpy as np
+
+from .registry import Engine
+
+
+class NativeForecast(dict):
+    """Result of an in-process engine
+
+    Exposes the subset of the rpy2 `ListVector` interface read by the
+    estimators (`rx2[...]`, `names`), so that native results go through
+    the same formatting as R's.
+    """
+
+    @property
+    def rx2(self):
+        return self
+
+    @property
+    def names(self):
+        return list(self.keys())
+
+
+def _input_array(obj):
+    return obj.input_df.to_numpy(dtype=np.float64)
+
+
+def _sims_args(obj):
+    # simulations kept, or summarized as they are produced
+    return dict(
+        keep_sims=getattr(obj, "keep_sims", True),
+        quantiles=getattr(obj, "quantiles", None),
+    )
+
+
+# model modules are imported on first use: they import `Base`, which
+# imports this package
+
+
+def _basic(obj, xreg=None):
+    assert xreg is None, "xreg not supported by method " + repr(obj.method)
+    from ..Basic.basicf import basicf
+
+    return basicf(
+        _input_array(obj),
+        h=obj.h,
+        level=obj.level,
+        method=obj.method,
+        type_pi=obj.type_pi,
+        block_length=obj.block_length,
+        B=obj.B,
+        seed=obj.seed,
+        **_sims_args(obj),
+    )
+
+
+def _ridge2(obj, xreg=None):
+    from ..Ridge2.ridge2f import ridge2f
+
+    if xreg is not None:
+        obj.xreg_ = np.asarray(xreg, dtype=np.float64)
+
+    return ridge2f(
+        _input_array(obj),
+        h=obj.h,
+        level=obj.level,
+        xreg=None if xreg is None else obj.xreg_,
+        lags=obj.lags,
+        nb_hidden=obj.nb_hidden,
+        nodes_sim=obj.nodes_sim,
+        activation=obj.activation,
+        a=obj.a,
+        lambda_1=obj.lambda_1,
+        lambda_2=obj.lambda_2,
+        dropout=obj.dropout,
+        type_pi=obj.type_pi,
+        block_length=obj.block_length,
+        B=obj.B,
+        type_aggregation=obj.type_aggregation,
+        centers=obj.centers,
+        type_clustering=obj.type_clustering,
+        seed=obj.seed,
+        **_sims_args(obj),
+    )
+
+
+def _var(obj, xreg=None):
+    assert xreg is None, "xreg not supported by method 'var'"
+    from ..VAR.varf import varf
+
+    return varf(
+        _input_array(obj),
+        h=obj.h,
+        level=obj.level,
+        lags=obj.lags,
+        type_VAR=obj.type_VAR,
+    )
+
+
+def _var_many(obj, inputs):
+    from ..VAR.varf import varf
+
+    # one batched fit per input shape, results in the order of `inputs`
+    groups = {}
+    for i, x in enumerate(inputs):
+        groups.setdefault(x.shape, []).append(i)
+    n_series = inputs[0].shape[1]
+    res = {
+        key: np.empty((len(inputs), obj.h, n_series))
+        for key in ("mean", "lower", "upper")
+    }
+    for idx in groups.values():
+        fcast = varf(
+            np.stack([inputs[i] for i in idx]),
+            h=obj.h,
+            level=obj.level,
+            lags=obj.lags,
+            type_VAR=obj.type_VAR,
+        )
+        for key in res:
+            res[key][idx] = fcast[key]
+    return res
+
+
+def _ridge2_update(obj, new_values, xreg=None):
+    from ..Ridge2.ridge2f import Ridge2Stats, forecast_ridge2
+
+    if obj.dropout > 0:
+        # hidden layer depends on every observation
+        warnings.warn(
+            "Ridge2Regressor.update: refitting from scratch (dropout > 0);"
+            " use dropout=0 for incremental updates"
+        )
+        return None
+    clusters = obj.fcast_.get("clusters")
+    stats = obj.fcast_.get("stats")
+    if stats is None:
+        stats = Ridge2Stats(obj.fcast_["fit"])
+    columns = [new_values]
+    if xreg is not None:
+        xreg = np.asarray(xreg, dtype=np.float64)
+        columns.append(xreg.reshape(new_values.shape[0], -1))
+    if clusters is not None:
+        # clusters of the first fit, new observations assigned to them
+        columns.append(clusters.memberships(new_values))
+    new_values = np.hstack(columns)
+    stats.add(new_values)
+    fit = stats.refit(residuals=obj.type_pi != "gaussian")
+    res = forecast_ridge2(
+        fit,
+        stats.tail,
+        obj.n_series,
+        h=obj.h,
+        level=obj.level,
+        type_pi=obj.type_pi,
+        block_length=obj.block_length,
+        B=obj.B,
+        type_aggregation=obj.type_aggregation,
+        seed=obj.seed,
+        **_sims_args(obj),
+    )
+    res["fit"] = fit
+    res["stats"] = stats
+    if clusters is not None:
+        res["clusters"] = clusters
+    return res
+
+
+def _var_update(obj, new_values, xreg=None):
+    from ..VAR.varf import VARStats
+
+    stats = obj.fcast_.get("stats")
+    if stats is None:
+        n_new = new_values.shape[0]
+        stats = VARStats(
+            _input_array(obj)[:-n_new], lags=obj.lags, type_VAR=obj.type_VAR
+        )
+    stats.add(new_values)
+    res = stats.forecast(h=obj.h, level=obj.level)
+    res["stats"] = stats
+    return res
+
+
+_BOOTSTRAP_TYPE_PI = ("gaussian", "bootstrap", "blockbootstrap", "movingblockbootstrap")
+
+# method -> (function computing the forecast, supported `type_pi`)
+NUMPY_FUNCTIONS = {
+    "mean": (_basic, _BOOTSTRAP_TYPE_PI),
+    "median": (_basic, _BOOTSTRAP_TYPE_PI),
+    "rw": (_basic, _BOOTSTRAP_TYPE_PI),
+    "ridge2": (_ridge2, _BOOTSTRAP_TYPE_PI),
+    "var": (_var, ("gaussian",)),
+}
+
+# method -> function updating a previous forecast with new observations
+NUMPY_UPDATE_FUNCTIONS = {
+    "ridge2": _ridge2_update,
+    "var": _var_update,
+}
+
+# method -> function computing the forecasts of a list of inputs at once
+NUMPY_BATCHED_FUNCTIONS = {
+    "var": _var_many,
+}
+
+
+class NumpyEngine(Engine):
+    """In-process engine (NumPy), no R involved
+
+    Used automatically when R or rpy2 isn't available. Results that can
+    differ from the "r" backend's:
+
+    - `BasicForecaster` ("mean", "median", "rw"): bootstrap simulations
+      (and intervals), drawn with NumPy's random generator
+    - `Ridge2Regressor`: clusters (SciPy's k-means or hierarchical
+      clustering, so forecasts with `centers` > 0) and simulations;
+      "rvinecopula" intervals aren't supported
+    - `VAR`: Gaussian intervals only, as R's `vars::predict`
+
+    """
+
+    name = "numpy"
+    streams_sims = True
+    capabilities = {
+        method: type_pi for method, (_, type_pi) in NUMPY_FUNCTIONS.items()
+    }
+    batched_methods = tuple(NUMPY_BATCHED_FUNCTIONS)
+
+    def forecast(self, obj, method, xreg=None):
+        return NativeForecast(NUMPY_FUNCTIONS[method][0](obj, xreg=xreg))
+
+    def update(self, obj, method, new_values, xreg=None):
+        if method not in NUMPY_UPDATE_FUNCTIONS or not isinstance(
+            obj.fcast_, NativeForecast
+        ):
+            return None
+        res = NUMPY_UPDATE_FUNCTIONS[method](obj, new_values, xreg=xreg)
+        return None if res is None else NativeForecast(res)
+
+    def forecast_many(self, obj, method, inputs, frequencies=None):
+        return NativeForecast(NUMPY_BATCHED_FUNCTIONS[method](obj, inputs))
@@ -0,0 +1,253 @@
+import numpy as np
+
+from functools import lru_cache
+from importlib.util import find_spec
+
+from .. import config
+from ..utils.conversion import numpy2rmatrix, numpy2rvector
+from ..utils.unimultivariate import get_frequency
+from .numpybackend import NativeForecast
+from .registry import Engine
+
+
+def _armagarch_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        B=obj.B,
+        cl=obj.cl,
+        dist=obj.dist,
+        seed=obj.seed,
+    )
+
+
+def _basic_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        method=obj.method,
+        type_pi=obj.type_pi,
+        block_length=obj.block_length,
+        B=obj.B,
+        seed=obj.seed,
+    )
+
+
+def _dynrm_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        type_pi=obj.type_pi,
+    )
+
+
+def _eat_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        type_pi=obj.type_pi,
+        weights=config.FLOATVECTOR(obj.weights),
+    )
+
+
+def _ridge2_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        lags=obj.lags,
+        nb_hidden=obj.nb_hidden,
+        nodes_sim=obj.nodes_sim,
+        activ=obj.activation,
+        a=obj.a,
+        lambda_1=obj.lambda_1,
+        lambda_2=obj.lambda_2,
+        dropout=obj.dropout,
+        type_pi=obj.type_pi,
+        margins=obj.margins,
+        # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
+        block_length=obj.block_length,
+        B=obj.B,
+        type_aggregation=obj.type_aggregation,
+        # can be NULL, but in R (use 0 in R instead of NULL for v0.7.0)
+        centers=obj.centers,
+        type_clustering=obj.type_clustering,
+        cl=obj.cl,
+        seed=obj.seed,
+    )
+
+
+def _var_args(obj):
+    return dict(
+        h=obj.h,
+        level=obj.level,
+        lags=obj.lags,
+        type_VAR=obj.type_VAR,
+    )
+
+
+def _fitforecast_args(obj):
+    return dict(
+        h=obj.h,
+        pct_train=obj.pct_train,
+        pct_calibration=obj.pct_calibration,
+        method=obj.forecasting_method,
+        level=obj.level,
+        B=obj.B,
+        seed=obj.seed,
+        conformalize=obj.conformalize,
+        type_calibration=obj.type_calibration,
+    )
+
+
+def _mlarch_args(obj):
+    valid_type_pi = ("surrogate", "bootstrap", "kde")
+    type_pi = obj.type_pi if obj.type_pi in valid_type_pi else "surrogate"
+    valid_type_sim = ("surrogate", "block-bootstrap", "bootstrap", "kde", "fitdistr")
+    type_sim_conformalize = (
+        obj.type_sim_conformalize
+        if obj.type_sim_conformalize in valid_type_sim
+        else "surrogate"
+    )
+
+    mlarch_args = dict(
+        h=obj.h,
+        mean_model=getattr(obj, "mean_model", None),
+        model_residuals=getattr(obj, "model_residuals", None),
+        fit_func=getattr(obj, "fit_func", None),
+        predict_func=getattr(obj, "predict_func", None),
+        type_pi=type_pi,
+        type_sim_conformalize=type_sim_conformalize,
+        ml_method=getattr(obj, "ml_method", None),
+        level=obj.level,
+        B=obj.B,
+        ml=True,
+        stat_model=getattr(obj, "stat_model", None),
+        seed=obj.seed,
+    )
+    # Remove keys with value None
+    return {k: v for k, v in mlarch_args.items() if v is not None}
+
+
+# method -> (function of R package 'ahead', function building its arguments)
+R_FUNCTIONS = {
+    "armagarch": ("armagarchf", _armagarch_args),
+    "mean": ("basicf", _basic_args),
+    "median": ("basicf", _basic_args),
+    "rw": ("basicf", _basic_args),
+    "dynrm": ("dynrmf", _dynrm_args),
+    "eat": ("eatf", _eat_args),
+    "ridge2": ("ridge2f", _ridge2_args),
+    "var": ("varf", _var_args),
+    "mlarch": ("mlarchf", _mlarch_args),
+    "fitforecast": ("fitforecast", _fitforecast_args),
+}
+
+
+# Runs an 'ahead' function on every input in R: inputs are the row blocks
+# of one stacked matrix, results are flattened (column-major) and
+# concatenated, so that each side of the call is transferred in one copy
+_FORECAST_MANY = """
+function(x, lengths, frequencies, fname, args) {
+    f <- getExportedValue("ahead", fname)
+    ends <- cumsum(lengths)
+    fcasts <- lapply(seq_along(lengths), function(i) {
+        y <- ts(x[(ends[i] - lengths[i] + 1):ends[i], , drop = FALSE],
+                frequency = frequencies[i])
+        do.call(f, c(list(y), args))
+    })
+    keys <- c(mean = "mean", lower = "lower", upper = "upper")
+    lapply(keys, function(key)
+        unlist(lapply(fcasts, function(fcast) as.numeric(fcast[[key]]))))
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def _forecast_many_function():
+    config.load_runtime()
+    return config.R(_FORECAST_MANY)
+
+
+# Replaces the simulations of a forecast by their variance and quantiles
+# (flattened as (n_probs, h, n_series) and (h, n_series) C-ordered arrays),
+# so that they're not transferred to Python
+_SUMMARIZE_SIMS = """
+function(fcast, h, probs) {
+    values <- unlist(fcast$sims, use.names = FALSE)
+    n_sims <- length(fcast$sims)
+    sims <- array(values, c(h, length(values) %/% (h * n_sims), n_sims))
+    if (length(probs) > 0) {
+        q <- apply(sims, c(1, 2), quantile, probs = probs, names = FALSE)
+        q <- array(q, c(length(probs), dim(sims)[1:2]))
+        fcast$quantiles <- as.numeric(aperm(q, c(3, 2, 1)))
+    }
+    fcast$variance <- as.numeric(t(apply(sims, c(1, 2), var)))
+    fcast$sims <- NULL
+    fcast
+}
+"""
+
+
+@lru_cache(maxsize=None)
+def _summarize_sims_function():
+    config.load_runtime()
+    return config.R(_SUMMARIZE_SIMS)
+
+
+def _xreg_matrix(obj, xreg):
+    obj.xreg_ = np.asarray(xreg, dtype=np.float64)
+    return numpy2rmatrix(obj.xreg_)
+
+
+class REngine(Engine):
+    """Engine calling R package 'ahead' through `rpy2` (embedded R)
+
+    Supports every forecasting method and every type of prediction interval.
+    """
+
+    name = "r"
+    capabilities = {method: None for method in R_FUNCTIONS}
+    batched_methods = tuple(R_FUNCTIONS)
+
+    def is_available(self):
+        return config.r_is_installed() and find_spec("rpy2") is not None
+
+    def forecast(self, obj, method, xreg=None):
+        func_name, get_args = R_FUNCTIONS[method]
+        kwargs = get_args(obj)
+        if xreg is not None:
+            kwargs["xreg"] = _xreg_matrix(obj, xreg)
+        res = getattr(config.AHEAD_PACKAGE, func_name)(obj.input_ts_, **kwargs)
+        # R functions produce all the simulations: with `keep_sims=False`,
+        # they're only summarized in R (see `NumpyEngine.streams_sims`)
+        if not getattr(obj, "keep_sims", True) and "sims" in res.names:
+            quantiles = getattr(obj, "quantiles", None)
+            res = _summarize_sims_function()(
+                res,
+                obj.h,
+                numpy2rvector([] if quantiles is None else quantiles),
+            )
+        return res
+
+    def forecast_many(self, obj, method, inputs, frequencies=None):
+        func_name, get_args = R_FUNCTIONS[method]
+        if frequencies is None:
+            frequencies = [obj.frequency] * len(inputs)
+        res = _forecast_many_function()(
+            numpy2rmatrix(np.concatenate(inputs, axis=0)),
+            config.R["as.integer"](numpy2rvector([x.shape[0] for x in inputs])),
+            numpy2rvector([get_frequency(freq) for freq in frequencies]),
+            func_name,
+            config.BASE_PACKAGE.list(**get_args(obj)),
+        )
+        n_inputs, n_series = len(inputs), inputs[0].shape[1]
+        # (n_inputs, n_series, h) blocks -> (n_inputs, h, n_series)
+        return NativeForecast(
+            (
+                key,
+                np.asarray(res.rx2[key], dtype=np.float64)
+                .reshape(n_inputs, n_series, -1)
+                .transpose(0, 2, 1),
+            )
+            for key in ("mean", "lower", "upper")
+        )
@@ -0,0 +1,222 @@
+import os
+import threading
+import warnings
+
+
+_REGISTRY_LOCK = threading.RLock()
+
+# engine name -> engine, in order of priority for automatic selection
+_ENGINES = {}
+
+# method -> engine name; key None is the default for every method
+_DEFAULT_BACKENDS = {}
+
+# (unavailable engines' names, chosen engine's name) already warned about
+_FALLBACK_WARNINGS = set()
+
+if os.environ.get("AHEAD_BACKEND"):
+    _DEFAULT_BACKENDS[None] = os.environ["AHEAD_BACKEND"]
+
+
+class Engine(object):
+    """Execution backend for `Base.get_forecast`
+
+    Attributes:
+
+        name: a string;
+            name used to select the engine (`backend` argument)
+
+        capabilities: a dict;
+            forecasting method -> tuple of supported `type_pi`
+            (None: every `type_pi` of the method is supported)
+
+        batched_methods: a tuple;
+            forecasting methods for which `forecast_many` is implemented
+
+        streams_sims: a boolean;
+            with `keep_sims=False`, simulations are produced and summarized
+            by chunks, so that memory doesn't grow with `B`
+
+    """
+
+    name = None
+    capabilities = {}
+    batched_methods = ()
+    streams_sims = False
+
+    def is_available(self):
+        """Cheap check that the engine can run in this process"""
+        return True
+
+    def supports(self, method, type_pi=None):
+        """Check if the engine implements `method` with intervals `type_pi`"""
+        try:
+            supported_type_pi = self.capabilities[method]
+        except KeyError:
+            return False
+        return (
+            supported_type_pi is None
+            or type_pi is None
+            or type_pi in supported_type_pi
+        )
+
+    def forecast(self, obj, method, xreg=None):
+        """Forecast with `method`, using the state of estimator `obj`
+
+        Must return an object exposing `rx2["mean"]`, `rx2["lower"]`,
+        `rx2["upper"]` (and `rx2["sims"]` for simulation-based intervals).
+        """
+        raise NotImplementedError
+
+    def update(self, obj, method, new_values, xreg=None):
+        """Forecast again after new observations were appended to the input
+
+        `new_values` are the (n_new, n_series) new observations (already
+        appended to `obj.input_df`), and `xreg` their external regressors.
+        Returns an object as `forecast`, or None if the engine can't update
+        its previous result `obj.fcast_` (the forecast is then recomputed
+        from scratch).
+        """
+        return None
+
+    def forecast_many(self, obj, method, inputs, frequencies=None):
+        """Forecast each (n, n_series) array of `inputs` at once
+
+        `frequencies` are the inputs' frequencies (pandas aliases, as
+        `obj.frequency`). Must return an object exposing `rx2["mean"]`, `rx2["lower"]`,
+        `rx2["upper"]` as (n_inputs, h, n_series) arrays.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(name={self.name!r})"
+
+
+def register_engine(engine):
+    """Register an execution engine
+
+    Engines registered first have priority in automatic selection.
+    Registering an engine with an existing name replaces it.
+    """
+    assert engine.name is not None, "engine must have a `name`"
+    with _REGISTRY_LOCK:
+        _ENGINES[engine.name] = engine
+    return engine
+
+
+def get_engine(name):
+    try:
+        return _ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown backend {name!r} (available: {list(_ENGINES)})"
+        )
+
+
+def list_engines(method=None, type_pi=None):
+    """List registered engines, optionally those supporting `method`"""
+    return [
+        engine
+        for engine in _ENGINES.values()
+        if method is None or engine.supports(method.lower(), type_pi)
+    ]
+
+
+def set_backend(name, method=None):
+    """Set the process-wide default backend
+
+    Parameters:
+
+        name: a string or None;
+            engine name, or None to restore automatic selection
+
+        method: a string or None;
+            forecasting method ("mean", "ridge2", ...) concerned,
+            or None for every method
+
+    """
+    if name is not None:
+        get_engine(name)
+    key = None if method is None else method.lower()
+    with _REGISTRY_LOCK:
+        if name is None:
+            _DEFAULT_BACKENDS.pop(key, None)
+        else:
+            _DEFAULT_BACKENDS[key] = name
+
+
+def get_backend(method=None):
+    """Return the process-wide default backend name (or None)"""
+    if method is not None:
+        method = method.lower()
+        if method in _DEFAULT_BACKENDS:
+            return _DEFAULT_BACKENDS[method]
+    return _DEFAULT_BACKENDS.get(None)
+
+
+def _warn_fallback(unavailable, engine):
+    key = (tuple(unavailable), engine.name)
+    with _REGISTRY_LOCK:
+        if key in _FALLBACK_WARNINGS:
+            return
+        _FALLBACK_WARNINGS.add(key)
+    warnings.warn(
+        f"backend(s) {list(unavailable)} not available in this process:"
+        f" using backend {engine.name!r}, whose results can differ (see"
+        f" {engine.__class__.__name__}); pass `backend` or call `set_backend`"
+        " to choose a backend explicitly"
+    )
+
+
+def resolve_engine(method, type_pi=None, backend=None, keep_sims=True):
+    """Select the engine running `method`
+
+    An explicit `backend` (per call, or per estimator) must support
+    `method` and `type_pi`. Otherwise, the process-wide default is used if
+    it supports them, and the first available registered engine is chosen
+    as a fallback; with `keep_sims=False`, engines summarizing simulations
+    by chunks (see `Engine.streams_sims`) are chosen first. When engines with a higher priority (e.g "r", without R
+    or rpy2) are skipped because they aren't available, a warning naming
+    the chosen engine is emitted, once per process.
+    """
+    method = method.lower()
+
+    if backend is not None:
+        engine = get_engine(backend)
+        if not engine.supports(method, type_pi):
+            raise ValueError(
+                f"backend {backend!r} doesn't support method {method!r}"
+                + ("" if type_pi is None else f" with type_pi {type_pi!r}")
+            )
+        return engine
+
+    unavailable = []
+    default_backend = get_backend(method)
+    if default_backend is not None:
+        engine = get_engine(default_backend)
+        if engine.supports(method, type_pi):
+            if engine.is_available():
+                return engine
+            unavailable.append(engine.name)
+
+    candidates = list_engines(method, type_pi)
+    if not keep_sims:
+        for engine in candidates:
+            if engine.streams_sims and engine.is_available():
+                return engine
+    for engine in candidates:
+        if engine.is_available():
+            if len(unavailable) > 0:
+                _warn_fallback(unavailable, engine)
+            return engine
+        if engine.name not in unavailable:
+            unavailable.append(engine.name)
+    if len(candidates) > 0:
+        # let the engine raise its own (more informative) error
+        return candidates[0]
+
+    raise ValueError(
+        f"no available backend for method {method!r}"
+        + ("" if type_pi is None else f" with type_pi {type_pi!r}")
+        + f" (registered: {list(_ENGINES)})"
+    )
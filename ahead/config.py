@@ -1,76 +1,128 @@
 import pickle
-import rpy2
-
-from rpy2.robjects import r
-
-try:
-    import rpy2.robjects.packages as rpackages
-    from rpy2.robjects.packages import importr
-    from rpy2.robjects.vectors import FloatVector, StrVector
-    from rpy2 import rinterface, robjects    
-    from rpy2.rinterface import RRuntimeWarning
-    from rpy2.rinterface_lib import callbacks
-    from rpy2.rinterface_lib.embedded import RRuntimeError
-    import rpy2.robjects.conversion as cv
-except ImportError as e:
-    RPY2_ERROR_MESSAGE = str(e)
-    RPY2_IS_INSTALLED = False
-else:
-    RPY2_IS_INSTALLED = True
+import shutil
+import threading
+
+# The R runtime (embedded R, `importr` handles, R package installation) is
+# only started when one of the names in `_RUNTIME_ATTRIBUTES` is first
+# accessed, e.g. `config.AHEAD_PACKAGE` on the first `forecast()` call.
+# `import ahead` must stay cheap (see tests/test_import_time.py).
 
 USAGE_MESSAGE = """
-This Python class is based on R package 'ahead' (https://techtonique.github.io/ahead/). 
+This Python class is based on R package 'ahead' (https://techtonique.github.io/ahead/).
 You need to install R (https://www.r-project.org/) and rpy2 (https://pypi.org/project/rpy2/).
 
-Then, install R package 'ahead' (if necessary): 
->> R -e 'install.packages("ahead", repos = https://r-packages.techtonique.net)'    
+Then, install R package 'ahead' (if necessary):
+>> R -e 'install.packages("ahead", repos = https://r-packages.techtonique.net)'
 """
 
-r["options"](warn=-1)
-
-
-def _none2null(none_obj):
-    return r("NULL")
-
-
-none_converter = cv.Converter("None converter")
-none_converter.py2rpy.register(type(None), _none2null)
-
-required_packages = ["ahead"]  # list of required R packages
-
-packages_to_install = [
-    x for x in required_packages if not rpackages.isinstalled(x)
-]
-
-utils = importr("utils")
-graphics = importr("graphics")
-base = importr("base")
-
-# print(f" required_packages: {required_packages} \n")
-# print(f" packages_to_install: {packages_to_install} \n")
-# print(f" len(packages_to_install): {len(packages_to_install)} \n")
-
-if len(packages_to_install) > 0:
-    base.options(
-        repos=base.c(
-            techtonique="https://r-packages.techtonique.net",
-            CRAN="https://cloud.r-project.org",
-        )
-    )
-    utils.install_packages(
-        StrVector(packages_to_install)
-    )  # dependencies of dependencies nightmare...
+CHECK_PACKAGES = True
 
-# check R version
-# print(f"R version: {utils.packageVersion('ahead')}")
+_RUNTIME_ATTRIBUTES = (
+    "R",
+    "FLOATVECTOR",
+    "NONE_CONVERTER",
+    "AHEAD_PACKAGE",
+    "BASE_PACKAGE",
+    "STATS_PACKAGE",
+    "UTILS_PACKAGE",
+    "GRAPHICS_PACKAGE",
+)
 
-FLOATVECTOR = FloatVector
-AHEAD_PACKAGE = importr("ahead")
-CHECK_PACKAGES = True
+_RUNTIME_LOCK = threading.RLock()
+_R_IS_INSTALLED = None
 
 
 def DEEP_COPY(x):
     return pickle.loads(pickle.dumps(x, -1))
 
 
-NONE_CONVERTER = none_converter
+def r_is_installed():
+    """Check (once per process) that an R executable is on the PATH"""
+    global _R_IS_INSTALLED
+    if _R_IS_INSTALLED is None:
+        _R_IS_INSTALLED = shutil.which("R") is not None
+    return _R_IS_INSTALLED
+
+
+def runtime_is_loaded():
+    """Return True if the embedded R runtime has already been started"""
+    return "AHEAD_PACKAGE" in globals()
+
+
+def load_runtime():
+    """Start embedded R and load R package 'ahead' (installing it if necessary)
+
+    Called implicitly on first access to `config.AHEAD_PACKAGE` (and the other
+    R handles), so that `import ahead` does not pay for R's startup.
+    Subsequent calls are no-ops.
+    """
+    if runtime_is_loaded():
+        return
+
+    with _RUNTIME_LOCK:
+
+        if runtime_is_loaded():
+            return
+
+        if not r_is_installed():
+            raise ImportError("R is not installed! \n" + USAGE_MESSAGE)
+
+        try:
+            import rpy2.robjects.packages as rpackages
+            import rpy2.robjects.conversion as cv
+            from rpy2.robjects import r
+            from rpy2.robjects.packages import importr
+            from rpy2.robjects.vectors import FloatVector, StrVector
+        except ImportError as e:
+            raise ImportError(str(e) + "\n" + USAGE_MESSAGE)
+
+        r["options"](warn=-1)
+
+        def _none2null(none_obj):
+            return r("NULL")
+
+        none_converter = cv.Converter("None converter")
+        none_converter.py2rpy.register(type(None), _none2null)
+
+        required_packages = ["ahead"]  # list of required R packages
+
+        packages_to_install = [
+            x for x in required_packages if not rpackages.isinstalled(x)
+        ]
+
+        utils = importr("utils")
+        graphics = importr("graphics")
+        base = importr("base")
+        stats = importr("stats")
+
+        if len(packages_to_install) > 0:
+            base.options(
+                repos=base.c(
+                    techtonique="https://r-packages.techtonique.net",
+                    CRAN="https://cloud.r-project.org",
+                )
+            )
+            utils.install_packages(
+                StrVector(packages_to_install)
+            )  # dependencies of dependencies nightmare...
+
+        runtime = {
+            "R": r,
+            "FLOATVECTOR": FloatVector,
+            "NONE_CONVERTER": none_converter,
+            "BASE_PACKAGE": base,
+            "STATS_PACKAGE": stats,
+            "UTILS_PACKAGE": utils,
+            "GRAPHICS_PACKAGE": graphics,
+        }
+        # "AHEAD_PACKAGE" is set last: it flags the runtime as loaded
+        runtime["AHEAD_PACKAGE"] = importr("ahead")
+        globals().update(runtime)
+
+
+def __getattr__(name):
+    # only reached when `name` is not (yet) a module global
+    if name in _RUNTIME_ATTRIBUTES:
+        load_runtime()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,5 @@
 from .unimultivariate import (
+    compute_calendar,
     compute_output_dates,
     compute_result_df,
     get_frequency,
@@ -6,8 +7,18 @@ from .unimultivariate import (
 from .univariate import compute_y_ts, format_univariate_forecast
 from .multivariate import compute_y_mts, format_multivariate_forecast
 from .tscv_indices import get_tscv_indices
+from .cross_validation import cross_validate
+from .cache import ForecastCache, get_cache, set_cache
+from .timing import add_timing_hook, remove_timing_hook
+from .columnar import (
+    forecast_panels,
+    forecasts_to_table,
+    iter_panels,
+    write_forecasts,
+)
 
 __all__ = [
+    "compute_calendar",
     "compute_output_dates",
     "compute_y_ts",
     "format_univariate_forecast",
@@ -16,4 +27,14 @@ __all__ = [
     "compute_result_df",
     "get_frequency",
     "get_tscv_indices",
+    "cross_validate",
+    "ForecastCache",
+    "get_cache",
+    "set_cache",
+    "add_timing_hook",
+    "remove_timing_hook",
+    "iter_panels",
+    "forecasts_to_table",
+    "write_forecasts",
+    "forecast_panels",
 ]
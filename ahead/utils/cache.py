@@ -0,0 +1,347 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+
+from collections import OrderedDict
+
+
+# Forecast results cache: a call to an estimator's `forecast` (or
+# `fit_forecast`) with the same input (values, index, columns), the same
+# hyperparameters (including `seed` and `backend`) and the same arguments
+# restores the estimator's state from the cache, with no conversion, R
+# call or formatting. Caching is off until `set_cache` is called.
+
+_CACHE = None
+
+# estimator attributes that are not kept: R objects (not picklable, and
+# not needed to read the results)
+_R_ATTRIBUTES = ("fcast_", "_input_ts")
+# attributes of the current call only (see `utils.timing`)
+_CALL_ATTRIBUTES = ("timings_", "_timing_children")
+
+
+class _Unhashable(Exception):
+    # value with no reproducible representation (e.g R object, function)
+    pass
+
+
+_SCALARS = (type(None), bool, int, float, complex, str, bytes, np.generic)
+
+
+def _update_hash(hasher, value):
+    if isinstance(value, pd.DataFrame):
+        _update_hash(hasher, value.to_numpy(dtype=np.float64))
+        _update_hash(hasher, value.index)
+        hasher.update(repr(list(value.columns)).encode())
+    elif isinstance(value, pd.Index):
+        hasher.update(pd.util.hash_pandas_object(value, index=False).values)
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            _update_hash(hasher, value.tolist())
+        else:
+            hasher.update(repr((value.dtype.str, value.shape)).encode())
+            hasher.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_hash(hasher, item)
+    elif isinstance(value, dict):
+        _update_hash(hasher, sorted(value.items(), key=lambda item: item[0]))
+    elif isinstance(value, _SCALARS):
+        hasher.update(repr(value).encode())
+    elif type(value).__module__.startswith("rpy2"):
+        # R vectors, by value (not by repr)
+        try:
+            array = np.asarray(value)
+        except Exception:
+            raise _Unhashable(type(value).__name__)
+        if array.dtype == object:
+            raise _Unhashable(type(value).__name__)
+        hasher.update(type(value).__name__.encode())
+        _update_hash(hasher, array)
+    else:
+        # reprs of other objects (e.g R objects, functions) hold addresses:
+        # they don't identify values
+        raise _Unhashable(type(value).__name__)
+    hasher.update(b"|")
+
+
+def get_hyperparameters(obj):
+    """The estimator's constructor parameters, and its backend, as
+    (name, value) pairs"""
+    names = [
+        name
+        for name in inspect.signature(type(obj).__init__).parameters
+        if name != "self"
+    ]
+    return [(name, getattr(obj, name, None)) for name in names] + [
+        ("backend", getattr(obj, "backend", None))
+    ]
+
+
+def get_key(obj, method, args, kwargs, hyperparameters=None):
+    """Key of a forecast: hash of the estimator's class and hyperparameters,
+    the method called and its arguments (input data frame included, and
+    defaults of the arguments not passed), or None if one of them can't be
+    hashed (e.g an R object: the call is then not cached)
+
+    `hyperparameters` are those of `get_hyperparameters`, read when the
+    method is called (default: now).
+    """
+    from .. import __version__
+
+    if hyperparameters is None:
+        hyperparameters = get_hyperparameters(obj)
+    arguments = inspect.signature(method).bind(obj, *args, **kwargs)
+    arguments.apply_defaults()
+    hasher = hashlib.blake2b(digest_size=20)
+    try:
+        _update_hash(
+            hasher,
+            (
+                __version__,
+                type(obj).__module__,
+                type(obj).__qualname__,
+                method.__name__,
+                hyperparameters,
+                list(arguments.arguments.items())[1:],  # without `self`
+            ),
+        )
+    except _Unhashable:
+        return None
+    return hasher.hexdigest()
+
+
+class ForecastCache(object):
+    """Forecast results cache, in memory (LRU) and optionally on disk
+
+    Parameters:
+
+        maxsize: an integer;
+            maximum number of forecasts kept in memory (least recently used
+            forecasts are evicted first)
+
+        directory: a string;
+            directory of the on-disk store (one .npz file per forecast,
+            surviving restarts), or None for memory only. Files are
+            unpickled: the directory must only be writable by trusted users
+
+    Attributes:
+
+        hits: an integer;
+            number of forecasts restored from memory
+
+        disk_hits: an integer;
+            number of forecasts restored from disk
+
+        misses: an integer;
+            number of forecasts computed
+
+    Examples:
+
+    ```python
+    from ahead.utils.cache import ForecastCache, set_cache
+
+    cache = set_cache(ForecastCache(maxsize=1024, directory="/tmp/ahead-cache"))
+    Ridge2Regressor(h=5).forecast(df)  # computed
+    Ridge2Regressor(h=5).forecast(df)  # restored
+    print(cache.info())
+    ```
+
+    """
+
+    def __init__(self, maxsize=256, directory=None):
+        assert maxsize >= 0, "must have: maxsize >= 0"
+        self.maxsize = maxsize
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def info(self):
+        """Counters and size of the in-memory store"""
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                disk_hits=self.disk_hits,
+                misses=self.misses,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self, disk=False):
+        """Empty the in-memory store (and the on-disk one if `disk`)"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+        if disk and self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _remember(self, key, state):
+        with self._lock:
+            self._entries[key] = state
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Estimator state stored for `key`, or None"""
+        with self._lock:
+            state = self._entries.get(key)
+            if state is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return state
+        if self.directory is not None:
+            try:
+                state = _load_state(self._get_path(key))
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+                state = None
+            if state is not None:
+                self._remember(key, state)
+                with self._lock:
+                    self.disk_hits += 1
+                return state
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, state):
+        """Store an estimator state for `key`"""
+        self._remember(key, state)
+        if self.directory is not None:
+            try:
+                _save_state(self._get_path(key), state)
+            except (pickle.PicklingError, TypeError, AttributeError, OSError):
+                pass  # e.g user-defined functions, full disk: kept in memory only
+
+
+def _copy_arrays(value):
+    # arrays (and tuples of arrays, e.g `sims_`) are copied, so that the
+    # cached results and the estimators' ones never share memory
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, tuple) and any(
+        isinstance(item, np.ndarray) for item in value
+    ):
+        return tuple(_copy_arrays(item) for item in value)
+    return value
+
+
+def get_state(obj):
+    """Snapshot of an estimator's attributes after a forecast (without R
+    objects); attributes computed lazily (see `Base.set_lazy`) stay lazy"""
+    for name in list(obj.__dict__.get("_appended", {})):
+        getattr(obj, name)  # rows appended by `update`, concatenated
+    state = {
+        key: _copy_arrays(value)
+        for key, value in obj.__dict__.items()
+        if key not in _R_ATTRIBUTES and key not in _CALL_ATTRIBUTES
+    }
+    if "_lazy_builders" in state:
+        # the estimator's builders are consumed when the attributes are read
+        state["_lazy_builders"] = dict(state["_lazy_builders"])
+    return state
+
+
+def set_state(obj, state):
+    obj.__dict__.update(
+        (key, _copy_arrays(value))
+        for key, value in state.items()
+        if key != "_lazy_names"
+    )
+    obj.__dict__["_lazy_builders"] = dict(state.get("_lazy_builders", {}))
+    if state.get("_lazy_names"):  # state loaded from disk
+        obj.set_lazy_outputs(names=state["_lazy_names"])
+    for key in _R_ATTRIBUTES:
+        obj.__dict__[key] = None
+
+
+def _save_state(path, state):
+    # lazy attributes stay lazy: only their names are stored, and their
+    # builders are registered again when the state is restored (see
+    # `Base.set_lazy_outputs`); arrays are stored as .npy members,
+    # everything else is pickled in one member
+    state = dict(state)
+    state["_lazy_names"] = list(state.pop("_lazy_builders", {}))
+    arrays = {
+        key: value
+        for key, value in state.items()
+        if isinstance(value, np.ndarray) and value.dtype != object
+    }
+    others = {key: value for key, value in state.items() if key not in arrays}
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                __state__=np.frombuffer(
+                    pickle.dumps(others, protocol=pickle.HIGHEST_PROTOCOL), np.uint8
+                ),
+                **arrays,
+            )
+        os.replace(tmp_path, path)  # concurrent readers never see partial files
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _load_state(path):
+    with np.load(path, allow_pickle=False) as data:
+        state = pickle.loads(data["__state__"].tobytes())
+        state.update((key, data[key]) for key in data.files if key != "__state__")
+    return state
+
+
+def set_cache(cache):
+    """Set the process-wide forecast cache (None to disable caching)"""
+    global _CACHE
+    _CACHE = cache
+    return cache
+
+
+def get_cache():
+    """Return the process-wide forecast cache (or None)"""
+    return _CACHE
+
+
+def cached_forecast(method):
+    """Decorator of estimators' forecasting methods, looking up their
+    results in the process-wide cache (see `set_cache`)"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = _CACHE
+        if cache is None:
+            return method(self, *args, **kwargs)
+        # hyperparameters as they are when the method is called (the call
+        # may change some of them, e.g FitForecaster's `h`)
+        key = get_key(self, method, args, kwargs, get_hyperparameters(self))
+        if key is None:
+            return method(self, *args, **kwargs)
+        state = cache.get(key)
+        if state is not None:
+            set_state(self, state)
+            return self
+        res = method(self, *args, **kwargs)
+        cache.set(key, get_state(self))
+        return res
+
+    return wrapper
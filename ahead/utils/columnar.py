@@ -0,0 +1,307 @@
+import numpy as np
+import pandas as pd
+
+
+# Columnar (Arrow, Parquet) input and output of panels of time series.
+# pyarrow is an optional dependency (pip install ahead[arrow]), imported on
+# first use.
+
+_ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            str(e) + "\nColumnar input and output need pyarrow"
+            " (pip install pyarrow, or ahead[arrow])"
+        )
+    return pyarrow
+
+
+def _is_arrow_file(path):
+    return str(path).lower().endswith(_ARROW_SUFFIXES)
+
+
+def _open_table(source, columns=None, memory_map=True):
+    # whole table: Arrow IPC files are memory-mapped (no copy), Parquet
+    # files are read for `columns` only
+    pa = _import_pyarrow()
+    if isinstance(source, pa.Table):
+        table = source
+    elif _is_arrow_file(source):
+        with pa.memory_map(str(source)) if memory_map else pa.OSFile(
+            str(source)
+        ) as f:
+            table = pa.ipc.open_file(f).read_all()
+    else:
+        import pyarrow.parquet as pq
+
+        return pq.read_table(str(source), columns=columns, memory_map=memory_map)
+    return table if columns is None else table.select(columns)
+
+
+def _iter_batches(source, columns=None, batch_size=65536, memory_map=True):
+    # record batches, read one at a time from Parquet files
+    pa = _import_pyarrow()
+    if isinstance(source, pa.Table) or _is_arrow_file(source):
+        table = _open_table(source, columns, memory_map)
+        yield from table.to_batches(max_chunksize=batch_size)
+        return
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(str(source), memory_map=memory_map)
+    yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+
+def _schema_names(source, memory_map=True):
+    pa = _import_pyarrow()
+    if isinstance(source, pa.Table):
+        return source.schema.names
+    if _is_arrow_file(source):
+        return _open_table(source, memory_map=memory_map).schema.names
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(str(source), memory_map=memory_map).names
+
+
+def iter_panels(
+    source,
+    layout="long",
+    chunksize=1000,
+    id_column="id",
+    date_column="date",
+    value_columns=None,
+    value_name="value",
+    batch_size=65536,
+    memory_map=True,
+):
+    """Read a panel of time series by chunks of inputs, for `forecast_many`
+
+    Parameters:
+
+        source: a string or a pyarrow Table;
+            path of a Parquet file, or of an Arrow IPC (Feather) file
+            (".arrow", ".feather", ".ipc": memory-mapped), or a Table
+
+        layout: a string;
+            "long": one row per (input id, date), the rows of each input
+            contiguous, and one column per series of the inputs;
+            "wide": one row per date, and one column per (univariate) input
+
+        chunksize: an integer;
+            number of inputs per chunk
+
+        id_column: a string;
+            column of the inputs' ids ("long")
+
+        date_column: a string;
+            column of the dates
+
+        value_columns: a list of strings;
+            series ("long") or inputs ("wide") columns (default: all the
+            other columns)
+
+        value_name: a string;
+            name of the series of the inputs ("wide")
+
+        batch_size: an integer;
+            number of rows read at once ("long")
+
+        memory_map: a boolean;
+            memory-map the file
+
+    Yields: (ids, panel) pairs: the chunk's input ids, and a data frame
+    indexed by (input id, date) ("long") or a list of data frames ("wide"),
+    as taken by estimators' `forecast_many`
+    """
+    assert layout in ("long", "wide"), "must have: layout in ('long', 'wide')"
+    assert chunksize > 0, "must have: chunksize > 0"
+    names = _schema_names(source, memory_map)
+    if value_columns is None:
+        value_columns = [
+            name for name in names if name not in (id_column, date_column)
+        ]
+    value_columns = list(value_columns)
+
+    if layout == "wide":
+        dates = None
+        for start in range(0, len(value_columns), chunksize):
+            ids = value_columns[start : start + chunksize]
+            columns = ids if dates is not None else [date_column] + ids
+            df = _open_table(source, columns, memory_map).to_pandas()
+            if dates is None:
+                dates = pd.Index(df.pop(date_column), name=date_column)
+            yield ids, [
+                pd.DataFrame({value_name: df[input_id].to_numpy()}, index=dates)
+                for input_id in ids
+            ]
+        return
+
+    def to_panel(df):
+        panel = df.set_index([id_column, date_column])
+        ids = panel.index.get_level_values(0).unique().tolist()
+        return ids, panel
+
+    columns = [id_column, date_column] + value_columns
+    buffer = None
+    for batch in _iter_batches(source, columns, batch_size, memory_map):
+        df = batch.to_pandas()
+        buffer = df if buffer is None else pd.concat((buffer, df), ignore_index=True)
+        while True:
+            # first rows of the inputs after the first one; the last input
+            # may continue in the next batch
+            ids = buffer[id_column].to_numpy()
+            starts = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+            if len(starts) < chunksize:
+                break
+            end = starts[chunksize - 1]
+            yield to_panel(buffer.iloc[:end])
+            buffer = buffer.iloc[end:].reset_index(drop=True)
+    if buffer is not None and buffer.shape[0] > 0:
+        ids = buffer[id_column].to_numpy()
+        starts = np.concatenate(([0], np.flatnonzero(ids[1:] != ids[:-1]) + 1))
+        bounds = np.append(starts[::chunksize], buffer.shape[0])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            yield to_panel(buffer.iloc[start:end])
+
+
+def _as_arrow_array(pa, values):
+    # zero-copy view of a contiguous numeric numpy array
+    values = np.ascontiguousarray(values).reshape(-1)
+    return pa.Array.from_buffers(
+        pa.from_numpy_dtype(values.dtype), len(values), [None, pa.py_buffer(values)]
+    )
+
+
+def forecasts_to_table(obj, ids=None, quantiles=True):
+    """Forecasts of an estimator, as one long Arrow table
+
+    One row per (input, date, series), with columns "id", "date",
+    "series", "mean", "lower", "upper" and, with `quantiles_`, one column
+    per quantile (e.g "q0.1"). Forecasts columns are zero-copy views of
+    the estimator's arrays.
+
+    Parameters:
+
+        obj: an estimator;
+            after `forecast` or `forecast_many`
+
+        ids: a list;
+            ids of the inputs (default: 0, 1, ...)
+
+        quantiles: a boolean;
+            add the quantiles of the simulations (see `keep_sims`), if any
+
+    """
+    pa = _import_pyarrow()
+    assert obj.mean_ is not None, "model forecasting must be obtained first"
+    batched = isinstance(obj.output_dates_, list)  # after `forecast_many`
+    output_dates = obj.output_dates_ if batched else [obj.output_dates_]
+    n_inputs, h = len(output_dates), obj.h
+    arrays = {
+        key: np.asarray(getattr(obj, key + "_")).reshape(n_inputs, h, -1)
+        for key in ("mean", "lower", "upper")
+    }
+    n_series = arrays["mean"].shape[2]
+    if ids is None:
+        ids = list(range(n_inputs))
+    assert len(ids) == n_inputs, f"must have: {n_inputs} ids"
+
+    dates = np.stack(
+        [np.asarray(dates[:h], dtype="datetime64[ns]") for dates in output_dates]
+    )
+    series_names = obj.series_names
+    if series_names is None or len(series_names) != n_series:
+        series_names = range(n_series)
+    n_rows = n_inputs * h * n_series
+    columns = {
+        "id": pa.DictionaryArray.from_arrays(
+            pa.array(np.repeat(np.arange(n_inputs, dtype=np.int32), h * n_series)),
+            pa.array(list(ids)),
+        ),
+        "date": pa.array(np.repeat(dates.reshape(-1), n_series)),
+        "series": pa.DictionaryArray.from_arrays(
+            pa.array(np.tile(np.arange(n_series, dtype=np.int32), n_inputs * h)),
+            pa.array([str(name) for name in series_names]),
+        ),
+    }
+    for key, values in arrays.items():
+        columns[key] = _as_arrow_array(pa, values)
+
+    probs = getattr(obj, "quantiles", None)
+    if quantiles and probs is not None and getattr(obj, "quantiles_", None) is not None:
+        values = np.asarray(obj.quantiles_)
+        if values.size == len(probs) * n_rows:
+            # (n_probs, h, n_series) (one input), else (n_inputs, n_probs, ...)
+            values = values.reshape(-1, len(probs), h, n_series)
+            for k, prob in enumerate(probs):
+                columns[f"q{prob:g}"] = _as_arrow_array(pa, values[:, k])
+    return pa.table(columns)
+
+
+def write_forecasts(obj, destination, ids=None, quantiles=True):
+    """Write an estimator's forecasts (see `forecasts_to_table`) to a
+    Parquet file, or an Arrow IPC file (".arrow", ".feather", ".ipc")"""
+    table = forecasts_to_table(obj, ids=ids, quantiles=quantiles)
+    pa = _import_pyarrow()
+    if _is_arrow_file(destination):
+        with pa.OSFile(str(destination), "wb") as f:
+            with pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, str(destination))
+    return table
+
+
+def forecast_panels(estimator, source, destination, quantiles=True, **kwargs):
+    """Forecast every input of a panel file, by chunks, into one file
+
+    Each chunk of inputs read by `iter_panels` is forecast by the
+    estimator's `forecast_many`, and appended to `destination` (a Parquet
+    file, or an Arrow IPC file; see `forecasts_to_table`), so that memory
+    doesn't grow with the number of inputs.
+
+    Parameters:
+
+        estimator: an estimator;
+            e.g `VAR(h=5, backend="numpy")`
+
+        source: a string or a pyarrow Table;
+            the panel (see `iter_panels`)
+
+        destination: a string;
+            path of the output file
+
+        quantiles: a boolean;
+            write the quantiles of the simulations, if any
+
+        **kwargs: arguments of `iter_panels` (e.g `layout`, `chunksize`)
+
+    Returns: the number of inputs forecast
+    """
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    n_inputs, writer, sink = 0, None, None
+    try:
+        for ids, panel in iter_panels(source, **kwargs):
+            estimator.forecast_many(panel)
+            table = forecasts_to_table(estimator, ids=ids, quantiles=quantiles)
+            if writer is None:
+                if _is_arrow_file(destination):
+                    sink = pa.OSFile(str(destination), "wb")
+                    writer = pa.ipc.new_file(sink, table.schema)
+                else:
+                    writer = pq.ParquetWriter(str(destination), table.schema)
+            writer.write_table(table)
+            n_inputs += len(ids)
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    return n_inputs
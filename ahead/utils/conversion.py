@@ -0,0 +1,86 @@
+import numpy as np
+
+from .. import config
+
+
+# NumPy -> R conversion without going through Python lists: the input is
+# laid out once as a contiguous column-major float64 buffer (no copy when
+# it already is, e.g. most single-dtype DataFrames' `to_numpy()`), then
+# copied into R-allocated memory with a single memcpy (R cannot adopt
+# memory it did not allocate).
+
+
+def as_column_major(x):
+    """Return `x` as a 2-D column-major float64 array (copying only if needed)"""
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x.reshape(-1, 1)
+    return np.asfortranarray(x)
+
+
+def numpy2rvector(x):
+    """Convert a NumPy array to an R numeric vector, in a single copy
+
+    Parameters:
+
+        x: a numpy array;
+            flattened in memory (column-major for 2-D Fortran-ordered input)
+
+    """
+    config.load_runtime()
+    from rpy2 import rinterface
+    from rpy2.robjects.vectors import FloatVector
+
+    x = np.asarray(x, dtype=np.float64)
+    x = x.ravel(order="F" if x.flags.f_contiguous else "C")
+    try:
+        return FloatVector(
+            rinterface.FloatSexpVector.from_memoryview(memoryview(x))
+        )
+    except (AttributeError, TypeError, ValueError):  # older rpy2
+        return FloatVector(x)
+
+
+def numpy2rmatrix(x):
+    """Convert a 1-D or 2-D NumPy array to an R numeric matrix, in a single copy
+
+    Parameters:
+
+        x: a numpy array;
+            matrix (or vector, converted to a one-column matrix)
+
+    """
+    config.load_runtime()
+    from rpy2.robjects.vectors import IntVector
+
+    x = as_column_major(x)
+    res = numpy2rvector(x)
+    res.do_slot_assign("dim", IntVector(x.shape))
+    return res
+
+
+def rlist2array(x, horizon, dtype=np.float64):
+    """Stack an R list of (horizon, n_series) matrices in one (B, horizon, n_series) array
+
+    The R list is flattened in R (`unlist`) and transferred in one copy; the
+    result is a view of one contiguous buffer (of shape (B, n_series,
+    horizon)), so that each series' simulations are contiguous.
+
+    Parameters:
+
+        x: an R list (or an already stacked numpy array, returned as is);
+            e.g. simulations `fcast_.rx2["sims"]`
+
+        horizon: an integer;
+            number of rows of each matrix
+
+        dtype: a numpy dtype;
+            type of the result (R's doubles are cast while copied)
+
+    """
+    if isinstance(x, np.ndarray):
+        return x.astype(dtype, copy=False)
+    config.load_runtime()
+    n_sims = len(x)
+    flat = np.array(config.BASE_PACKAGE.unlist(x, use_names=False), dtype=dtype)
+    return flat.reshape(n_sims, -1, horizon).transpose(0, 2, 1)
@@ -0,0 +1,194 @@
+import copy
+import numpy as np
+
+from ..Parallel.pool import get_chunks, get_n_jobs, start_r, worker_pool
+from .tscv_indices import get_tscv_indices
+
+
+# worker process state, set by `_init_worker`
+_ESTIMATOR = None  # estimator template
+_DF = None  # input data frame, sent once to each worker
+
+
+def _init_worker(estimator, df, warm_start):
+    global _ESTIMATOR, _DF
+    _ESTIMATOR = estimator
+    _DF = df
+    if warm_start:
+        start_r(estimator)
+
+
+def _get_arrays(obj):
+    # (horizon, n_series) forecasts, for univariate estimators too
+    n = np.shape(obj.mean_)[0]
+    return [
+        np.asarray(value, dtype=np.float64).reshape(n, -1)
+        for value in (obj.mean_, obj.lower_, obj.upper_)
+    ]
+
+
+def _cross_validate_chunk(args):
+    # forecasts of consecutive folds `bounds`, (n_folds, 4) array of
+    # (train start, train end, test start, test end)
+    bounds, method, incremental = args
+    res = []
+    obj = None
+    for i, (start, end, _, _) in enumerate(bounds):
+        if incremental and obj is not None:
+            # expanding window: the previous fold's training set, and new rows
+            obj.update(_DF.iloc[bounds[i - 1][1] : end])
+        else:
+            obj = copy.deepcopy(_ESTIMATOR)
+            getattr(obj, method)(_DF.iloc[start:end])
+        res.append(_get_arrays(obj))
+    return res
+
+
+def get_fold_bounds(n, p=1, initial_window=5, horizon=3, fixed_window=False):
+    """Bounds of the cross-validation folds, as a (n_folds, 4) integer array
+    of (train start, train end, test start, test end) (ends excluded)
+
+    Folds are those of `get_tscv_indices` (with `p < 1`, the hold-out
+    folds are excluded).
+    """
+    folds = get_tscv_indices(
+        n=n,
+        p=p,
+        initial_window=initial_window,
+        horizon=horizon,
+        fixed_window=fixed_window,
+        output="bounds",
+    )
+    train, test = folds if p == 1 else folds[0]
+    return np.hstack((train, test))
+
+
+def cross_validate(
+    estimator,
+    df,
+    initial_window=5,
+    horizon=3,
+    fixed_window=False,
+    p=1,
+    method="forecast",
+    n_jobs=1,
+    chunksize=None,
+    incremental=False,
+    warm_start=True,
+    threads_per_worker=1,
+):
+    """Rolling-origin cross-validation of an estimator
+
+    Each fold's training set is forecast `horizon` steps ahead by a copy of
+    `estimator`, and compared to the test set. Folds are forecast in worker
+    processes (the input is sent once to each worker), by chunks of
+    consecutive folds.
+
+    Parameters:
+
+        estimator: an object;
+            a (not yet used) estimator, e.g `Ridge2Regressor()`; its `h` is
+            set to `horizon`
+
+        df: a data frame;
+            a data frame containing the input time series (see example)
+
+        initial_window: an integer;
+            number of observations in the first training set
+
+        horizon: an integer;
+            number of observations in each test set (forecasting horizon)
+
+        fixed_window: a boolean;
+            training sets of `initial_window` observations (rolling window),
+            or starting at the first observation (expanding window)
+
+        p: a float;
+            proportion of the observations used for cross-validation (test
+            sets ending after `p*len(df)` are excluded)
+
+        method: a string;
+            estimator's method called on each training set ("forecast" or
+            "fit_forecast")
+
+        n_jobs: an integer;
+            number of worker processes (default: 1, in the current process;
+            None: number of cores)
+
+        chunksize: an integer;
+            number of consecutive folds per task (default: folds split in
+            about 4 tasks per worker)
+
+        incremental: a boolean;
+            with an expanding window, forecast each fold of a chunk by
+            updating the previous one with the estimator's `update` method
+            (see e.g `Ridge2Regressor.update`), instead of forecasting from
+            scratch
+
+        warm_start: a boolean;
+            start R in each worker when it starts
+
+        threads_per_worker: an integer;
+            number of BLAS/OpenMP threads in each worker (unless set in the
+            environment); None to leave them unset
+
+    Returns: a dict with (n_folds, horizon, n_series) arrays "mean",
+    "lower", "upper" (forecasts), "actual" (test sets) and "errors"
+    (actual - mean), and "bounds", the (n_folds, 4) array of fold bounds
+    (see `get_fold_bounds`)
+
+    Examples:
+
+    ```python
+    from ahead import Ridge2Regressor
+    from ahead.utils.cross_validation import cross_validate
+
+    res = cross_validate(
+        Ridge2Regressor(), df, initial_window=20, horizon=5, n_jobs=4
+    )
+    rmse = np.sqrt(np.mean(res["errors"] ** 2, axis=0))  # (horizon, n_series)
+    ```
+
+    """
+    bounds = get_fold_bounds(
+        df.shape[0],
+        p=p,
+        initial_window=initial_window,
+        horizon=horizon,
+        fixed_window=fixed_window,
+    )
+    n_folds = bounds.shape[0]
+    assert n_folds > 0, "must have: initial_window + horizon <= p*len(df)"
+    incremental = (
+        incremental and not fixed_window and hasattr(estimator, "update")
+    )
+
+    estimator = copy.deepcopy(estimator)
+    estimator.h = horizon
+
+    n_jobs = get_n_jobs(n_jobs, n_folds)
+    tasks = [
+        (bounds[start:end], method, incremental)
+        for start, end in get_chunks(n_folds, n_jobs, chunksize)
+    ]
+    with worker_pool(
+        n_jobs,
+        initializer=_init_worker,
+        initargs=(estimator, df, warm_start and n_jobs > 1),
+        threads_per_worker=threads_per_worker,
+    ) as map_function:
+        results = list(map_function(_cross_validate_chunk, tasks))
+
+    mean, lower, upper = (
+        np.stack(res) for res in zip(*[fold for chunk in results for fold in chunk])
+    )
+    values = df.to_numpy(dtype=np.float64).reshape(df.shape[0], -1)
+    actual = values[bounds[:, 2:3] + np.arange(horizon)]
+    return {
+        "mean": mean,
+        "lower": lower,
+        "upper": upper,
+        "actual": actual,
+        "errors": actual - mean,
+        "bounds": bounds,
+    }
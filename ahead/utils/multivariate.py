@@ -1,77 +1,76 @@
-import os
 import numpy as np
 import pandas as pd
 
-import rpy2.robjects as robjects
-import rpy2.robjects.packages as rpackages
-from rpy2.robjects.packages import importr
-from rpy2.robjects import FloatVector, r
-from datetime import datetime
-from rpy2.robjects.vectors import StrVector
-from .unimultivariate import get_frequency
-
-base = importr("base")
-stats = importr("stats")
+from .. import config
+from .conversion import numpy2rmatrix
+from .unimultivariate import format_output_dates, get_frequency
 
 
 def compute_y_mts(df, df_frequency):
 
-    input_series = df.to_numpy()
+    ts = numpy2rmatrix(df.to_numpy(dtype=np.float64))
 
-    input_series_tolist = input_series.tolist()
-    xx = [item for sublist in input_series_tolist for item in sublist]
+    # ts.colnames = StrVector(df.columns.tolist())
 
-    ts = r.matrix(
-        FloatVector(xx),
-        byrow=True,
-        nrow=len(input_series_tolist),
-        ncol=df.shape[1],
-    )
+    return config.STATS_PACKAGE.ts(ts, frequency=get_frequency(df_frequency))
 
-    # ts.colnames = StrVector(df.columns.tolist())
 
-    return stats.ts(ts, frequency=get_frequency(df_frequency))
+def get_forecast_arrays(fcast, dtype="float64"):
+    """Return mean, lower and upper forecasts as (h, n_series) arrays of type
+    `dtype` (one cast from R's or the engine's doubles)"""
+    return tuple(
+        np.asarray(fcast.rx2[key], dtype=dtype)
+        for key in ("mean", "lower", "upper")
+    )
 
 
-def format_multivariate_forecast(
-    n_series, date_formatting, output_dates, horizon, fcast
+def format_multivariate_arrays(
+    date_formatting, output_dates, horizon, fcast, frequency=None, dtype="float64"
 ):
-    if date_formatting == "original":
-        output_dates_ = [
-            datetime.strftime(output_dates[i], "%Y-%m-%d")
-            for i in range(horizon)
+    """Return the shared (formatted) dates, and mean, lower, upper (h, n_series) arrays"""
+    output_dates_ = format_output_dates(
+        date_formatting, output_dates, horizon, frequency=frequency
+    )
+    mean_array, lower_array, upper_array = get_forecast_arrays(fcast, dtype=dtype)
+    return output_dates_, mean_array, lower_array, upper_array
+
+
+def compute_averages(output_dates, mean_array):
+    """[date, mean] pairs for each series (list of lists)"""
+    output_dates = list(output_dates)
+    return [
+        [[date_i, mean_i] for date_i, mean_i in zip(output_dates, mean_j)]
+        for mean_j in np.asarray(mean_array).T.tolist()
+    ]
+
+
+def compute_ranges(output_dates, lower_array, upper_array):
+    """[date, lower, upper] triplets for each series (list of lists)"""
+    output_dates = list(output_dates)
+    return [
+        [
+            [date_i, lower_i, upper_i]
+            for date_i, lower_i, upper_i in zip(output_dates, lower_j, upper_j)
         ]
+        for lower_j, upper_j in zip(
+            np.asarray(lower_array).T.tolist(),
+            np.asarray(upper_array).T.tolist(),
+        )
+    ]
 
-    if date_formatting == "ms":
-        output_dates_ = [
-            int(
-                datetime.strptime(str(output_dates[i]), "%Y-%m-%d").timestamp()
-                * 1000
-            )
-            for i in range(horizon)
-        ]
 
-    mean_array = np.asarray(fcast.rx2["mean"], dtype="float64")
-    lower_array = np.asarray(fcast.rx2["lower"], dtype="float64")
-    upper_array = np.asarray(fcast.rx2["upper"], dtype="float64")
-
-    averages = []
-    ranges = []
-
-    for j in range(n_series):
-        averages_series_j = []
-        ranges_series_j = []
-        for i in range(horizon):
-            date_i = output_dates_[i]
-            averages_series_j.append([date_i, mean_array[i, j]])
-            ranges_series_j.append(
-                [
-                    date_i,
-                    lower_array[i, j],
-                    upper_array[i, j],
-                ]
-            )
-        averages.append(averages_series_j)
-        ranges.append(ranges_series_j)
+def format_multivariate_forecast(
+    n_series, date_formatting, output_dates, horizon, fcast, frequency=None
+):
+    output_dates_, mean_array, lower_array, upper_array = (
+        format_multivariate_arrays(
+            date_formatting, output_dates, horizon, fcast, frequency=frequency
+        )
+    )
+
+    averages = compute_averages(output_dates_, mean_array[:, :n_series])
+    ranges = compute_ranges(
+        output_dates_, lower_array[:, :n_series], upper_array[:, :n_series]
+    )
 
     return averages, ranges, output_dates_
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+
+# Drawing helpers of `Base.plot`: series are drawn at integer positions
+# (0, ..., number of dates - 1), and dates only appear as tick labels, so
+# that the cost of a chart doesn't depend on the number of dates or paths.
+# matplotlib is imported on first use.
+
+
+def date_labels(dates):
+    """"yyyy-mm-dd" labels of `dates`, formatted at once (numpy array)"""
+    return np.asarray(
+        pd.to_datetime(pd.Series(list(dates))).dt.strftime("%Y-%m-%d"),
+        dtype=object,
+    )
+
+
+def set_date_axis(ax, labels, max_ticks=8):
+    """Label (at most `max_ticks`) integer ticks of `ax` with `labels`"""
+    from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+    n_labels = len(labels)
+
+    def format_tick(x, pos=None):
+        i = int(round(x))
+        return labels[i] if 0 <= i < n_labels else ""
+
+    ax.xaxis.set_major_locator(MaxNLocator(nbins=max_ticks, integer=True))
+    ax.xaxis.set_major_formatter(FuncFormatter(format_tick))
+
+
+def subsample_paths(paths, max_paths=None, seed=123):
+    """At most `max_paths` of (h, n_paths) `paths`, drawn without replacement"""
+    n_paths = paths.shape[1]
+    if max_paths is None or n_paths <= max_paths:
+        return paths
+    idx = np.random.default_rng(seed).choice(n_paths, max_paths, replace=False)
+    return paths[:, np.sort(idx)]
+
+
+def draw_paths(ax, x, paths, **kwargs):
+    """Draw (len(x), n_paths) `paths` as one `LineCollection`"""
+    from matplotlib.collections import LineCollection
+
+    x = np.asarray(x, dtype=np.float64)
+    segments = np.empty((paths.shape[1], len(x), 2))
+    segments[:, :, 0] = x
+    segments[:, :, 1] = paths.T
+    lines = LineCollection(segments, **kwargs)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+
+def fan_bands(paths, levels):
+    """Lower and upper bounds of (h, n_paths) `paths` for each of `levels`
+    (%), as a (len(levels), 2, h) array, computed in one pass"""
+    alpha = 1 - np.asarray(levels, dtype=np.float64) / 100
+    bounds = np.quantile(paths, np.concatenate((alpha / 2, 1 - alpha / 2)), axis=1)
+    return bounds.reshape(2, len(levels), -1).transpose(1, 0, 2)
+
+
+def draw_fan(ax, x, bands, color="orange", alpha=0.6):
+    """Draw nested `bands` (n_bands, 2, len(x)), from the widest one,
+    darker towards the center"""
+    widths = np.mean(bands[:, 1] - bands[:, 0], axis=1)
+    n_bands = len(bands)
+    for i, j in enumerate(np.argsort(-widths)):
+        ax.fill_between(
+            x,
+            bands[j, 0],
+            bands[j, 1],
+            color=color,
+            alpha=alpha * (i + 1) / n_bands,
+            linewidth=0,
+        )
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+class StreamingSummary(object):
+    """Mean, variance and quantiles of a stream of arrays, in bounded memory
+
+    Observations (e.g simulated paths, of shape `shape`) are added by
+    batches, and only summaries of the observations seen so far are kept:
+    the mean and variance are exact (pairwise updates of Chan et al.). For
+    the quantiles, a sorted sample of the observations is kept in each
+    cell: once it has more than `2 * size` points, it is compacted into
+    `size` weighted points (the weighted means of `size` groups of
+    consecutive points, with equal total weights), so that quantile
+    estimates are within about 1 / `size` of the exact ranks. All of these
+    updates are vectorized over each batch and every cell. Quantiles are
+    exact (as `np.quantile`) until the first compaction.
+
+    Parameters:
+
+        probs: a list of floats;
+            probabilities (in [0, 1]) of the quantiles
+
+        shape: a tuple;
+            shape of each observation (e.g (h, n_series))
+
+        size: an integer;
+            number of points kept in each cell after a compaction
+
+    """
+
+    def __init__(self, probs, shape, size=256):
+        self.probs = np.asarray(probs, dtype=np.float64).ravel()
+        assert np.all((self.probs >= 0) & (self.probs <= 1)), (
+            "must have: 0 <= probs <= 1"
+        )
+        assert size > 0, "must have: size > 0"
+        self.shape = tuple(shape)
+        self.size = int(size)
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self._m2 = np.zeros(self.shape)
+        self._values = np.empty((0,) + self.shape)  # (n_points,) + shape
+        self._weights = None  # same shape as `_values`; None: unit weights
+
+    def add(self, x):
+        """Add a batch of observations `x`, (n_obs,) + shape"""
+        x = np.asarray(x, dtype=np.float64).reshape((-1,) + self.shape)
+        n_new = x.shape[0]
+        if n_new == 0:
+            return self
+        mean_new = x.mean(axis=0)
+        delta = mean_new - self.mean
+        count = self.count + n_new
+        self._m2 += ((x - mean_new) ** 2).sum(axis=0) + delta**2 * (
+            self.count * n_new / count
+        )
+        self.mean += delta * (n_new / count)
+        self.count = count
+
+        self._values = np.concatenate((self._values, x))
+        if self._weights is not None:
+            self._weights = np.concatenate((self._weights, np.ones_like(x)))
+        if self._values.shape[0] > 2 * self.size:
+            self._compact()
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1) of the observations"""
+        if self.count < 2:
+            return np.full(self.shape, np.nan)
+        return self._m2 / (self.count - 1)
+
+    @property
+    def quantiles(self):
+        """Quantiles estimates, (n_probs,) + shape"""
+        assert self.count > 0, "must have: at least one observation"
+        if self._weights is None:
+            return np.quantile(self._values, self.probs, axis=0)
+
+        values, weights = self._sorted()
+        # weighted mid-ranks, and target ranks of the quantiles
+        cum_weights = np.cumsum(weights, axis=0)
+        ranks = cum_weights - weights / 2
+        targets = self.probs.reshape((-1,) + (1,) * len(self.shape)) * cum_weights[-1]
+        n_points = values.shape[0]
+        above = np.sum(ranks[None] < targets[:, None], axis=1)
+        lo = np.clip(above - 1, 0, n_points - 1)
+        hi = np.clip(above, 0, n_points - 1)
+        rank_lo = np.take_along_axis(ranks, lo, axis=0)
+        rank_hi = np.take_along_axis(ranks, hi, axis=0)
+        value_lo = np.take_along_axis(values, lo, axis=0)
+        value_hi = np.take_along_axis(values, hi, axis=0)
+        gap = rank_hi - rank_lo
+        frac = np.clip(
+            np.divide(
+                targets - rank_lo, gap, out=np.zeros_like(gap), where=gap > 0
+            ),
+            0,
+            1,
+        )
+        return value_lo + frac * (value_hi - value_lo)
+
+    def _sorted(self):
+        order = np.argsort(self._values, axis=0)
+        values = np.take_along_axis(self._values, order, axis=0)
+        weights = (
+            np.ones_like(values)
+            if self._weights is None
+            else np.take_along_axis(self._weights, order, axis=0)
+        )
+        return values, weights
+
+    def _compact(self):
+        values, weights = self._sorted()
+        cum_weights = np.cumsum(weights, axis=0)
+        # group of each point, from its weighted mid-rank
+        groups = np.minimum(
+            ((cum_weights - weights / 2) / cum_weights[-1] * self.size).astype(
+                np.int64
+            ),
+            self.size - 1,
+        )
+        n_cells = int(np.prod(self.shape))
+        index = (
+            groups.reshape(-1, n_cells) * n_cells + np.arange(n_cells)
+        ).ravel()
+        n_bins = self.size * n_cells
+        group_weights = np.bincount(
+            index, weights=weights.ravel(), minlength=n_bins
+        ).reshape((self.size,) + self.shape)
+        group_sums = np.bincount(
+            index, weights=(weights * values).ravel(), minlength=n_bins
+        ).reshape((self.size,) + self.shape)
+        filled = group_weights > 0
+        means = np.divide(
+            group_sums, group_weights, out=np.zeros_like(group_sums), where=filled
+        )
+        # empty groups (no weight) take the value of a neighbour, so that
+        # the points stay sorted
+        forward = np.maximum.accumulate(np.where(filled, means, -np.inf), axis=0)
+        backward = np.minimum.accumulate(
+            np.where(filled, means, np.inf)[::-1], axis=0
+        )[::-1]
+        self._values = np.where(np.isfinite(forward), forward, backward)
+        self._weights = group_weights
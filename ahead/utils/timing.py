@@ -0,0 +1,108 @@
+import functools
+import time
+
+from contextlib import contextmanager
+
+
+# Timings of the stages of a forecast: estimators' forecasting methods
+# (decorated with `timed_forecast`) set `timings_`, a dict of stage ->
+# {"wall": seconds, "cpu": seconds}. Stages are exclusive (a stage's time
+# doesn't include the stages run inside it), "other" is the time spent
+# outside of any stage and "total" the duration of the call, so that the
+# stages and "other" add up to "total". Hooks (see `add_timing_hook`)
+# receive the timings after each call.
+
+_HOOKS = []
+
+
+def add_timing_hook(hook):
+    """Call `hook(estimator, method_name, timings)` after each forecast
+
+    Parameters:
+
+        hook: a function;
+            receives the estimator, the name of the method called (e.g
+            "forecast") and the estimator's `timings_`
+
+    """
+    _HOOKS.append(hook)
+    return hook
+
+
+def remove_timing_hook(hook):
+    """Stop calling `hook` (see `add_timing_hook`)"""
+    _HOOKS.remove(hook)
+
+
+def _add(timings, stage, wall, cpu):
+    res = timings.get(stage)
+    if res is None:
+        timings[stage] = {"wall": wall, "cpu": cpu}
+    else:
+        res["wall"] += wall
+        res["cpu"] += cpu
+
+
+@contextmanager
+def timing_stage(obj, stage):
+    """Record the duration of the block as stage `stage` of `obj`'s forecast"""
+    timings = obj.__dict__.get("timings_")
+    parent = obj.__dict__.get("_timing_children")
+    if timings is None or parent is None:  # not in a forecast
+        yield
+        return
+    children = obj.__dict__["_timing_children"] = [0.0, 0.0]
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        _add(timings, stage, wall - children[0], cpu - children[1])
+        parent[0] += wall
+        parent[1] += cpu
+        obj.__dict__["_timing_children"] = parent
+
+
+def timed(stage):
+    """Decorator of estimators' methods, recorded as stage `stage`"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with timing_stage(self, stage):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_forecast(method):
+    """Decorator of estimators' forecasting methods, setting `timings_`"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.__dict__.get("_timing_children") is not None:
+            # called by another forecasting method: timed as its stages
+            return method(self, *args, **kwargs)
+        timings = {}
+        children = [0.0, 0.0]
+        self.__dict__["timings_"] = timings
+        self.__dict__["_timing_children"] = children
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            res = method(self, *args, **kwargs)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self.__dict__["_timing_children"] = None
+        # the cache may have restored the timings of the cached forecast
+        self.__dict__["timings_"] = timings
+        _add(timings, "other", wall - children[0], cpu - children[1])
+        timings["total"] = {"wall": wall, "cpu": cpu}
+        for hook in _HOOKS:
+            hook(self, method.__name__, timings)
+        return res
+
+    return wrapper
@@ -1,8 +1,30 @@
 import numpy as np
 
 
+def _get_bounds(n, initial_window, horizon, fixed_window):
+    # (start, stop) of the training and test sets of all the folds
+    k = np.arange(max(n - initial_window - horizon + 1, 0), dtype=np.int64)
+    train = np.column_stack(
+        (k if fixed_window else np.zeros_like(k), initial_window + k)
+    )
+    test = np.column_stack((initial_window + k, initial_window + horizon + k))
+    return train, test
+
+
+def _get_slices(train, test):
+    for (train_start, train_stop), (test_start, test_stop) in zip(
+        train.tolist(), test.tolist()
+    ):
+        yield slice(train_start, train_stop), slice(test_start, test_stop)
+
+
 def get_tscv_indices(
-    n=25, p=0.8, initial_window=5, horizon=3, fixed_window=False
+    n=25,
+    p=0.8,
+    initial_window=5,
+    horizon=3,
+    fixed_window=False,
+    output="indices",
 ):
     """Generate indices to split data into training and test set.
 
@@ -19,8 +41,32 @@ def get_tscv_indices(
 
     fixed_window : boolean, fixed window or increasing window
 
+    output : str, "indices" (a list of dicts of "train" and "test" index
+             arrays), "bounds" (a tuple of two (n_folds, 2) integer arrays
+             of (start, stop) bounds of the training and test sets), or
+             "slices" (a generator of (train, test) slices); bounds and
+             slices take no memory per index
+
+    With p < 1, returns a tuple of cross-validation and hold-out folds
+    (each in the `output` format).
+
     """
 
+    if output != "indices":
+        assert output in (
+            "bounds",
+            "slices",
+        ), "must have: output in ('indices', 'bounds', 'slices')"
+        train, test = _get_bounds(n, initial_window, horizon, fixed_window)
+        res = [(train, test)]
+        if p != 1:
+            # cross-validation folds: test sets ending before int(p*n)
+            is_cv = test[:, 1] <= int(p * n)
+            res = [(train[is_cv], test[is_cv]), (train[~is_cv], test[~is_cv])]
+        if output == "slices":
+            res = [_get_slices(*bounds) for bounds in res]
+        return res[0] if p == 1 else tuple(res)
+
     # Initialization of indices -----
 
     indices = np.arange(n)
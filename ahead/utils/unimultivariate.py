@@ -1,55 +1,214 @@
+import re
+import threading
+import time
 import numpy as np
 import pandas as pd
-from difflib import SequenceMatcher
+from collections import OrderedDict
 
 
-# compute input dates from data frame's index
-def compute_input_dates(df):
+# (first date, last date, number of dates, frequency, horizon) ->
+# (input dates, output dates), as read-only datetime64 arrays
+_CALENDAR_CACHE = OrderedDict()
+_CALENDAR_CACHE_SIZE = 1024
+_CALENDAR_LOCK = threading.Lock()
+
+
+def compute_calendar(df, horizon):
+    """Input dates, output dates and frequency of a data frame's index
 
-    input_dates = df.index.values
+    The frequency is inferred once (pandas alias, None if the dates are
+    irregular: they're then read as daily from the first date). Integer
+    (positional) indexes get a daily calendar whose output dates start
+    `horizon` days after today. Calendars are cached per (first date,
+    last date, number of dates, frequency, horizon).
 
-    frequency = pd.infer_freq(pd.DatetimeIndex(input_dates))
+    Parameters:
 
-    input_dates = pd.date_range(
-        start=input_dates[0], periods=len(input_dates), freq=frequency
-    ).values.tolist()
+        df: a data frame;
+            input time series, indexed by dates (or positions)
 
-    df_input_dates = pd.DataFrame({"date": input_dates})
+        horizon: an integer;
+            forecasting horizon
 
-    input_dates = pd.to_datetime(df_input_dates["date"]).dt.date
+    Returns: input dates and output dates, as datetime64 Series named
+    "date", and the frequency
+    """
+    index = df.index
+    n = len(index)
+    if pd.api.types.is_integer_dtype(index.dtype):
+        frequency = "D"
+        last = np.datetime64(pd.Timestamp.today().normalize(), "ns") + np.timedelta64(
+            horizon - 1, "D"
+        )
+        first = last - np.timedelta64(n - 1, "D")
+        dates = None
+    else:
+        dates = _parse_dates(index)
+        frequency = pd.infer_freq(dates)
+        first, last = dates.values[0], dates.values[-1]
 
-    return input_dates
+    key = (first, last, n, frequency, horizon)
+    with _CALENDAR_LOCK:
+        res = _CALENDAR_CACHE.get(key)
+        if res is not None:
+            _CALENDAR_CACHE.move_to_end(key)
+    if res is None:
+        if frequency is not None and dates is not None:
+            input_dates = dates.values.astype("datetime64[ns]")  # regular
+        else:
+            input_dates = pd.date_range(
+                start=first, periods=n, freq=frequency or "D"
+            ).values
+        output_dates = pd.date_range(
+            start=last, periods=horizon + 1, freq=frequency or "D"
+        ).values[1:]
+        for dates_array in (input_dates, output_dates):
+            dates_array.flags.writeable = False
+        res = (input_dates, output_dates)
+        with _CALENDAR_LOCK:
+            _CALENDAR_CACHE[key] = res
+            if len(_CALENDAR_CACHE) > _CALENDAR_CACHE_SIZE:
+                _CALENDAR_CACHE.popitem(last=False)
+
+    return (
+        pd.Series(res[0], name="date", copy=False),
+        pd.Series(res[1], name="date", copy=False),
+        frequency,
+    )
+
+
+def _parse_dates(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index
+    try:  # ISO 8601 strings (e.g "2001-01-01"), parsed without inference
+        return pd.DatetimeIndex(pd.to_datetime(index, format="ISO8601"))
+    except (TypeError, ValueError):
+        return pd.DatetimeIndex(index)
+
+
+# compute input dates from data frame's index
+def compute_input_dates(df):
+    return compute_calendar(df, 1)[0]
 
 
 # compute output dates from data frame's index
 def compute_output_dates(df, horizon):
-    input_dates = df.index.values
+    _, output_dates, frequency = compute_calendar(df, horizon)
+    return output_dates, frequency
 
-    if input_dates[0] == 0:
-        input_dates = pd.date_range(
-            start=pd.Timestamp.today().strftime("%Y-%m-%d"), periods=horizon
+
+def extend_dates(last_date, new_index, frequency, horizon):
+    """Dates of new observations, and the new output dates
+
+    The frequency isn't inferred again: the new dates must follow the
+    last input date at `frequency`.
+
+    Parameters:
+
+        last_date: a date;
+            last input date (e.g of `compute_calendar`'s input dates)
+
+        new_index: an index;
+            dates of the new observations
+
+        frequency: a string;
+            frequency of the input dates (pandas alias)
+
+        horizon: an integer;
+            forecasting horizon
+
+    """
+    new_dates = pd.DatetimeIndex(pd.to_datetime(new_index))
+    dates = pd.date_range(
+        start=pd.Timestamp(last_date),
+        periods=len(new_dates) + horizon + 1,
+        freq=frequency,
+    )[1:]
+    if not np.array_equal(
+        dates[: len(new_dates)].values.astype("datetime64[ns]"),
+        new_dates.values.astype("datetime64[ns]"),
+    ):
+        raise ValueError(
+            f"new observations' dates must follow the last input date"
+            f" ({last_date}) with frequency {frequency!r}"
         )
+    input_dates = pd.Series(dates.values[: len(new_dates)], name="date")
+    output_dates = pd.Series(dates.values[len(new_dates) :], name="date")
+    return input_dates, output_dates
 
-    # print(f"\n in nnetsauce.utils.timeseries 1: {input_dates} \n")
 
-    frequency = pd.infer_freq(pd.DatetimeIndex(input_dates))
+# (date_formatting, first date, last date, frequency, horizon) -> dates
+_FORMATTED_DATES_CACHE = OrderedDict()
+_FORMATTED_DATES_CACHE_SIZE = 1024
+_FORMATTED_DATES_LOCK = threading.Lock()
 
-    # print(f"\n in nnetsauce.utils.timeseries 2: {frequency} \n")
 
-    output_dates = np.delete(
-        pd.date_range(
-            start=input_dates[-1], periods=horizon + 1, freq=frequency
-        ).values,
-        0,
-    ).tolist()
+def _local_epoch_ms(dates):
+    # milliseconds since epoch of naive dates, read as local time (as
+    # `datetime.timestamp()` does: ambiguous times, when clocks fall back,
+    # are read as the first one, in daylight saving time)
+    if time.timezone == 0 and time.daylight == 0:  # UTC
+        return dates.astype("datetime64[ms]").astype(np.int64)
+    from dateutil.tz import tzlocal
 
-    # print(f"\n in nnetsauce.utils.timeseries 3: {output_dates} \n")
+    local_dates = pd.DatetimeIndex(dates).tz_localize(
+        tzlocal(), ambiguous=True, nonexistent="shift_forward"
+    )
+    return (
+        local_dates.tz_convert("UTC")
+        .tz_localize(None)
+        .values.astype("datetime64[ms]")
+        .astype(np.int64)
+    )
 
-    df_output_dates = pd.DataFrame({"date": output_dates})
 
-    output_dates = pd.to_datetime(df_output_dates["date"]).dt.date
+def _format_dates(date_formatting, dates):
+    # `dates`: numpy datetime64 array
+    if date_formatting == "original":
+        return tuple(np.datetime_as_string(dates.astype("datetime64[D]")).tolist())
+    if date_formatting == "ms":
+        return tuple(_local_epoch_ms(dates).tolist())
+    raise ValueError("must have: date_formatting in ('original', 'ms')")
 
-    return output_dates, frequency
+
+def format_output_dates(date_formatting, output_dates, horizon, frequency=None):
+    """Format the first `horizon` output dates, for the whole horizon at once
+
+    Parameters:
+
+        date_formatting: a string;
+            "original" (yyyy-mm-dd strings) or "ms" (milliseconds since epoch)
+
+        output_dates: a sequence of dates;
+            output dates (see `compute_output_dates`)
+
+        horizon: an integer;
+            forecasting horizon
+
+        frequency: a string;
+            frequency of the dates. When provided, results are cached per
+            (dates range, frequency, horizon), as many series usually
+            share the same calendar
+
+    Returns: a list of strings ("original") or integers ("ms")
+    """
+    dates = np.asarray(output_dates[:horizon], dtype="datetime64[s]")
+
+    if frequency is None:
+        return list(_format_dates(date_formatting, dates))
+
+    key = (date_formatting, dates[0], dates[-1], frequency, horizon)
+    try:
+        with _FORMATTED_DATES_LOCK:
+            res = _FORMATTED_DATES_CACHE[key]
+            _FORMATTED_DATES_CACHE.move_to_end(key)
+    except KeyError:
+        res = _format_dates(date_formatting, dates)
+        with _FORMATTED_DATES_LOCK:
+            _FORMATTED_DATES_CACHE[key] = res
+            if len(_FORMATTED_DATES_CACHE) > _FORMATTED_DATES_CACHE_SIZE:
+                _FORMATTED_DATES_CACHE.popitem(last=False)
+    return list(res)
 
 
 def compute_result_df(averages, ranges):
@@ -63,60 +222,153 @@ def compute_result_df(averages, ranges):
     return pd.concat([pred_mean, pred_ci], axis=1)
 
 
-def get_closest_str(input_str, list_choices):
-    scores = np.asarray(
-        [
-            SequenceMatcher(None, a=input_str, b=elt).ratio()
-            for elt in list_choices
-        ]
+def compute_result_dfs(output_dates, mean_array, lower_array, upper_array):
+    """One data frame (mean, lower, upper columns, date index) per series"""
+    index = pd.Index(output_dates)
+    return tuple(
+        pd.DataFrame(
+            {
+                "mean": mean_array[:, j],
+                "lower": lower_array[:, j],
+                "upper": upper_array[:, j],
+            },
+            index=index,
+        )
+        for j in range(mean_array.shape[1])
+    )
+
+
+# seasonal period of each base frequency (pandas aliases, current and
+# legacy): number of observations in a year (up to weekly), a day
+# (hourly), an hour (minutely) or a minute (secondly)
+_BASE_PERIODS = {
+    **dict.fromkeys(
+        ("A", "Y", "YE", "BA", "BY", "BYE", "AS", "YS", "BAS", "BYS"), 1
+    ),
+    **dict.fromkeys(("Q", "QE", "BQ", "BQE", "QS", "BQS"), 4),
+    **dict.fromkeys(
+        ("M", "ME", "BM", "BME", "CBM", "CBME", "MS", "BMS", "CBMS"), 12
+    ),
+    **dict.fromkeys(("SM", "SME", "SMS"), 24),
+    "W": 52,
+    **dict.fromkeys(("B", "C", "D"), 365),
+    **dict.fromkeys(("H", "h"), 24),
+    **dict.fromkeys(("BH", "bh", "CBH", "cbh"), 8),  # business hours
+    **dict.fromkeys(("T", "min"), 60),
+    **dict.fromkeys(("S", "s"), 60),
+    **dict.fromkeys(("L", "ms", "U", "us", "N", "ns"), 1000),
+}
+
+# seasonal period of pandas offsets, by class, for the aliases missing from
+# `_BASE_PERIODS`
+_OFFSET_PERIODS = {
+    **dict.fromkeys(
+        ("YearEnd", "YearBegin", "BYearEnd", "BYearBegin", "FY5253", "Easter"), 1
+    ),
+    **dict.fromkeys(
+        (
+            "QuarterEnd",
+            "QuarterBegin",
+            "BQuarterEnd",
+            "BQuarterBegin",
+            "FY5253Quarter",
+        ),
+        4,
+    ),
+    **dict.fromkeys(
+        (
+            "MonthEnd",
+            "MonthBegin",
+            "BusinessMonthEnd",
+            "BusinessMonthBegin",
+            "CustomBusinessMonthEnd",
+            "CustomBusinessMonthBegin",
+            "WeekOfMonth",
+            "LastWeekOfMonth",
+        ),
+        12,
+    ),
+    **dict.fromkeys(("SemiMonthEnd", "SemiMonthBegin"), 24),
+    "Week": 52,
+    **dict.fromkeys(("Day", "BusinessDay", "CustomBusinessDay"), 365),
+    "Hour": 24,
+    **dict.fromkeys(("BusinessHour", "CustomBusinessHour"), 8),
+    **dict.fromkeys(("Minute", "Second"), 60),
+    **dict.fromkeys(("Milli", "Micro", "Nano"), 1000),
+}
+
+
+def _anchored_frequencies():
+    # base aliases, and their anchored forms (e.g "W-SUN", "QE-DEC")
+    res = dict(_BASE_PERIODS)
+    weekdays = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+    months = (
+        "JAN", "FEB", "MAR", "APR", "MAY", "JUN",
+        "JUL", "AUG", "SEP", "OCT", "NOV", "DEC",
     )
-    return list_choices[np.where(scores == np.max(scores))[0][0]]
+    for alias, period in _BASE_PERIODS.items():
+        if alias == "W":
+            anchors = weekdays
+        elif period in (1, 4):
+            anchors = months
+        else:
+            continue
+        for anchor in anchors:
+            res[f"{alias}-{anchor}"] = period
+    return res
+
+
+# frequency (pandas alias) -> seasonal period, precomputed for the base and
+# anchored aliases, and completed with the other frequencies when resolved
+_FREQUENCIES = _anchored_frequencies()
+_MULTIPLE = re.compile(r"\s*(\d*)\s*(.+?)\s*")
+
+
+def _resolve_frequency(input_str):
+    # period of a frequency missing from `_FREQUENCIES`: multiples (e.g
+    # "15min": 60 / 15) and aliases only known to pandas
+    match = _MULTIPLE.fullmatch(input_str)
+    if match is None:
+        raise ValueError(f"unknown frequency: {input_str!r}")
+    multiple, base = int(match[1] or 1), match[2]
+    period = _FREQUENCIES.get(base)
+    if period is None:
+        from pandas.tseries.frequencies import to_offset
+
+        try:
+            offset = to_offset(base)
+        except ValueError:
+            raise ValueError(f"unknown frequency: {input_str!r}") from None
+        period = _OFFSET_PERIODS.get(type(offset).__name__)
+        if period is None:
+            raise ValueError(f"unknown frequency: {input_str!r}")
+    return max(1, int(round(period / max(multiple, 1))))
 
 
 def get_frequency(input_str):
     # https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
-    """https://otexts.com/fpp2/ts-objects.html#frequency-of-a-time-series
+    """Seasonal period of a frequency (pandas alias), e.g for R's `ts`
+
+    https://otexts.com/fpp2/ts-objects.html#frequency-of-a-time-series
     Data 	frequency
     Annual 	        1
     Quarterly 	    4
     Monthly 	    12
     Weekly 	        52
-    """
-    frequency_choices = {
-        "A": 1,
-        "Y": 1,
-        "BA": 1,
-        "BY": 1,
-        "AS": 1,
-        "YS": 1,
-        "BAS": 1,
-        "BYS": 1,
-        "Q": 4,
-        "BQ": 4,
-        "QS": 4,
-        "BQS": 4,
-        "M": 12,
-        "BM": 12,
-        "CBM": 12,
-        "MS": 12,
-        "BMS": 12,
-        "CBMS": 12,
-        "W": 52,
-        "B": 365,
-        "C": 365,
-        "D": 365,
-    }
+    Daily 	        365
+    Hourly 	        24 (per day)
+    Minutely 	    60 (per hour)
 
+    Anchored aliases (e.g "W-SUN", "QE-DEC") have the period of their base
+    frequency, multiples a fraction of it (e.g 4 for "15min"); irregular
+    series (frequency None) have period 1. Periods are looked up in a
+    precomputed table; frequencies missing from it are resolved from
+    pandas offsets once, then added to it.
+    """
+    if input_str is None:
+        return 1
     try:
-
-        return frequency_choices[input_str]
-
-    except:
-
-        list_frequency_choices = list(frequency_choices.keys())
-
-        closest_str = get_closest_str(
-            input_str=input_str, list_choices=list_frequency_choices
-        )
-
-        return frequency_choices[closest_str]
+        return _FREQUENCIES[input_str]
+    except KeyError:
+        res = _FREQUENCIES[input_str] = _resolve_frequency(input_str)
+        return res
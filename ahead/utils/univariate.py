@@ -1,53 +1,38 @@
-import os
 import numpy as np
 import pandas as pd
 
-import rpy2.robjects as robjects
-import rpy2.robjects.packages as rpackages
-from rpy2.robjects.packages import importr
-from rpy2.robjects import FloatVector
-from datetime import datetime
-from rpy2.robjects.vectors import StrVector
-from .unimultivariate import get_frequency
-
-base = importr("base")
-stats = importr("stats")
+from .. import config
+from .conversion import numpy2rvector
+from .unimultivariate import format_output_dates, get_frequency
 
 
 def compute_y_ts(df, df_frequency):
 
-    input_series = df.to_numpy()
-
-    ts = stats.ts(
-        FloatVector(input_series.flatten()),
+    ts = config.STATS_PACKAGE.ts(
+        numpy2rvector(df.to_numpy(dtype=np.float64)),
         frequency=get_frequency(df_frequency),
     )
 
     return ts
 
 
-def format_univariate_forecast(date_formatting, output_dates, horizon, fcast):
+def format_univariate_forecast(
+    date_formatting, output_dates, horizon, fcast, frequency=None
+):
 
-    if date_formatting == "original":
-        output_dates_ = [
-            datetime.strftime(output_dates[i], "%Y-%m-%d")
-            for i in range(horizon)
-        ]
+    output_dates_ = format_output_dates(
+        date_formatting, output_dates, horizon, frequency=frequency
+    )
 
-    if date_formatting == "ms":
-        output_dates_ = [
-            int(
-                datetime.strptime(str(output_dates[i]), "%Y-%m-%d").timestamp()
-                * 1000
-            )
-            for i in range(horizon)
-        ]
+    mean_array = np.asarray(fcast.rx2["mean"], dtype="float64").ravel().tolist()
+    lower_array = np.asarray(fcast.rx2["lower"], dtype="float64").ravel().tolist()
+    upper_array = np.asarray(fcast.rx2["upper"], dtype="float64").ravel().tolist()
 
     averages = [
-        [output_dates_[i], fcast.rx2["mean"][i]] for i in range(horizon)
+        [output_dates_[i], mean_array[i]] for i in range(horizon)
     ]
     ranges = [
-        [output_dates_[i], fcast.rx2["lower"][i], fcast.rx2["upper"][i]]
+        [output_dates_[i], lower_array[i], upper_array[i]]
         for i in range(horizon)
     ]
 
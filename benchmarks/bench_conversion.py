@@ -0,0 +1,56 @@
+"""Micro-benchmark: NumPy -> R matrix conversion cost against matrix size
+
+Compares the former list-based path (`tolist()` + flattening in Python +
+`FloatVector` + `r.matrix(byrow=True)`) with `ahead.utils.conversion`
+(one column-major float64 buffer, one copy into R memory).
+
+python benchmarks/bench_conversion.py
+"""
+
+import os
+import numpy as np
+from time import perf_counter
+
+from ahead import config
+from ahead.utils.conversion import numpy2rmatrix
+
+
+print(f"\n ----- Running: {os.path.basename(__file__)}... ----- \n")
+
+SHAPES = [(100, 10), (1000, 100), (10000, 100), (10000, 1000)]
+N_REPEATS = 5
+
+
+def list_based(x):
+    xx = [item for sublist in x.tolist() for item in sublist]
+    return config.R.matrix(
+        config.FLOATVECTOR(xx), byrow=True, nrow=x.shape[0], ncol=x.shape[1]
+    )
+
+
+def best_time(func, x, n_repeats=N_REPEATS):
+    timings = []
+    for _ in range(n_repeats):
+        start = perf_counter()
+        func(x)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+config.load_runtime()
+
+# sanity check: both paths give the same R matrix
+x = np.random.RandomState(123).randn(7, 3)
+assert np.allclose(np.asarray(list_based(x)), np.asarray(numpy2rmatrix(x)))
+
+print(f"{'shape':>14} {'cells':>10} {'lists (s)':>11} {'buffer (s)':>11} {'speedup':>8}")
+for shape in SHAPES:
+    x = np.random.RandomState(123).randn(*shape)
+    # DataFrame-like (column-major) input, as in `compute_y_mts`
+    x = np.asfortranarray(x)
+    t_lists = best_time(list_based, x)
+    t_buffer = best_time(numpy2rmatrix, x)
+    print(
+        f"{str(shape):>14} {x.size:>10} {t_lists:>11.5f} {t_buffer:>11.5f} "
+        f"{t_lists / t_buffer:>8.1f}"
+    )
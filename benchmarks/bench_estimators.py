@@ -0,0 +1,311 @@
+"""Benchmark suite: every estimator over a grid of data sizes and parameters
+
+Runs `BasicForecaster`, `Ridge2Regressor`, `VAR`, `EAT`,
+`DynamicRegressor`, `ArmaGarch`, `MLARCH` and `FitForecaster` on
+datasets/AirPassengers.csv, datasets/nile.csv and synthetic panels (random
+walks with a fixed seed), over series lengths, numbers of series, `h`, `B`
+and `type_pi`. Each case is run once to warm up, then `--repeat` times;
+results (best and median wall and CPU times, and the per-stage timings
+of the best run, see `timings_`) are written as JSON. Cases that need R
+are skipped when R isn't available.
+
+`compare` flags the cases that are slower than in a baseline file (and
+exits with status 1 if there are any).
+
+python benchmarks/bench_estimators.py run --output bench.json
+python benchmarks/bench_estimators.py run --quick --filter Ridge2 --output new.json
+python benchmarks/bench_estimators.py compare bench.json new.json --threshold 0.1
+
+For stable results, run on an idle machine with one BLAS thread
+(OMP_NUM_THREADS=1 OPENBLAS_NUM_THREADS=1 MKL_NUM_THREADS=1).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from datetime import datetime, timezone
+from importlib.util import find_spec
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# benchmark the source tree (e.g `make bench` from a checkout), installed or not
+sys.path.insert(0, ROOT)
+
+# synthetic panels: (series length, number of series)
+SIZES = [(100, 1), (100, 5), (1000, 5), (1000, 20), (10000, 5)]
+QUICK_SIZES = [(100, 1), (100, 5)]
+
+# estimator -> (kind of input, parameters grid); "univariate" estimators
+# only get single-series inputs
+ESTIMATORS = {
+    "BasicForecaster": (
+        "multivariate",
+        {
+            "h": [5, 20],
+            "type_pi": ["gaussian", "bootstrap"],
+            "B": [100, 1000],
+            "backend": ["r", "numpy"],
+        },
+    ),
+    "Ridge2Regressor": (
+        "multivariate",
+        {
+            "h": [5, 20],
+            "type_pi": ["gaussian", "bootstrap"],
+            "B": [100, 1000],
+            "centers": [0],
+            "backend": ["r", "numpy"],
+        },
+    ),
+    "VAR": (
+        "multivariate",
+        {"h": [5, 20], "backend": ["r", "numpy"]},
+    ),
+    "EAT": ("univariate", {"h": [5, 20], "type_pi": ["E", "T"]}),
+    "DynamicRegressor": (
+        "univariate",
+        {"h": [5, 20], "type_pi": ["E", "T"]},
+    ),
+    "ArmaGarch": ("univariate", {"h": [5, 20], "B": [100, 1000]}),
+    "MLARCH": ("univariate", {"h": [5, 20], "B": [100, 1000]}),
+    "FitForecaster": ("univariate", {"h": [5, 20], "B": [100, 1000]}),
+}
+
+# `type_pi` without simulations: `B` is dropped from their cases
+GAUSSIAN_TYPE_PI = ("gaussian", "E", "T")
+
+
+def load_datasets(quick=False):
+    """Inputs, by name: the csv datasets and synthetic random walks"""
+    res = {}
+    for name in ("AirPassengers", "nile"):
+        df = pd.read_csv(os.path.join(ROOT, "datasets", name + ".csv"))
+        res[name] = df.set_index("date")
+    for n, n_series in QUICK_SIZES if quick else SIZES:
+        rng = np.random.RandomState(n * 1000 + n_series)
+        res[f"synthetic-{n}x{n_series}"] = pd.DataFrame(
+            100 + np.cumsum(rng.randn(n, n_series), axis=0),
+            index=pd.date_range("2000-01-01", periods=n, freq="D").strftime(
+                "%Y-%m-%d"
+            ),
+            columns=[f"series{j + 1}" for j in range(n_series)],
+        )
+    return res
+
+
+def get_cases(datasets, quick=False, pattern=None):
+    """(case id, estimator name, parameters, dataset name) of the grid"""
+    res = []
+    for name, (kind, grid) in ESTIMATORS.items():
+        if quick:
+            grid = {
+                key: values if key == "backend" else values[:1]
+                for key, values in grid.items()
+            }
+        seen = set()
+        for values in itertools.product(*grid.values()):
+            params = dict(zip(grid, values))
+            if params.get("type_pi") in GAUSSIAN_TYPE_PI:
+                params.pop("B", None)
+            for data_name, df in datasets.items():
+                if kind == "univariate" and df.shape[1] > 1:
+                    continue
+                if name == "VAR" and df.shape[1] < 2:
+                    continue
+                case_id = "|".join(
+                    [name, "data=" + data_name]
+                    + [f"{key}={value}" for key, value in params.items()]
+                )
+                if case_id in seen:
+                    continue
+                seen.add(case_id)
+                if pattern is None or pattern in case_id:
+                    res.append((case_id, name, params, data_name))
+    return res
+
+
+def get_metadata():
+    import ahead
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "ahead": ahead.__version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "r_available": r_is_available(),
+    }
+
+
+def r_is_available():
+    from ahead import config
+
+    return config.r_is_installed() and find_spec("rpy2") is not None
+
+
+def run_case(name, params, df, repeat):
+    """Best and median times of `repeat` forecasts (after a warm-up one)"""
+    import ahead
+
+    estimator_class = getattr(ahead, name)
+    method = "fit_forecast" if name == "FitForecaster" else "forecast"
+    runs = []
+    for i in range(repeat + 1):
+        obj = estimator_class(**params)
+        wall, cpu = time.perf_counter(), time.process_time()
+        getattr(obj, method)(df)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if i > 0:  # warm-up run excluded
+            runs.append((wall, cpu, obj.timings_))
+    walls = [run[0] for run in runs]
+    best = int(np.argmin(walls))
+    return {
+        "wall_min": walls[best],
+        "wall_median": float(np.median(walls)),
+        "cpu_min": min(run[1] for run in runs),
+        "stages": {
+            stage: value["wall"] for stage, value in runs[best][2].items()
+        },
+    }
+
+
+def run(args):
+    from ahead.utils import set_cache
+
+    set_cache(None)  # no cached forecasts
+    datasets = load_datasets(args.quick)
+    cases = get_cases(datasets, args.quick, args.filter)
+    has_r = r_is_available()
+    results = []
+    for i, (case_id, name, params, data_name) in enumerate(cases):
+        res = {
+            "id": case_id,
+            "estimator": name,
+            "params": params,
+            "data": data_name,
+            "shape": list(datasets[data_name].shape),
+        }
+        if not has_r and params.get("backend", "r") == "r":
+            res["status"] = "skipped"
+        else:
+            try:
+                res.update(run_case(name, params, datasets[data_name], args.repeat))
+                res["status"] = "ok"
+            except Exception as e:  # reported, the suite goes on
+                res.update(status="error", error=f"{type(e).__name__}: {e}")
+        results.append(res)
+        if res["status"] == "ok":
+            print(f"[{i + 1}/{len(cases)}] {case_id}: {res['wall_min']:.5f}s")
+        else:
+            print(f"[{i + 1}/{len(cases)}] {case_id}: {res['status']}")
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {"metadata": get_metadata(), "repeat": args.repeat, "results": results},
+            f,
+            indent=1,
+        )
+    print(f"\n{len(results)} cases written to {args.output}")
+
+
+def compare(args):
+    """Print the cases slower (or faster) than the baseline, return the
+    number of regressions"""
+    with open(args.baseline) as f:
+        baseline = {res["id"]: res for res in json.load(f)["results"]}
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+
+    regressions = improvements = n_compared = 0
+    print(f"{'case':<80} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for res in current:
+        base = baseline.get(res["id"])
+        if base is None or "ok" not in (res["status"], base["status"]):
+            continue
+        if res["status"] != base["status"]:
+            print(f"{res['id']:<80} {base['status']:>10} {res['status']:>10}")
+            regressions += res["status"] != "ok"
+            continue
+        n_compared += 1
+        ratio = res[args.metric] / base[args.metric]
+        change = res[args.metric] - base[args.metric]
+        if abs(change) < args.min_seconds or abs(ratio - 1) <= args.threshold:
+            continue
+        flag = "REGRESSION" if ratio > 1 else "improvement"
+        regressions += ratio > 1
+        improvements += ratio < 1
+        print(
+            f"{res['id']:<80} {base[args.metric]:>10.5f} "
+            f"{res[args.metric]:>10.5f} {ratio:>7.2f} {flag}"
+        )
+    print(
+        f"\n{n_compared} cases compared: {regressions} regressions,"
+        f" {improvements} improvements (threshold {args.threshold:.0%})"
+    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_run = commands.add_parser("run", help="run the benchmarks")
+    parser_run.add_argument("--output", default="bench.json")
+    parser_run.add_argument("--repeat", type=int, default=3)
+    parser_run.add_argument(
+        "--quick", action="store_true", help="small inputs, first grid values"
+    )
+    parser_run.add_argument(
+        "--filter", default=None, help="only cases whose id contains FILTER"
+    )
+
+    parser_compare = commands.add_parser(
+        "compare", help="compare results with a baseline"
+    )
+    parser_compare.add_argument("baseline")
+    parser_compare.add_argument("current")
+    parser_compare.add_argument(
+        "--threshold", type=float, default=0.1, help="relative slowdown flagged"
+    )
+    parser_compare.add_argument(
+        "--min-seconds",
+        type=float,
+        default=1e-3,
+        help="smaller absolute changes are ignored",
+    )
+    parser_compare.add_argument(
+        "--metric", choices=("wall_min", "wall_median", "cpu_min"),
+        default="wall_min",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+        return 0
+    return 1 if compare(args) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -130,6 +130,7 @@ setup(
     include_package_data=True,
     author="T. Moudiki",
     install_requires=install_requires,
+    extras_require={"arrow": ["pyarrow"]},
     dependency_links=dependency_links,
     author_email="thierry.moudiki@gmail.com",
     python_requires=">=3.8"
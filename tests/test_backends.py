@@ -0,0 +1,160 @@
+"""Tests for `ahead.backends` (execution-backend registry)."""
+
+# python -m unittest tests.test_backends
+
+import unittest
+import warnings
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+from ahead import BasicForecaster, EAT, VAR
+from ahead import backends
+
+
+dataset_multi = {
+ 'date' : ['2001-01-01', '2002-01-01', '2003-01-01', '2004-01-01', '2005-01-01'],
+ 'series1' : [34, 30, 35.6, 33.3, 38.1],
+ 'series2' : [4, 5.5, 5.6, 6.3, 5.1],
+ 'series3' : [100, 100.5, 100.6, 100.2, 100.1]}
+df_multi = pd.DataFrame(dataset_multi).set_index('date')
+
+
+class _Result(dict):
+    @property
+    def rx2(self):
+        return self
+
+
+class ConstantEngine(backends.Engine):
+    """Forecasts the last value"""
+
+    name = "constant"
+    capabilities = {
+        "mean": ("gaussian", "bootstrap"),
+        "rw": ("gaussian",),
+        "var": None,
+        "eat": None,
+    }
+
+    def forecast(self, obj, method, xreg=None):
+        last = obj.input_df.to_numpy()[-1]
+        mean = np.tile(last, (obj.h, 1))
+        res = _Result(mean=mean, lower=mean - 1.0, upper=mean + 1.0)
+        if obj.type_pi == "bootstrap":
+            res["sims"] = mean + np.arange(obj.B).reshape(-1, 1, 1)
+        return res
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        backends.register_engine(ConstantEngine())
+
+    def tearDown(self):
+        backends.set_backend(None)
+        backends.set_backend(None, method="mean")
+        backends.registry._ENGINES.pop("constant", None)
+
+    def test_capabilities(self):
+        engine = backends.get_engine("constant")
+        self.assertTrue(engine.supports("mean", "gaussian"))
+        self.assertFalse(engine.supports("mean", "blockbootstrap"))
+        self.assertFalse(engine.supports("ridge2"))
+        self.assertTrue(backends.get_engine("r").supports("ridge2", "rvinecopula"))
+        self.assertIn(engine, backends.list_engines("mean", "gaussian"))
+
+    def test_explicit_backend(self):
+        obj = BasicForecaster(h=3, type_pi="blockbootstrap")
+        obj.backend = "constant"
+        with self.assertRaises(ValueError):
+            obj.forecast(df_multi)
+        with self.assertRaises(ValueError):
+            backends.resolve_engine("mean", backend="unknown")
+
+    def test_process_default(self):
+        backends.set_backend("constant", method="mean")
+        self.assertEqual(backends.get_backend("mean"), "constant")
+        self.assertIsNone(backends.get_backend("median"))
+        # the default is skipped when it doesn't support the request
+        self.assertIn(
+            backends.resolve_engine("mean", "blockbootstrap").name,
+            ("r", "numpy"),
+        )
+        obj = BasicForecaster(h=3).forecast(df_multi)
+        self.assertEqual(obj.backend_, "constant")
+        self.assertEqual(obj.mean_.shape, (3, 3))
+        self.assertAlmostEqual(obj.mean_[0, 0], 38.1)
+        self.assertIn("averages_", obj._lazy_builders)  # built when read
+        self.assertAlmostEqual(obj.averages_[2][1][1], 100.1)
+        self.assertAlmostEqual(obj.ranges_[0][0][1], 37.1)
+
+    def test_fallback_warning(self):
+        backends.registry._FALLBACK_WARNINGS.clear()
+        with mock.patch.object(backends.REngine, "is_available", return_value=False):
+            with self.assertWarnsRegex(UserWarning, "using backend 'numpy'"):
+                engine = backends.resolve_engine("ridge2", "gaussian")
+            self.assertEqual(engine.name, "numpy")
+            # once per process, and never with an explicit backend
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                backends.resolve_engine("ridge2", "gaussian")
+                backends.resolve_engine("ridge2", "gaussian", backend="numpy")
+
+    def test_streamed_sims(self):
+        with mock.patch.object(backends.REngine, "is_available", return_value=True):
+            self.assertEqual(
+                backends.resolve_engine("ridge2", "bootstrap", keep_sims=False).name,
+                "numpy",
+            )
+            self.assertEqual(
+                backends.resolve_engine("ridge2", "rvinecopula", keep_sims=False).name,
+                "r",
+            )
+            self.assertEqual(
+                backends.resolve_engine(
+                    "ridge2", "bootstrap", backend="r", keep_sims=False
+                ).name,
+                "r",
+            )
+        obj = BasicForecaster(h=3, type_pi="bootstrap", B=10, keep_sims=False)
+        self.assertEqual(obj.forecast(df_multi).backend_, "numpy")
+
+    def test_sims_layout(self):
+        obj = BasicForecaster(h=3, type_pi="bootstrap", B=4)
+        obj.backend = "constant"
+        obj.forecast(df_multi)
+        self.assertIsInstance(obj.sims_, tuple)
+        self.assertEqual(len(obj.sims_), 4)
+        self.assertEqual(obj.sims_[0].shape, (3, 3))
+        sims_tuple = obj.getsims(obj.sims_, 1)
+        obj.sims_layout = "array"
+        obj.forecast(df_multi)
+        self.assertEqual(obj.sims_.shape, (4, 3, 3))
+        sims_array = obj.getsims(obj.sims_, 1)
+        self.assertTrue(np.shares_memory(sims_array, obj.sims_))
+        np.testing.assert_array_equal(sims_array, sims_tuple)
+        self.assertEqual(sims_array.shape, (3, 4))
+
+    def test_forecast_many_unbatched(self):
+        obj = VAR(h=3, backend="constant").forecast_many([df_multi, df_multi * 2])
+        self.assertEqual(obj.backend_, "constant")
+        self.assertEqual(obj.mean_.shape, (2, 3, 3))
+        np.testing.assert_array_equal(obj.mean_[1, 0], df_multi.to_numpy()[-1] * 2)
+        self.assertEqual(len(obj.output_dates_), 2)
+        self.assertIsNone(obj.averages_)
+
+    def test_forecast_many_panel(self):
+        panel = pd.concat({"a": df_multi, "b": df_multi + 1}, names=["id"])
+        obj = BasicForecaster(h=3, backend="constant").forecast_many(panel)
+        self.assertEqual(obj.mean_.shape, (2, 3, 3))
+        np.testing.assert_array_equal(obj.mean_[1] - obj.mean_[0], 1.0)
+        obj = EAT(h=3)
+        obj.backend = "constant"
+        obj.forecast_many([df_multi[["series1"]], df_multi[["series2"]]])
+        self.assertEqual(obj.mean_.shape, (2, 3))
+        self.assertEqual(obj.upper_[1, 0], 5.1 + 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
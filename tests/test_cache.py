@@ -0,0 +1,114 @@
+"""Tests for the forecast results cache (numpy backend, no R needed)."""
+
+# python -m unittest tests.test_cache
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+from ahead import BasicForecaster, Ridge2Regressor
+from ahead.utils import ForecastCache, set_cache
+from ahead.utils.cache import get_key
+
+
+dataset_multi = {
+ 'date' : ['2001-01-01', '2002-01-01', '2003-01-01', '2004-01-01', '2005-01-01'],
+ 'series1' : [34, 30, 35.6, 33.3, 38.1],
+ 'series2' : [4, 5.5, 5.6, 6.3, 5.1],
+ 'series3' : [100, 100.5, 100.6, 100.2, 100.1]}
+df_multi = pd.DataFrame(dataset_multi).set_index('date')
+
+
+class TestCache(unittest.TestCase):
+
+    def tearDown(self):
+        set_cache(None)
+
+    def test_hits_and_misses(self):
+        cache = set_cache(ForecastCache(maxsize=2))
+        e1 = Ridge2Regressor(h=4, backend="numpy").forecast(df_multi)
+        e2 = Ridge2Regressor(h=4, backend="numpy").forecast(df_multi)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIsNone(e2.fcast_)
+        np.testing.assert_array_equal(e1.upper_, e2.upper_)
+        self.assertEqual(e1.averages_, e2.averages_)
+        # any change of input or hyperparameter is a miss
+        Ridge2Regressor(h=4, seed=1, backend="numpy").forecast(df_multi)
+        Ridge2Regressor(h=4, backend="numpy").forecast(df_multi + 1e-9)
+        df = df_multi.copy()
+        df.index = ['2000-01-01'] + list(df.index[1:])
+        Ridge2Regressor(h=4, backend="numpy").forecast(df)
+        BasicForecaster(h=4, backend="numpy").forecast(df_multi)
+        self.assertEqual(cache.info()["misses"], 5)
+        self.assertEqual(cache.info()["size"], 2)
+
+    def test_copies(self):
+        set_cache(ForecastCache())
+        e1 = BasicForecaster(
+            h=4, type_pi="bootstrap", B=10, backend="numpy"
+        ).forecast(df_multi)
+        mean = e1.mean_.copy()
+        e1.mean_[:] = 0
+        e1.sims_[0][:] = 0
+        e2 = BasicForecaster(
+            h=4, type_pi="bootstrap", B=10, backend="numpy"
+        ).forecast(df_multi)
+        np.testing.assert_array_equal(e2.mean_, mean)
+        self.assertNotEqual(np.abs(e2.sims_[0]).sum(), 0)
+        e2.mean_[:] = 1
+        e3 = BasicForecaster(
+            h=4, type_pi="bootstrap", B=10, backend="numpy"
+        ).forecast(df_multi)
+        np.testing.assert_array_equal(e3.mean_, mean)
+
+    def test_failed_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = set_cache(ForecastCache(directory=directory))
+            with mock.patch.object(np, "savez", side_effect=OSError("disk full")):
+                e1 = Ridge2Regressor(h=4, backend="numpy").forecast(df_multi)
+            # no partial file left, and results are kept in memory
+            self.assertEqual(os.listdir(directory), [])
+            e2 = Ridge2Regressor(h=4, backend="numpy").forecast(df_multi)
+            self.assertEqual(cache.hits, 1)
+            np.testing.assert_array_equal(e1.mean_, e2.mean_)
+
+    def test_key(self):
+        cache = set_cache(ForecastCache())
+        e = Ridge2Regressor(h=4, backend="numpy")
+        # arguments' defaults are part of the key
+        e.forecast(df_multi)
+        e.forecast(df_multi, xreg=None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # values without a reproducible representation: not cached
+        forecast = Ridge2Regressor.forecast.__wrapped__.__wrapped__
+        self.assertIsNone(get_key(e, forecast, (df_multi,), {"xreg": object()}))
+        self.assertIsNotNone(get_key(e, forecast, (df_multi,), {}))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            set_cache(ForecastCache(directory=directory))
+            e1 = BasicForecaster(
+                h=4, type_pi="bootstrap", B=10, backend="numpy"
+            ).forecast(df_multi)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            # new process: empty in-memory store
+            cache = set_cache(ForecastCache(directory=directory))
+            e2 = BasicForecaster(
+                h=4, type_pi="bootstrap", B=10, backend="numpy"
+            ).forecast(df_multi)
+            self.assertEqual(cache.disk_hits, 1)
+            np.testing.assert_array_equal(e1.lower_, e2.lower_)
+            self.assertEqual(len(e2.sims_), 10)
+            # lazy attributes aren't computed by the write, and rebuilt
+            # when read after the load
+            self.assertIn("ranges_", e1._lazy_builders)
+            self.assertIn("ranges_", e2._lazy_builders)
+            self.assertEqual(e1.ranges_, e2.ranges_)
+            self.assertEqual(e1.averages_, e2.averages_)
+
+
+if __name__ == "__main__":
+    unittest.main()
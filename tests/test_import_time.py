@@ -0,0 +1,54 @@
+"""Import-time budget for `ahead` package."""
+
+# python -m unittest tests.test_import_time
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+# seconds, for a cold `import ahead` in a fresh interpreter
+IMPORT_TIME_BUDGET = float(os.environ.get("AHEAD_IMPORT_TIME_BUDGET", 2.0))
+
+# modules that must only be loaded on first `forecast()` or `plot()`
+LAZY_MODULES = ("rpy2", "matplotlib", "scipy")
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import ahead
+elapsed = time.perf_counter() - start
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(elapsed)
+print(",".join(loaded))
+""".format(lazy=LAZY_MODULES)
+
+
+def run_import(n_runs=3):
+    timings = []
+    loaded = set()
+    for _ in range(n_runs):
+        out = subprocess.run(
+            [sys.executable, "-c", SCRIPT],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.splitlines()
+        timings.append(float(out[0]))
+        loaded.update(m for m in out[1:] if m)
+    return min(timings), loaded
+
+
+class TestImportTime(unittest.TestCase):
+    """`import ahead` must not start R, nor import matplotlib/scipy."""
+
+    def test_import_time(self):
+        elapsed, loaded = run_import()
+        self.assertEqual(loaded, set())
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
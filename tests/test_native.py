@@ -0,0 +1,346 @@
+"""Tests for the in-process (NumPy) engines (no R needed)."""
+
+# python -m unittest tests.test_native
+
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+
+from importlib.util import find_spec
+
+from ahead import BasicForecaster, Ridge2Regressor, Ridge2Search, VAR, config
+from ahead.Basic.basicf import basicf, bootstrap_index_chunks, bootstrap_indices
+from ahead.Ridge2 import ridge2f as r2
+from ahead.VAR.varf import VARStats, varf
+
+
+R_IS_AVAILABLE = config.r_is_installed() and find_spec("rpy2") is not None
+
+
+dataset_multi = {
+ 'date' : ['2001-01-01', '2002-01-01', '2003-01-01', '2004-01-01', '2005-01-01'],
+ 'series1' : [34, 30, 35.6, 33.3, 38.1],
+ 'series2' : [4, 5.5, 5.6, 6.3, 5.1],
+ 'series3' : [100, 100.5, 100.6, 100.2, 100.1]}
+df_multi = pd.DataFrame(dataset_multi).set_index('date')
+
+h = 5
+
+
+class TestBasicf(unittest.TestCase):
+
+    def test_point_forecasts(self):
+        e1 = BasicForecaster(h=h, backend="numpy").forecast(df_multi)
+        e2 = BasicForecaster(h=h, method="median", backend="numpy").forecast(df_multi)
+        e3 = BasicForecaster(h=h, method="rw", backend="numpy").forecast(df_multi)
+        self.assertEqual(e1.backend_, "numpy")
+        self.assertAlmostEqual(e1.averages_[0][0][1], 34.2)
+        self.assertAlmostEqual(e2.averages_[0][0][1], 34.0)
+        self.assertAlmostEqual(e3.averages_[2][4][1], 100.1)
+        sd = np.std(df_multi["series1"], ddof=1)
+        self.assertAlmostEqual(e1.upper_[3, 0] - e1.mean_[3, 0], 1.959963984540 * sd)
+
+    def test_bootstrap(self):
+        for type_pi in ("bootstrap", "blockbootstrap", "movingblockbootstrap"):
+            e1 = BasicForecaster(
+                h=h, type_pi=type_pi, B=10, block_length=2, backend="numpy"
+            ).forecast(df_multi)
+            e2 = BasicForecaster(
+                h=h, type_pi=type_pi, B=10, block_length=2, backend="numpy"
+            ).forecast(df_multi)
+            self.assertAlmostEqual(e1.averages_[0][0][1], 34.2)
+            self.assertEqual(len(e1.sims_), 10)
+            self.assertEqual(e1.sims_[0].shape, (h, 3))
+            np.testing.assert_array_equal(e1.lower_, e2.lower_)
+            self.assertTrue(np.all(e1.lower_ <= e1.upper_))
+
+    def test_bootstrap_indices(self):
+        idx = bootstrap_indices(10, 7, 50, "blockbootstrap", block_length=3)
+        self.assertEqual(idx.shape, (50, 7))
+        # consecutive (circular) indices within each block
+        np.testing.assert_array_equal((idx[:, 1] - idx[:, 0]) % 10, 1)
+        idx = bootstrap_indices(10, 7, 50, "movingblockbootstrap", block_length=3)
+        np.testing.assert_array_equal(idx[:, 1] - idx[:, 0], 1)
+        self.assertTrue(np.all(idx < 10))
+
+    def test_streamed_sims(self):
+        idx = bootstrap_index_chunks(10, 7, 50, "blockbootstrap", block_length=3,
+                                     chunksize=16)
+        np.testing.assert_array_equal(
+            np.vstack(list(idx)),
+            bootstrap_indices(10, 7, 50, "blockbootstrap", block_length=3),
+        )
+        df = pd.DataFrame(
+            np.random.RandomState(3).randn(50, 3),
+            index=pd.date_range("2000-01-01", periods=50).strftime("%Y-%m-%d"),
+        )
+        params = dict(h=h, type_pi="bootstrap", B=2000, backend="numpy",
+                      quantiles=[0.25, 0.75])
+        e1 = BasicForecaster(keep_sims=False, **params).forecast(df)
+        e2 = BasicForecaster(sims_layout="array", **params).forecast(df)
+        self.assertIsNone(e1.sims_)
+        self.assertEqual(e1.quantiles_.shape, (2, h, 3))
+        np.testing.assert_allclose(e1.variance_, e2.variance_)
+        np.testing.assert_allclose(e1.mean_, e2.mean_)
+        # streaming estimates of the quantiles (tails of a discrete
+        # distribution are the least accurate)
+        spread = e2.upper_ - e2.lower_
+        self.assertLess(np.max(np.abs(e1.lower_ - e2.lower_) / spread), 0.2)
+        self.assertLess(
+            np.max(np.abs(e1.quantiles_ - e2.quantiles_) / spread), 0.05
+        )
+
+    def test_univariate(self):
+        res = basicf(np.arange(10.0), h=3, type_pi="bootstrap", B=20)
+        self.assertEqual(res["mean"].shape, (3, 1))
+        self.assertEqual(res["sims"].shape, (20, 3, 1))
+
+
+class TestRidge2f(unittest.TestCase):
+
+    def test_create_train_inputs(self):
+        x = np.arange(12.0).reshape(6, 2)
+        y, regressors = r2.create_train_inputs(x, lags=2)
+        np.testing.assert_array_equal(y, x[2:])
+        # series 1 lags 1, 2 then series 2 lags 1, 2
+        np.testing.assert_array_equal(regressors[0], [2.0, 0.0, 3.0, 1.0])
+        np.testing.assert_array_equal(
+            r2.last_lags(x, 2)[0], [10.0, 8.0, 11.0, 9.0]
+        )
+
+    def test_hidden_weights(self):
+        w = r2.hidden_weights(5, 3, "sobol")
+        self.assertIs(w, r2.hidden_weights(5, 3, "sobol"))
+        self.assertIs(w, r2.hidden_weights(5, 3, "sobol", seed=1))
+        self.assertEqual(w.shape, (3, 5))
+        self.assertFalse(w.flags.writeable)
+        self.assertTrue(np.all(np.abs(w) <= 1))
+
+    def test_closed_form(self):
+        x = np.random.RandomState(1).randn(30, 2)
+        fit = r2.fit_ridge2(x, lags=2, nb_hidden=4, lambda_1=0.5, lambda_2=2.0)
+        y, regressors = r2.create_train_inputs(x, 2)
+        z = np.hstack((regressors, fit.hidden_layer(regressors)))
+        scaled_z = (z - fit.zm) / fit.zsd
+        # augmented least squares formulation of the two-penalty ridge
+        penalty = np.sqrt(np.r_[np.full(4, 0.5), np.full(4, 2.0)])
+        coef = np.linalg.lstsq(
+            np.vstack((scaled_z, np.diag(penalty))),
+            np.vstack((y - y.mean(axis=0), np.zeros((8, 2)))),
+            rcond=None,
+        )[0]
+        np.testing.assert_allclose(fit.coef, coef, atol=1e-10)
+        np.testing.assert_allclose(fit.predict(regressors), fit.fitted)
+
+    def test_forecast(self):
+        e1 = Ridge2Regressor(h=h, backend="numpy").forecast(df_multi)
+        self.assertEqual(e1.backend_, "numpy")
+        self.assertEqual(e1.mean_.shape, (h, 3))
+        self.assertTrue(np.all(e1.lower_ <= e1.mean_))
+        e2 = Ridge2Regressor(
+            h=h, type_pi="movingblockbootstrap", block_length=2, B=20,
+            backend="numpy", sims_layout="array",
+        ).forecast(df_multi, xreg=np.arange(5.0))
+        self.assertEqual(e2.sims_.shape, (20, h, 3))
+        self.assertEqual(len(e2.averages_), 3)
+
+    def test_float32(self):
+        params = dict(h=h, type_pi="bootstrap", B=20, backend="numpy",
+                      sims_layout="array")
+        e1 = Ridge2Regressor(dtype="float32", **params).forecast(df_multi)
+        e2 = Ridge2Regressor(**params).forecast(df_multi)
+        for key in ("mean_", "lower_", "upper_", "sims_"):
+            self.assertEqual(getattr(e1, key).dtype, np.float32)
+            np.testing.assert_allclose(
+                getattr(e1, key), getattr(e2, key), rtol=1e-6
+            )
+        self.assertEqual(e2.sims_.dtype, np.float64)
+
+    def test_update(self):
+        y = np.cumsum(np.random.RandomState(2).randn(40, 3), axis=0)
+        fit = r2.fit_ridge2(y[:30], lags=1, nb_hidden=5)
+        stats = r2.Ridge2Stats(fit)
+        stats.add(y[30:35])
+        stats.add(y[35:])
+        new_fit = stats.refit()
+        # same hidden layer, scaled and solved on all the observations
+        target, regressors = r2.create_train_inputs(y, 1)
+        z = np.hstack((regressors, fit.hidden_layer(regressors)))
+        np.testing.assert_allclose(new_fit.zm, z.mean(axis=0))
+        scaled_z = (z - new_fit.zm) / new_fit.zsd
+        coef = np.linalg.solve(
+            scaled_z.T @ scaled_z + 0.1 * np.eye(8),
+            scaled_z.T @ (target - target.mean(axis=0)),
+        )
+        np.testing.assert_allclose(new_fit.coef, coef, atol=1e-10)
+
+        df = pd.DataFrame(
+            y, index=pd.date_range("2000-01-01", periods=40, freq="MS")
+        )
+        e = Ridge2Regressor(h=h, centers=0, B=10, type_pi="bootstrap",
+                            backend="numpy")
+        e.forecast(df.iloc[:30]).update(df.iloc[30:])
+        self.assertEqual(e.input_df.shape, (40, 3))
+        self.assertEqual(len(e.sims_), 10)
+        self.assertEqual(e.output_dates_[0], pd.Timestamp("2003-05-01"))
+        with self.assertRaises(ValueError):  # dates don't follow
+            e.update(df.iloc[35:])
+
+    def test_update_path(self):
+        y = np.cumsum(np.random.RandomState(6).randn(40, 2), axis=0)
+        df = pd.DataFrame(
+            y, index=pd.date_range("2000-01-01", periods=40, freq="MS")
+        )
+        # defaults (centers=2): clusters of the first fit, kept
+        e = Ridge2Regressor(h=h, backend="numpy").forecast(df.iloc[:30])
+        clusters = e.fcast_["clusters"]
+        memberships, _ = r2.fit_clusters(y[:30], 2, "kmeans", e.seed)
+        np.testing.assert_array_equal(clusters.memberships(y[:30]), memberships)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            e.update(df.iloc[30:35]).update(df.iloc[35:])
+        self.assertIn("stats", e.fcast_.names)
+        self.assertIs(e.fcast_["clusters"], clusters)
+        self.assertEqual(e.fcast_["stats"].n, 39)
+        # dropout: refitted from scratch
+        e = Ridge2Regressor(h=h, dropout=0.1, backend="numpy").forecast(df.iloc[:30])
+        with self.assertWarns(UserWarning):
+            e.update(df.iloc[30:])
+        self.assertNotIn("stats", e.fcast_.names)
+        np.testing.assert_allclose(
+            e.mean_,
+            Ridge2Regressor(h=h, dropout=0.1, backend="numpy").forecast(df).mean_,
+        )
+
+    def test_update_xreg(self):
+        y = np.cumsum(np.random.RandomState(4).randn(40, 2), axis=0)
+        xreg = np.random.RandomState(5).randn(40, 1)
+        df = pd.DataFrame(
+            y, index=pd.date_range("2000-01-01", periods=40, freq="MS")
+        )
+        for centers in (0, 2):
+            e = Ridge2Regressor(h=h, centers=centers, backend="numpy")
+            e.forecast(df.iloc[:30], xreg=xreg[:30])
+            with self.assertRaises(AssertionError):
+                e.update(df.iloc[30:])
+            self.assertEqual(e.input_df.shape, (30, 2))
+            e.update(df.iloc[30:], xreg=xreg[30:])
+            self.assertEqual(e.xreg_.shape, (40, 1))
+        e = Ridge2Regressor(h=h, centers=0, backend="numpy").forecast(df.iloc[:30])
+        with self.assertRaises(AssertionError):
+            e.update(df.iloc[30:], xreg=xreg[30:])
+
+    def test_search(self):
+        y = np.cumsum(np.random.RandomState(3).randn(60, 2), axis=0)
+        df = pd.DataFrame(
+            y, index=pd.date_range("2000-01-01", periods=60, freq="D")
+        )
+        search = Ridge2Search(
+            Ridge2Regressor(h=3, centers=0),
+            {"lags": [1, 2], "lambda_1": [0.1, 1.0, 10.0]},
+            n_candidates=9,
+            max_folds=9,
+        ).fit(df)
+        # 9 candidates on 1 fold, 3 on 3 folds, 1 on 9 folds
+        self.assertEqual(list(search.trials_["n_folds"]), [1] * 9 + [3] * 3 + [9])
+        # score of the best candidate, from full fits on the 9 last folds
+        errors = []
+        for end in range(49, 58):
+            fit = r2.fit_ridge2(y[:end], lags=search.best_params_["lags"],
+                                lambda_1=search.best_params_["lambda_1"])
+            errors.append(np.mean((y[end : end + 3] - fit.forecast(y[:end], 3)) ** 2))
+        self.assertAlmostEqual(search.best_score_, np.sqrt(np.mean(errors)))
+        self.assertEqual(search.best_estimator_.lags, search.best_params_["lags"])
+
+    @unittest.skipUnless(R_IS_AVAILABLE, "R and rpy2 are required")
+    def test_parity_with_r(self):
+        for params in (
+            dict(centers=0),
+            dict(centers=0, lags=2, nb_hidden=3, activation="tanh"),
+            dict(centers=0, nodes_sim="halton", lambda_1=1, lambda_2=0.5),
+        ):
+            e_r = Ridge2Regressor(h=h, backend="r", **params).forecast(df_multi)
+            e_np = Ridge2Regressor(h=h, backend="numpy", **params).forecast(df_multi)
+            np.testing.assert_allclose(e_np.mean_, e_r.mean_, rtol=1e-4)
+            np.testing.assert_allclose(e_np.lower_, e_r.lower_, rtol=1e-4)
+            np.testing.assert_allclose(e_np.upper_, e_r.upper_, rtol=1e-4)
+
+
+class TestVarf(unittest.TestCase):
+
+    def setUp(self):
+        self.y = np.cumsum(np.random.RandomState(0).randn(30, 3), axis=0)
+
+    def test_least_squares(self):
+        y, n = self.y, 30
+        for type_VAR in ("none", "const", "trend", "both"):
+            res = varf(y, h=3, lags=2, type_VAR=type_VAR)
+            trend = np.arange(3.0, n + 1)
+            det = {
+                "none": np.empty((n - 2, 0)),
+                "const": np.ones((n - 2, 1)),
+                "trend": trend[:, None],
+                "both": np.column_stack((np.ones(n - 2), trend)),
+            }[type_VAR]
+            regressors = np.hstack((y[1:-1], y[:-2], det))
+            coef = np.linalg.lstsq(regressors, y[2:], rcond=None)[0]
+            np.testing.assert_allclose(res["coefficients"], coef, atol=1e-8)
+
+    def test_intervals(self):
+        res = varf(self.y, h=3, lags=1)
+        a = res["coefficients"].T
+        sigma = res["residuals"].T @ res["residuals"] / (29 - 3)
+        cov = sigma + a @ sigma @ a.T + a @ a @ sigma @ a.T @ a.T
+        np.testing.assert_allclose(
+            res["upper"][2] - res["mean"][2], 1.959963984540 * np.sqrt(np.diag(cov))
+        )
+
+    def test_batch(self):
+        panels = np.stack((self.y, 2 * self.y, self.y[::-1]))
+        res = varf(panels, h=4, lags=2, type_VAR="both")
+        self.assertEqual(res["mean"].shape, (3, 4, 3))
+        for i in range(3):
+            res_i = varf(panels[i], h=4, lags=2, type_VAR="both")
+            np.testing.assert_allclose(res["lower"][i], res_i["lower"])
+
+    def test_update(self):
+        stats = VARStats(self.y[:20], lags=2, type_VAR="both")
+        stats.add(self.y[20:25])
+        stats.add(self.y[25:])
+        res = stats.forecast(h=4)
+        res_full = varf(self.y, h=4, lags=2, type_VAR="both")
+        for key in ("mean", "lower", "upper", "coefficients"):
+            np.testing.assert_allclose(res[key], res_full[key], atol=1e-8)
+
+        df = pd.DataFrame(
+            self.y, index=pd.date_range("2000-01-01", periods=30, freq="MS")
+        )
+        e1 = VAR(h=h, lags=2, backend="numpy").forecast(df.iloc[:25])
+        e1.update(df.iloc[25:26])  # running sums of the whole input
+        e1.update(df.iloc[26:28]).update(df.iloc[28:])
+        # then new rows are concatenated to the input when it's read
+        self.assertEqual(len(e1._appended["input_df"]), 2)
+        e2 = VAR(h=h, lags=2, backend="numpy").forecast(df)
+        np.testing.assert_allclose(e1.upper_, e2.upper_, atol=1e-8)
+        self.assertEqual(list(e1.output_dates_), list(e2.output_dates_))
+        self.assertTrue(e1.input_df.equals(df))
+        self.assertEqual(list(e1.input_dates), list(e2.input_dates))
+        self.assertNotIn("input_df", e1._appended)
+
+    def test_forecast_many(self):
+        df = pd.DataFrame(
+            self.y, index=pd.date_range("2000-01-01", periods=30, freq="MS")
+        )
+        dfs = [df, df * 2, df.iloc[5:]]
+        obj = VAR(h=h, type_VAR="const", backend="numpy").forecast_many(dfs)
+        self.assertEqual(obj.backend_, "numpy")
+        self.assertEqual(obj.upper_.shape, (3, h, 3))
+        for i in range(3):
+            e = VAR(h=h, type_VAR="const", backend="numpy").forecast(dfs[i])
+            np.testing.assert_allclose(obj.mean_[i], e.mean_)
+            self.assertEqual(list(obj.output_dates_[i]), list(e.output_dates_))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for `ParallelForecaster` (numpy backend, no R needed)."""
+
+# python -m unittest tests.test_parallel
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from ahead import BasicForecaster, ParallelForecaster, VAR
+from ahead.Parallel import pool, transport
+
+
+index = pd.date_range("2000-01-01", periods=30, freq="MS")
+dfs = [
+    pd.DataFrame(np.random.RandomState(i).randn(30, 3).cumsum(axis=0), index=index)
+    for i in range(12)
+]
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_chunks(self):
+        pf = ParallelForecaster(BasicForecaster(), chunksize=5)
+        self.assertEqual(pf.get_chunks(12, 2), [(0, 5), (5, 10), (10, 12)])
+        pf = ParallelForecaster(BasicForecaster())
+        self.assertEqual(len(pf.get_chunks(12, 2)), 6)
+        with self.assertRaisesRegex(AssertionError, "at least one data frame"):
+            pf.forecast([])
+
+    def test_worker_pool(self):
+        state = []
+        with pool.worker_pool(1, state.append, ("x",)) as map_function:
+            self.assertEqual(list(map_function(abs, [-1, 2])), [1, 2])
+        self.assertEqual(state, ["x", None])  # reset in the current process
+        with pool.worker_pool(2) as map_function:
+            self.assertEqual(list(map_function(abs, [-1, 2, -3])), [1, 2, 3])
+        self.assertEqual(pool.get_n_jobs(8, 3), 3)
+
+    def test_ordered_results(self):
+        estimator = BasicForecaster(h=4, method="rw", backend="numpy")
+        p1 = ParallelForecaster(estimator, n_jobs=1).forecast(dfs)
+        p2 = ParallelForecaster(estimator, n_jobs=2, chunksize=5).forecast(dfs)
+        self.assertEqual(p2.mean_.shape, (12, 4, 3))
+        np.testing.assert_array_equal(p1.upper_, p2.upper_)
+        np.testing.assert_array_equal(p2.mean_[7, 0], dfs[7].iloc[-1])
+        self.assertEqual(p2.results_[0]["backend_"], "numpy")
+        self.assertIsNone(estimator.mean_)
+
+    def test_forecast_many(self):
+        pf = ParallelForecaster(
+            VAR(h=4, backend="numpy"), n_jobs=2, method="forecast_many"
+        ).forecast(dfs)
+        self.assertEqual(pf.lower_.shape, (12, 4, 3))
+        self.assertEqual(len(pf.output_dates_), 12)
+        np.testing.assert_allclose(
+            pf.mean_[3], VAR(h=4, backend="numpy").forecast(dfs[3]).mean_
+        )
+
+    def test_shared_panel(self):
+        directory = transport.get_shared_directory()
+        try:
+            panel = transport.SharedPanel([dfs[0], dfs[1].iloc[3:]], directory)
+            df = panel.get_df(1)
+        finally:
+            transport.release_directory(directory)
+        self.assertEqual(len(panel), 2)
+        np.testing.assert_array_equal(df.to_numpy(), dfs[1].iloc[3:].to_numpy())
+        self.assertTrue(df.index.equals(dfs[1].index[3:]))
+
+    def test_shared_transport(self):
+        estimator = BasicForecaster(
+            h=4, method="rw", type_pi="bootstrap", B=20, backend="numpy"
+        )
+        p1 = ParallelForecaster(estimator, n_jobs=2).forecast(dfs)
+        p2 = ParallelForecaster(
+            estimator, n_jobs=2, transport="shared", keep_sims=True
+        ).forecast(dfs)
+        np.testing.assert_array_equal(p1.lower_, p2.lower_)
+        self.assertEqual(p2.sims_.shape, (12, 20, 4, 3))
+        np.testing.assert_array_equal(p2.sims_[5], np.stack(p1.results_[5]["sims_"]))
+        self.assertEqual(list(p2.output_dates_[11]), list(p1.output_dates_[11]))
+
+    def test_shared_transport_index(self):
+        estimator = BasicForecaster(h=4, method="rw", backend="numpy")
+        strings = [str(date.date()) for date in index]
+        for new_index in (range(30), strings):
+            inputs = [df.set_axis(list(new_index)) for df in dfs[:3]]
+            p1 = ParallelForecaster(estimator, n_jobs=1).forecast(inputs)
+            p2 = ParallelForecaster(
+                estimator, n_jobs=1, transport="shared"
+            ).forecast(inputs)
+            for dates1, dates2 in zip(p1.output_dates_, p2.output_dates_):
+                self.assertEqual(list(dates1), list(dates2))
+            np.testing.assert_array_equal(p1.mean_, p2.mean_)
+
+    def test_shared_transport_no_sims(self):
+        for estimator, method in (
+            (BasicForecaster(h=4, method="rw", B=20, backend="numpy"), "forecast"),
+            (
+                BasicForecaster(h=4, type_pi="bootstrap", B=20, backend="numpy"),
+                "forecast_many",
+            ),
+        ):
+            pf = ParallelForecaster(
+                estimator, n_jobs=1, method=method, transport="shared", keep_sims=True
+            ).forecast(dfs)
+            self.assertIsNone(pf.sims_)
+            self.assertEqual(pf.mean_.shape, (12, 4, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
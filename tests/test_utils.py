@@ -0,0 +1,346 @@
+"""Tests for `ahead.utils` (no R needed)."""
+
+# python -m unittest tests.test_utils
+
+import os
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from importlib.util import find_spec
+
+from ahead.utils import multivariate as mv
+from ahead.utils import plotting
+from ahead.utils import unimultivariate as umv
+from ahead.utils.cross_validation import cross_validate, get_fold_bounds
+from ahead.utils.streaming import StreamingSummary
+from ahead.utils.tscv_indices import get_tscv_indices
+
+
+class _Result(dict):
+    @property
+    def rx2(self):
+        return self
+
+
+h, n_series = 4, 3
+rng = np.random.RandomState(123)
+mean = rng.randn(h, n_series)
+fcast = _Result(mean=mean, lower=mean - 1.0, upper=mean + 2.0)
+output_dates = pd.Series(
+    pd.date_range("2020-01-01", periods=h, freq="MS")
+).dt.date
+
+
+class TestFormatting(unittest.TestCase):
+
+    def test_format_multivariate_forecast(self):
+        averages, ranges, dates = mv.format_multivariate_forecast(
+            n_series, "original", output_dates, h, fcast
+        )
+        self.assertEqual(dates, ["2020-01-01", "2020-02-01", "2020-03-01", "2020-04-01"])
+        self.assertEqual(len(averages), n_series)
+        self.assertEqual(len(averages[0]), h)
+        self.assertEqual(averages[2][1], ["2020-02-01", mean[1, 2]])
+        self.assertEqual(
+            ranges[1][3], ["2020-04-01", mean[3, 1] - 1.0, mean[3, 1] + 2.0]
+        )
+
+    def test_compute_result_dfs(self):
+        dates, mean_, lower_, upper_ = mv.format_multivariate_arrays(
+            "original", output_dates, h, fcast
+        )
+        averages, ranges, _ = mv.format_multivariate_forecast(
+            n_series, "original", output_dates, h, fcast
+        )
+        res = umv.compute_result_dfs(dates, mean_, lower_, upper_)
+        self.assertEqual(len(res), n_series)
+        for j in range(n_series):
+            pd.testing.assert_frame_equal(
+                res[j], umv.compute_result_df(averages[j], ranges[j])
+            )
+
+
+class TestDates(unittest.TestCase):
+
+    def test_format_output_dates(self):
+        dates = pd.Series(
+            pd.date_range("2019-12-30", periods=400, freq="D")
+        ).dt.date
+        expected = [
+            int(datetime.strptime(str(d), "%Y-%m-%d").timestamp() * 1000)
+            for d in dates
+        ]
+        self.assertEqual(umv.format_output_dates("ms", dates, 400), expected)
+        self.assertEqual(
+            umv.format_output_dates("ms", dates, 400, frequency="D"), expected
+        )
+        # cached
+        self.assertEqual(
+            umv.format_output_dates("ms", dates, 400, frequency="D"), expected
+        )
+        self.assertEqual(
+            umv.format_output_dates("original", dates, 3, frequency="D"),
+            ["2019-12-30", "2019-12-31", "2020-01-01"],
+        )
+
+    def test_format_output_dates_dst(self):
+        # clocks fall back at 3am on 2021-10-31 in Paris: 2:30 is ambiguous
+        dates = pd.Series(
+            pd.date_range("2021-10-31 00:30", periods=4, freq="h")
+        ).dt.to_pydatetime()
+        previous = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Paris"
+        time.tzset()
+        try:
+            expected = [int(d.timestamp() * 1000) for d in dates]
+            self.assertEqual(umv.format_output_dates("ms", dates, 4), expected)
+        finally:
+            if previous is None:
+                os.environ.pop("TZ")
+            else:
+                os.environ["TZ"] = previous
+            time.tzset()
+
+    def test_compute_calendar(self):
+        index = pd.date_range("2001-01-01", periods=30, freq="MS")
+        df = pd.DataFrame({"a": np.zeros(30)}, index=index.strftime("%Y-%m-%d"))
+        input_dates, output_dates, frequency = umv.compute_calendar(df, 3)
+        self.assertEqual(frequency, "MS")
+        self.assertEqual(input_dates.dtype, np.dtype("datetime64[ns]"))
+        np.testing.assert_array_equal(input_dates.values, index.values)
+        np.testing.assert_array_equal(
+            output_dates.values,
+            pd.date_range("2003-07-01", periods=3, freq="MS").values,
+        )
+        # cached, for the same calendar
+        input_dates2, _, _ = umv.compute_calendar(df.set_axis(index), 3)
+        self.assertTrue(np.shares_memory(input_dates.values, input_dates2.values))
+        # positional index: daily, output dates from today + h
+        _, output_dates, frequency = umv.compute_calendar(
+            pd.DataFrame({"a": np.zeros(5)}), 2
+        )
+        self.assertEqual(frequency, "D")
+        self.assertEqual(
+            output_dates.iloc[0], pd.Timestamp.today().normalize() + pd.Timedelta(days=2)
+        )
+
+
+    def test_get_frequency(self):
+        for alias, period in (
+            ("MS", 12), ("ME", 12), ("W-SUN", 52), ("QE-DEC", 4),
+            ("A-DEC", 1), ("D", 365), ("h", 24), ("H", 24), ("min", 60),
+            ("T", 60), ("15min", 4), ("2h", 12), ("WOM-1MON", 12), (None, 1),
+        ):
+            self.assertEqual(umv.get_frequency(alias), period, alias)
+        with self.assertRaises(ValueError):  # no closest alias
+            umv.get_frequency("not a frequency")
+
+
+class TestCrossValidation(unittest.TestCase):
+
+    def test_fold_bounds(self):
+        np.testing.assert_array_equal(
+            get_fold_bounds(10, initial_window=5, horizon=3),
+            [[0, 5, 5, 8], [0, 6, 6, 9], [0, 7, 7, 10]],
+        )
+        np.testing.assert_array_equal(
+            get_fold_bounds(10, p=0.9, initial_window=5, horizon=3,
+                            fixed_window=True),
+            [[0, 5, 5, 8], [1, 6, 6, 9]],
+        )
+
+    def test_tscv_bounds(self):
+        for p in (1, 0.7):
+            for fixed_window in (True, False):
+                args = dict(n=30, p=p, initial_window=6, horizon=4,
+                            fixed_window=fixed_window)
+                indices = get_tscv_indices(**args)
+                bounds = get_tscv_indices(output="bounds", **args)
+                slices = get_tscv_indices(output="slices", **args)
+                if p == 1:
+                    indices, bounds, slices = [indices], [bounds], [slices]
+                for folds, (train, test), folds_slices in zip(
+                    indices, bounds, slices
+                ):
+                    self.assertEqual(train.shape, (len(folds), 2))
+                    folds_slices = list(folds_slices)
+                    self.assertEqual(len(folds_slices), len(folds))
+                    for i, fold in enumerate(folds):
+                        np.testing.assert_array_equal(
+                            fold["train"], np.arange(*train[i])
+                        )
+                        np.testing.assert_array_equal(
+                            fold["test"], np.arange(*test[i])
+                        )
+                        self.assertEqual(
+                            folds_slices[i],
+                            (slice(*train[i]), slice(*test[i])),
+                        )
+
+    def test_cross_validate(self):
+        from ahead import VAR
+
+        y = np.cumsum(np.random.RandomState(0).randn(40, 2), axis=0)
+        df = pd.DataFrame(
+            y, index=pd.date_range("2000-01-01", periods=40, freq="MS")
+        )
+        res = cross_validate(
+            VAR(lags=2, backend="numpy"), df, initial_window=30, horizon=4
+        )
+        self.assertEqual(res["errors"].shape, (7, 4, 2))
+        e = VAR(h=4, lags=2, backend="numpy").forecast(df.iloc[:32])
+        np.testing.assert_allclose(res["mean"][2], e.mean_)
+        np.testing.assert_allclose(res["actual"][2], y[32:36])
+        np.testing.assert_allclose(res["errors"], res["actual"] - res["mean"])
+        # VAR updates are exact
+        res_incremental = cross_validate(
+            VAR(lags=2, backend="numpy"), df, initial_window=30, horizon=4,
+            incremental=True, chunksize=3,
+        )
+        np.testing.assert_allclose(res_incremental["upper"], res["upper"])
+
+
+class TestStreamingSummary(unittest.TestCase):
+
+    def test_summary(self):
+        x = np.random.RandomState(1).standard_normal((4000, 3, 2)) * [1.0, 3.0]
+        summary = StreamingSummary([0.05, 0.5, 0.95], (3, 2))
+        for start in range(0, 4000, 300):
+            summary.add(x[start : start + 300])
+        self.assertEqual(summary.count, 4000)
+        np.testing.assert_allclose(summary.mean, x.mean(axis=0))
+        np.testing.assert_allclose(summary.variance, x.var(axis=0, ddof=1))
+        np.testing.assert_allclose(
+            summary.quantiles,
+            np.quantile(x, [0.05, 0.5, 0.95], axis=0),
+            atol=0.1 * 3.0,
+        )
+        # exact below 5 observations
+        summary = StreamingSummary([0.1, 0.9], (3, 2)).add(x[:3])
+        np.testing.assert_allclose(
+            summary.quantiles, np.quantile(x[:3], [0.1, 0.9], axis=0)
+        )
+
+
+class TestPlotting(unittest.TestCase):
+
+    def test_fan_bands(self):
+        paths = np.random.RandomState(2).randn(4, 200)
+        bands = plotting.fan_bands(paths, (50, 90))
+        self.assertEqual(bands.shape, (2, 2, 4))
+        np.testing.assert_allclose(
+            bands[1], np.quantile(paths, [0.05, 0.95], axis=1)
+        )
+        sub = plotting.subsample_paths(paths, 10)
+        self.assertEqual(sub.shape, (4, 10))
+        self.assertIs(plotting.subsample_paths(paths, 500), paths)
+        np.testing.assert_array_equal(
+            plotting.date_labels(output_dates)[[0, -1]],
+            ["2020-01-01", "2020-04-01"],
+        )
+
+    @unittest.skipIf(find_spec("matplotlib") is None, "matplotlib not installed")
+    def test_plot(self):
+        import matplotlib
+
+        matplotlib.use("Agg")
+        from ahead import BasicForecaster
+
+        df = pd.DataFrame(
+            rng.randn(30, 2),
+            index=pd.date_range("2000-01-01", periods=30).strftime("%Y-%m-%d"),
+        )
+        obj = BasicForecaster(h=3, type_pi="bootstrap", B=500,
+                              sims_layout="array", backend="numpy").forecast(df)
+        ax = obj.plot(0, type_plot="spaghetti", max_paths=50)
+        self.assertEqual(len(ax.collections[0].get_segments()), 50)
+        obj.plot(1, type_plot="fan")
+        fig = obj.plot_grid(type_plot="fan", ncols=1)
+        self.assertEqual(len(fig.axes), 2)
+
+
+class TestColumnar(unittest.TestCase):
+
+    @unittest.skipIf(find_spec("pyarrow") is None, "pyarrow not installed")
+    def test_panels(self):
+        import os
+        import tempfile
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from ahead import BasicForecaster
+        from ahead.utils.columnar import forecast_panels, iter_panels
+
+        dates = pd.date_range("2000-01-01", periods=20, freq="MS")
+        panel = pd.concat(
+            {
+                f"input{i}": pd.DataFrame(
+                    rng.randn(20, 2), index=dates, columns=["a", "b"]
+                ).rename_axis("date")
+                for i in range(5)
+            },
+            names=["id"],
+        )
+        table = pa.Table.from_pandas(panel.reset_index(), preserve_index=False)
+        chunks = list(iter_panels(table, chunksize=2, batch_size=7))
+        self.assertEqual([ids for ids, _ in chunks],
+                         [["input0", "input1"], ["input2", "input3"], ["input4"]])
+        np.testing.assert_array_equal(
+            pd.concat([chunk for _, chunk in chunks]).to_numpy(), panel.to_numpy()
+        )
+
+        obj = BasicForecaster(h=3, backend="numpy")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "forecasts.parquet")
+            n_inputs = forecast_panels(obj, table, path, chunksize=2)
+            res = pq.read_table(path).to_pandas()
+        self.assertEqual(n_inputs, 5)
+        self.assertEqual(res.shape, (5 * 3 * 2, 6))
+        expected = BasicForecaster(h=3, backend="numpy").forecast_many(panel)
+        np.testing.assert_allclose(
+            res["mean"].to_numpy(), expected.mean_.reshape(-1)
+        )
+        self.assertEqual(list(res["series"][:2]), ["a", "b"])
+
+        # wide layout: one univariate input per column
+        wide = pa.table({"date": dates, "x": rng.randn(20), "y": rng.randn(20)})
+        (ids, inputs), = iter_panels(wide, layout="wide")
+        self.assertEqual(ids, ["x", "y"])
+        self.assertEqual(inputs[1].shape, (20, 1))
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_timings(self):
+        from ahead import BasicForecaster
+        from ahead.utils import add_timing_hook, remove_timing_hook
+
+        df = pd.DataFrame(
+            rng.randn(20, 2), index=pd.date_range("2000-01-01", periods=20)
+        )
+        calls = []
+        hook = add_timing_hook(lambda *args: calls.append(args))
+        try:
+            obj = BasicForecaster(h=3, type_pi="bootstrap", B=5,
+                                  backend="numpy").forecast(df)
+        finally:
+            remove_timing_hook(hook)
+        obj.forecast(df)
+        self.assertEqual(len(calls), 1)
+        self.assertIs(calls[0][0], obj)
+        self.assertEqual(calls[0][1], "forecast")
+        self.assertEqual(
+            set(obj.timings_),
+            {"init_forecasting_params", "get_forecast", "format_output",
+             "format_sims", "other", "total"},
+        )
+        # exclusive stages
+        self.assertAlmostEqual(
+            sum(obj.timings_[stage]["wall"] for stage in obj.timings_) / 2,
+            obj.timings_["total"]["wall"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()